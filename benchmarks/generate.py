@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+
+"""deterministic synthetic iges files of any size.
+
+    python benchmarks/generate.py out.igs --entities 100000 --mix 110:4,128:1,514:1
+
+The entities come in blocks, every block is valid on its own:
+
+    110  line
+    124  transformation matrix and a line using it
+    126  cubic b-spline curve
+    128  bicubic b-spline surface
+    144  trimmed surface on a 128, bounded by the domain of the surface
+    402  group of the preceding entities (form 7)
+    514  b-rep face (510) on a 128 with a loop (508) of four 110 edges (504)
+         over a vertex list (502), all faces go into one shell (514)
+"""
+
+import argparse
+import math
+import os
+import random
+
+# blocks per weight unit of the default mix
+MIX = {110: 4, 124: 0.5, 126: 3, 128: 1, 144: 1, 402: 0.2, 514: 0.5}
+
+
+def record(text, section_code, sequence_number):
+    return "%-72s%s%7d\n" % (text, section_code, sequence_number)
+
+
+def real(x):
+    return "%.6f" % x
+
+
+class Model(object):
+    """entities as (type, parameters, form, matrix) with DE pointers 2 i + 1"""
+
+    def __init__(self):
+        self.entities = []
+
+    def add(self, type_number, parameters, form=0, matrix=0):
+        self.entities.append((type_number, [str(p) for p in parameters], form, matrix))
+        return 2 * len(self.entities) - 1
+
+    def write(self, fh, name="synthetic.igs"):
+        """write the model as iges file to the text file object fh"""
+        fh.write(record("synthetic iges file, see benchmarks/generate.py", "S", 1))
+        values = ["1H,", "1H;", "9Hsynthetic", "%dH%s" % (len(name), name), "3Higs", "3Higs",
+                  "32", "38", "6", "308", "15", "9Hsynthetic", "1.", "2", "2HMM", "1", "0.01",
+                  "15H20000101.000000", "1E-06", "1000.", "6Hauthor", "12Horganization", "11", "0",
+                  "15H20000101.000000"]
+        g = pack(values)
+        for i, line in enumerate(g):
+            fh.write(record(line, "G", i + 1))
+        p_line = 1
+        p_records = []
+        for i, (type_number, parameters, form, matrix) in enumerate(self.entities):
+            lines = pack([str(type_number)] + parameters)
+            de = 2 * i + 1
+            fh.write(record("%8d%8d%8d%8d%8d%8d%8d%8d%8s" % (type_number, p_line, 0, 0, 0, 0, matrix, 0, "00000000"),
+                            "D", de))
+            fh.write(record("%8d%8d%8d%8d%8d%8s%8s%8s%8d" % (type_number, 0, 0, len(lines), form, "", "", "", 0),
+                            "D", de + 1))
+            p_records.extend((line, de) for line in lines)
+            p_line += len(lines)
+        for i, (line, de) in enumerate(p_records):
+            fh.write(record("%-64s%8d" % (line, de), "P", i + 1))
+        fh.write(record("S%7dG%7dD%7dP%7d" % (1, len(g), 2 * len(self.entities), len(p_records)), "T", 1))
+
+
+def pack(tokens, width=64):
+    """parameter lines of up to width characters, tokens separated by ","
+    and ended by ";", no token is split"""
+    lines, line = [], ""
+    for i, token in enumerate(tokens):
+        token += ";" if i == len(tokens) - 1 else ","
+        if line and len(line) + len(token) > width:
+            lines.append(line)
+            line = ""
+        line += token
+    lines.append(line)
+    return lines
+
+
+def line(model, rnd, origin, matrix=0):
+    start = [o + rnd.uniform(0, 10) for o in origin]
+    end = [s + rnd.uniform(-5, 5) for s in start]
+    return model.add(110, [real(x) for x in start + end], matrix=matrix)
+
+
+def transformed_line(model, rnd, origin):
+    angle = rnd.uniform(0, 2 * math.pi)
+    c, s = math.cos(angle), math.sin(angle)
+    matrix = model.add(124, [real(x) for x in [c, -s, 0, origin[0], s, c, 0, origin[1], 0, 0, 1, origin[2]]])
+    return line(model, rnd, [0, 0, 0], matrix)
+
+
+def curve(model, rnd, origin):
+    points = []
+    for i in range(4):
+        points += [origin[0] + 3 * i, origin[1] + rnd.uniform(-2, 2), origin[2] + rnd.uniform(-2, 2)]
+    knots = [0, 0, 0, 0, 1, 1, 1, 1]
+    return model.add(126, [3, 3, 0, 0, 1, 0] + knots + [1] * 4 + [real(x) for x in points] +
+                     [0, 1, 0, 0, 0])
+
+
+def surface(model, rnd, origin):
+    points = []
+    for j in range(4):
+        for i in range(4):
+            points += [origin[0] + 3 * i, origin[1] + 3 * j, origin[2] + rnd.uniform(-2, 2)]
+    knots = [0, 0, 0, 0, 1, 1, 1, 1]
+    return model.add(128, [3, 3, 3, 3, 0, 0, 1, 0, 0] + knots + knots + [1] * 16 + [real(x) for x in points] +
+                     [0, 1, 0, 1])
+
+
+def trimmed_surface(model, rnd, origin):
+    return model.add(144, [surface(model, rnd, origin), 0, 0, 0])
+
+
+def group(model, rnd, origin):
+    count = len(model.entities)
+    members = [2 * i + 1 for i in range(max(0, count - rnd.randint(1, 8)), count)]
+    return model.add(402, [len(members)] + members, form=7)
+
+
+def face(model, rnd, origin):
+    surf = surface(model, rnd, origin)
+    corners = [(0, 0), (9, 0), (9, 9), (0, 9)]
+    vertices = [[origin[0] + x, origin[1] + y, origin[2]] for x, y in corners]
+    vertex_list = model.add(502, [4] + [real(x) for xyz in vertices for x in xyz], form=1)
+    edges = []
+    for k in range(4):
+        a, b = vertices[k], vertices[(k + 1) % 4]
+        edges += [model.add(110, [real(x) for x in a + b]), vertex_list, k + 1, vertex_list, (k + 1) % 4 + 1]
+    edge_list = model.add(504, [4] + edges, form=1)
+    loop = model.add(508, [4] + [x for k in range(4) for x in [0, edge_list, k + 1, 1, 0]], form=1)
+    return model.add(510, [surf, 1, 1, loop], form=1)
+
+
+BLOCKS = {110: line, 124: transformed_line, 126: curve, 128: surface, 144: trimmed_surface,
+          402: group, 514: face}
+
+
+def build(entities=10000, mix=None, seed=0):
+    """Model with about entities entities, mix: {block: weight}, see BLOCKS"""
+    mix = dict(MIX if mix is None else mix)
+    rnd = random.Random(seed)
+    blocks = sorted(mix)
+    weights = [mix[b] for b in blocks]
+    model = Model()
+    # constant density, the model grows with the number of entities
+    size = 30. * max(1, entities) ** (1. / 3)
+    faces = []
+    while len(model.entities) < entities:
+        block = rnd.choices(blocks, weights)[0]
+        origin = [rnd.uniform(0, size) for _ in range(3)]
+        de = BLOCKS[block](model, rnd, origin)
+        if block == 514:
+            faces.append(de)
+    if faces:
+        model.add(514, [len(faces)] + [x for de in faces for x in (de, 1)], form=1)
+    return model
+
+
+def generate(fh, entities=10000, mix=None, seed=0):
+    """write a synthetic iges file with about entities entities to fh
+    (path or text file object), returns the number of entities"""
+    model = build(entities, mix, seed)
+    if isinstance(fh, str):
+        with open(fh, "w") as f:
+            model.write(f, os.path.basename(fh))
+    else:
+        model.write(fh)
+    return len(model.entities)
+
+
+def parse_mix(text):
+    """"110:4,128:1" -> {110: 4., 128: 1.}"""
+    return dict((int(k), float(v)) for k, v in (item.split(":") for item in text.split(",")))
+
+
+def main(args=None):
+    p = argparse.ArgumentParser(description="write a synthetic iges file")
+    p.add_argument("file")
+    p.add_argument("--entities", type=int, default=10000)
+    p.add_argument("--mix", type=parse_mix, default=None, help="block:weight,... of %s" % sorted(BLOCKS))
+    p.add_argument("--seed", type=int, default=0)
+    args = p.parse_args(args)
+    print("%d entities" % generate(args.file, args.entities, args.mix, args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+"""time and memory of the phases of Iges(fh) on synthetic files.
+
+    python benchmarks/run.py --entities 1000,10000,100000 --repeat 3 --json results.json
+
+Phases, as in Iges.__init__ and Iges.get_type_df:
+
+    read        read the file and split the sections
+    global      start and global section
+    directory   decode the D section
+    parameters  assemble and tokenize the P section
+    types       parse the entities of all Iges.type_parsers
+    total       Iges(path) and parse_entries(), end to end
+
+Times are the best of --repeat runs, memory is the tracemalloc peak of a
+separate run (tracing slows the code down).
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate import generate  # noqa: E402
+from igs.igs import Iges, decode_directory, parse_parameters  # noqa: E402
+from igs.sections import read_buffer, split_sections  # noqa: E402
+
+PHASES = ["read", "global", "directory", "parameters", "types", "total"]
+
+
+def phases(path):
+    """(phase name, function of the previous result) in order"""
+    def read(_):
+        return split_sections(read_buffer(path))
+
+    def global_(sections):
+        iges = Iges(None)
+        iges._sections = sections
+        iges.parse_start_section()
+        iges.parse_global_section()
+        return iges
+
+    def directory(iges):
+        iges._entries = decode_directory(iges._sections["D"])
+        return iges
+
+    def parameters(iges):
+        iges._tokens = parse_parameters(iges._entries, iges._sections["P"], iges.psep, iges.rsep)
+        return iges
+
+    def types(iges):
+        iges.parse_entries()
+        return iges
+
+    def total(_):
+        iges = Iges(path)
+        iges.parse_entries()
+        return iges
+
+    return [("read", read), ("global", global_), ("directory", directory),
+            ("parameters", parameters), ("types", types), ("total", total)]
+
+
+def measure(path, repeat=3, memory=True):
+    """{phase: {"time": s, "memory": bytes}} of the file path"""
+    results = dict((name, {"time": np.inf}) for name in PHASES)
+    for _ in range(repeat):
+        value = None
+        for name, function in phases(path):
+            start = time.perf_counter()
+            value = function(value)
+            results[name]["time"] = min(results[name]["time"], time.perf_counter() - start)
+    if memory:
+        value = None
+        for name, function in phases(path):
+            tracemalloc.start()
+            value = function(value)
+            results[name]["memory"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return results
+
+
+def run(sizes, repeat=3, memory=True, mix=None, seed=0, directory=None):
+    """benchmark synthetic files of sizes entities, returns a list of
+    {"entities": n, "bytes": size, "phases": measure(...)}"""
+    rows = []
+    for entities in sizes:
+        with tempfile.TemporaryDirectory(dir=directory) as tmp:
+            path = os.path.join(tmp, "synthetic_%d.igs" % entities)
+            count = generate(path, entities, mix, seed)
+            rows.append({"entities": count, "bytes": os.path.getsize(path),
+                         "phases": measure(path, repeat, memory)})
+    return rows
+
+
+def report(rows, fh=sys.stdout):
+    """table of the results, times in ms, memory in MB, throughput of total"""
+    fh.write("%10s %8s" % ("entities", "MB") + "".join("%12s" % name for name in PHASES) + "%10s\n" % "MB/s")
+    for row in rows:
+        phases = row["phases"]
+        fh.write("%10d %8.1f" % (row["entities"], row["bytes"] / 1e6) +
+                 "".join("%10.1fms" % (1000 * phases[name]["time"]) for name in PHASES) +
+                 "%10.1f\n" % (row["bytes"] / 1e6 / phases["total"]["time"]))
+        if all("memory" in phases[name] for name in PHASES):
+            fh.write("%10s %8s" % ("peak", "") +
+                     "".join("%10.1fMB" % (phases[name]["memory"] / 1e6) for name in PHASES) + "\n")
+
+
+def main(args=None):
+    from generate import parse_mix
+    p = argparse.ArgumentParser(description="benchmark the phases of Iges(fh) on synthetic files")
+    p.add_argument("--entities", default="1000,10000,100000", help="comma separated sizes")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    p.add_argument("--mix", type=parse_mix, default=None, help="block:weight,... see generate.py")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", help="write the results to this file")
+    args = p.parse_args(args)
+    rows = run([int(n) for n in args.entities.split(",")], args.repeat, not args.no_memory, args.mix, args.seed)
+    report(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,3 +5,18 @@
 __author__ = """lepy"""
 __email__ = 'lepy@mailbox.org'
 __version__ = '0.1.0'
+
+# public names, imported on first access to keep "import igs" cheap
+_lazy_imports = {"Iges": "igs.igs",
+                 "aload": "igs.aio",
+                 "load_many": "igs.batch",
+                 "probe": "igs.header",
+                 "register_parser": "igs.igs",
+                 "write": "igs.writer"}
+
+
+def __getattr__(name):
+    if name in _lazy_imports:
+        import importlib
+        return getattr(importlib.import_module(_lazy_imports[name]), name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
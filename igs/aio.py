@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""asyncio loading of iges files.
+
+    iges = await igs.aload(path)
+
+The file is read without blocking the event loop and the parse stages of
+Iges run one by one in an executor (threads, the loop default if None).
+Cancelling the task stops the load at the end of the running stage, the
+task ends once that stage is finished. A Loader caps the number of files
+parsed at the same time, aload uses a default Loader.
+"""
+
+import asyncio
+import inspect
+import weakref
+
+from igs.igs import Iges
+
+# parsed at the same time by the default Loader
+MAX_CONCURRENT = 4
+CHUNK_SIZE = 1 << 20
+# Iges options of a Loader, memory tracing is process wide and lazy
+# loading has no stages to run
+OPTIONS = ["workers", "cache", "hooks"]
+
+
+async def read_async(fh, executor=None, chunk_size=CHUNK_SIZE):
+    """bytes like content of fh without blocking the event loop
+
+    fh: path, bytes, file object or stream with a coroutine read(n)
+    (asyncio.StreamReader, aiohttp payloads)"""
+    from igs.sections import read_buffer
+    if isinstance(fh, (bytes, bytearray, memoryview)):
+        return fh
+    read = getattr(fh, "read", None)
+    if read is not None and inspect.iscoroutinefunction(read):
+        chunks = []
+        while True:
+            chunk = await read(chunk_size)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+    return await asyncio.get_running_loop().run_in_executor(executor, read_buffer, fh)
+
+
+class Loader(object):
+    """loads iges files in an executor, at most max_concurrent at a time
+
+    executor: concurrent.futures executor running the parse stages, it
+    must share memory with the loop (threads), None for the loop default
+    further keyword arguments go to Iges, see OPTIONS"""
+
+    def __init__(self, executor=None, max_concurrent=MAX_CONCURRENT, **kwargs):
+        unsupported = sorted(set(kwargs) - set(OPTIONS))
+        if unsupported:
+            raise ValueError("Loader does not support the Iges options %s" % ", ".join(unsupported))
+        self.executor = executor
+        self.max_concurrent = max_concurrent
+        self.kwargs = kwargs
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _semaphore(self):
+        # one per event loop
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphores[loop]
+
+    @staticmethod
+    async def _finish(aw):
+        """result of aw; if cancelled, aw still runs to its end before the
+        CancelledError is raised, so the work in flight keeps its slot"""
+        future = asyncio.ensure_future(aw)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            await asyncio.wait([future])
+            raise
+
+    async def load(self, fh, types=None):
+        """Iges of fh, types: entity type numbers to parse too (True for
+        all Iges.type_parsers)"""
+        loop = asyncio.get_running_loop()
+        kwargs = dict(self.kwargs)
+        cache = kwargs.pop("cache", None)
+        async with self._semaphore():
+            buf = await self._finish(read_async(fh, self.executor))
+            iges = Iges(None, **kwargs)
+            stages = iges._load_stages(buf, cache)
+            done = object()
+            while await self._finish(loop.run_in_executor(self.executor, next, stages, done)) is not done:
+                pass
+            if types is True:
+                types = list(iges.type_parsers)
+            for type_entity_number in types or []:
+                await self._finish(loop.run_in_executor(self.executor, iges.get_type_df, type_entity_number))
+        return iges
+
+
+_LOADER = Loader()
+
+
+async def aload(fh, types=None, loader=None):
+    """Iges of fh loaded without blocking the event loop, see Loader.load
+
+    loader: Loader with the executor and concurrency limit, default one
+    with MAX_CONCURRENT parses in the loop default executor"""
+    return await (loader or _LOADER).load(fh, types)
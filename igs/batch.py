@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+"""parallel loading of many iges files."""
+
+import collections
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from igs.igs import Iges
+
+LoadResult = collections.namedtuple("LoadResult", ["entries", "type_dfs", "errors"])
+
+
+def load_file(path):
+    """entries and type data of one file, or the error message"""
+    try:
+        iges = Iges(path)
+        iges.parse_entries()
+        return path, iges.entries, dict(iges._type_dfs), None
+    except Exception:
+        return path, None, None, traceback.format_exc()
+
+
+def load_many(paths, workers=None):
+    """load many iges files, in a process pool if workers > 1
+
+    returns LoadResult(entries, type_dfs, errors): the entries of all files
+    and per type DataFrames indexed by (source_file, sequence_number), and
+    a dict source_file -> error message of the files that failed"""
+    paths = [str(path) for path in paths]
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(load_file, path) for path in paths]
+            results = []
+            for path, future in zip(paths, futures):
+                try:
+                    results.append(future.result())
+                except Exception:
+                    results.append((path, None, None, traceback.format_exc()))
+    else:
+        results = [load_file(path) for path in paths]
+
+    errors = collections.OrderedDict((path, error) for path, de, type_dfs, error in results if error)
+    loaded = [(path, de, type_dfs) for path, de, type_dfs, error in results if not error]
+    entries = _combine(collections.OrderedDict((path, de) for path, de, type_dfs in loaded))
+    types = sorted(set(n for path, de, type_dfs in loaded for n in type_dfs))
+    type_dfs = dict((n, _combine(collections.OrderedDict((path, dfs[n]) for path, de, dfs in loaded if n in dfs)))
+                    for n in types)
+    return LoadResult(entries, type_dfs, errors)
+
+
+def _combine(dfs):
+    """concat DataFrames keyed by source file"""
+    if not dfs:
+        return pd.DataFrame()
+    non_empty = collections.OrderedDict((key, df) for key, df in dfs.items() if len(df))
+    if not non_empty:
+        key = next(iter(dfs))
+        non_empty[key] = dfs[key]
+    return pd.concat(non_empty, names=["source_file", "sequence_number"])
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+
+"""persistent cache of parsed iges files."""
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+import igs
+
+# layout of the cached state, part of the key
+FORMAT = 2
+# Iges attributes kept in the cache
+STATE = ["_start_section", "_global_section", "_entries", "_tokens", "_type_dfs", "psep", "rsep"]
+
+
+class ParseCache(object):
+    """on-disk cache of parsed files keyed by content hash and library version
+
+    Each entry is one pickle file in directory, the least recently used
+    entries are removed once the directory exceeds max_bytes."""
+
+    def __init__(self, directory, max_bytes=2 ** 30):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def __repr__(self):
+        return "ParseCache(%r, max_bytes=%d)" % (self.directory, self.max_bytes)
+
+    def key(self, buf):
+        """cache key of the file content buf"""
+        digest = hashlib.blake2b(buf, digest_size=20).hexdigest()
+        return "%s-%s-%d" % (digest, igs.__version__, FORMAT)
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    def load(self, key):
+        """cached state of key or None"""
+        path = self.path(key)
+        try:
+            with open(path, "rb") as fh:
+                state = pickle.load(fh)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+        os.utime(path, None) # mark as recently used
+        return state
+
+    def store(self, key, state):
+        """store state and evict the least recently used entries"""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(state, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.path(key))
+        self.evict()
+
+    def entries(self):
+        """(mtime, size, path) of the cache entries, oldest first"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                path = os.path.join(self.directory, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def evict(self, max_bytes=None):
+        """remove the least recently used entries until the cache fits max_bytes"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        size = sum(x[1] for x in entries)
+        for mtime, nbytes, path in entries:
+            if size <= max_bytes:
+                break
+            os.remove(path)
+            size -= nbytes
+
+    def clear(self):
+        self.evict(0)
+
+
+def as_cache(cache):
+    """ParseCache from a ParseCache or a directory"""
+    return cache if isinstance(cache, ParseCache) else ParseCache(cache)
@@ -1,17 +1,102 @@
 # -*- coding: utf-8 -*-
 
-"""Console script for igs."""
-
-# import click
-#
-#
-# @click.command()
-# def main(args=None):
-#     """Console script for igs."""
-#     click.echo("Replace this message by putting your code into "
-#                "igs.cli.main")
-#     click.echo("See click documentation at http://click.pocoo.org/")
-#
-#
-# if __name__ == "__main__":
-#     main()
+"""Console script for igs.
+
+The commands import numpy and pandas only when they need them, "igs info"
+reads the start and global section in pure Python.
+"""
+
+import argparse
+import sys
+
+
+def info(args):
+    """start and global section"""
+    from igs.header import probe
+    start, values, counts = probe(args.file)
+    for line in start:
+        print(line)
+    for name, value in values.items():
+        print("%s: %s" % (name, "" if value is None else value))
+    for code, count in counts.items():
+        print("%s records: %d" % (code, count))
+    return 0
+
+
+def stats(args):
+    """number of entities per entity type"""
+    import numpy as np
+    from igs.sections import fixed_int, read_buffer, split_sections
+    d = split_sections(read_buffer(args.file))["D"]
+    types, counts = np.unique(fixed_int(d[0::2, :8]), return_counts=True)
+    for type_number, count in zip(types.tolist(), counts.tolist()):
+        print("%6d %10d" % (type_number, count))
+    print("%6s %10d" % ("total", counts.sum()))
+    return 0
+
+
+def extract(args):
+    """type data of one entity type as csv, json lines or parquet"""
+    from igs.igs import Iges
+    iges = Iges(args.file)
+    df = iges.get_type_df(args.type, model_space=args.model_space)
+    if df is None:
+        rows = iges.type_rows(args.type)
+        df = iges.entries.iloc[rows]
+    if df.index.name not in df.columns:
+        df = df.reset_index()
+    output = args.output or sys.stdout
+    if args.format == "parquet":
+        if args.output is None:
+            print("parquet needs --output", file=sys.stderr)
+            return 2
+        try:
+            df.to_parquet(args.output, index=False)
+        except ImportError as e:
+            print(e, file=sys.stderr)
+            return 2
+    elif args.format == "json":
+        df.to_json(output, orient="records", lines=True)
+    else:
+        df.to_csv(output, index=False)
+    return 0
+
+
+def validate(args):
+    """check the structure, exit code 1 if there are problems"""
+    from igs.igs import Iges
+    from igs.validate import validate
+    problems = validate(Iges(args.file))
+    for problem in problems:
+        print(problem)
+    if not problems:
+        print("ok")
+    return 1 if problems else 0
+
+
+def parser():
+    p = argparse.ArgumentParser(prog="igs", description="inspect iges files")
+    commands = p.add_subparsers(dest="command")
+    commands.required = True
+    for command in (info, stats, validate):
+        sub = commands.add_parser(command.__name__, help=command.__doc__)
+        sub.add_argument("file")
+        sub.set_defaults(func=command)
+    sub = commands.add_parser("extract", help=extract.__doc__)
+    sub.add_argument("file")
+    sub.add_argument("--type", type=int, required=True, help="entity type number")
+    sub.add_argument("--format", choices=["csv", "json", "parquet"], default="csv")
+    sub.add_argument("--output", "-o", help="output file, default stdout")
+    sub.add_argument("--model-space", action="store_true", help="apply the transformation matrices")
+    sub.set_defaults(func=extract)
+    return p
+
+
+def main(args=None):
+    """Console script for igs."""
+    args = parser().parse_args(args)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+"""entity fingerprints and the changes between revisions of a file."""
+
+import collections
+
+import numpy as np
+
+from igs.sections import fixed_int
+
+# DE pointers of the entities added, removed and changed by a new revision
+Changes = collections.namedtuple("Changes", ["added", "removed", "changed"])
+
+# fixed random weights, fingerprints are comparable between processes
+_WEIGHTS = np.random.RandomState(1).randint(1, 2 ** 63, size=(2, 18), dtype=np.int64).astype(np.uint64) | np.uint64(1)
+_LINE = np.uint64(0x9E3779B97F4A7C15)
+
+
+def fingerprints(d_records, p_records):
+    """64 bit fingerprint of the D and P records of every entity
+
+    Covers both D records except the parameter data pointer and the
+    sequence numbers, and the parameter data columns 1-64 of the P lines
+    in their order; moving an entity in the P section does not change it.
+    Linear hashes of the 8 byte words with random weights, all in wrapping
+    uint64 arithmetic.
+    returns uint64 array, one per D record pair"""
+    n = len(d_records) // 2
+    d = np.ascontiguousarray(d_records[:2 * n, :72]).reshape(n, 144).view(np.uint64).copy()
+    d[:, 1] = 0 # parameter data pointer, columns 9-16
+    fp = d.dot(_WEIGHTS[0])
+    # P lines of every entity from the parameter data pointer and line count
+    first = fixed_int(d_records[0:2 * n:2, 8:16]) - 1
+    count = np.maximum(fixed_int(d_records[1:2 * n:2, 24:32]), 0)
+    count[(first < 0) | (first + count > len(p_records))] = 0
+    offsets = np.cumsum(count) - count
+    position = np.arange(count.sum()) - np.repeat(offsets, count)
+    line = np.repeat(first, count) + position
+    if len(line) == 0:
+        return fp
+    lines = np.ascontiguousarray(p_records[line, :64]).view(np.uint64).dot(_WEIGHTS[1, :8])
+    lines *= position.astype(np.uint64) * np.uint64(2) + np.uint64(1)
+    lines *= _LINE
+    rows = np.flatnonzero(count)
+    fp[rows] += np.add.reduceat(lines, offsets[rows])
+    return fp
+
+
+def compare(old_de, old_fp, new_de, new_fp):
+    """Changes between entities old_de with fingerprints old_fp and new_de
+    with new_fp, entities are matched by DE pointer"""
+    common, old_rows, new_rows = np.intersect1d(old_de, new_de, assume_unique=True, return_indices=True)
+    changed = common[old_fp[old_rows] != new_fp[new_rows]]
+    return Changes(np.setdiff1d(new_de, old_de, assume_unique=True),
+                   np.setdiff1d(old_de, new_de, assume_unique=True),
+                   changed)
@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+
+"""pointer index and entity reference graph."""
+
+import numpy as np
+
+from igs.tokenizer import to_int
+
+# directory entry fields holding pointers, negative values of the fields
+# marked True point to a definition entity, positive values are numbers
+DIRECTORY_POINTERS = [("structure", True),
+                      ("line_font_pattern", True),
+                      ("level", True),
+                      ("view", False),
+                      ("transfromation_matrix", False),
+                      ("label_display_assoc", False),
+                      ("color_number", True)]
+
+
+def pointer_index(sequence_numbers):
+    """lookup array DE pointer -> row position (-1 for no entity)"""
+    sequence_numbers = np.asarray(sequence_numbers, dtype=np.int64)
+    index = np.full(sequence_numbers.max() + 2 if len(sequence_numbers) else 1, -1, dtype=np.int64)
+    index[sequence_numbers] = np.arange(len(sequence_numbers))
+    return index
+
+
+def lookup(index, de_pointers):
+    """row positions of de_pointers, -1 for pointers without an entity"""
+    de_pointers = np.abs(np.asarray(de_pointers, dtype=np.int64))
+    valid = de_pointers < len(index)
+    return np.where(valid, index[np.where(valid, de_pointers, 0)], -1)
+
+
+def _ranges(rows, start, count, step=1):
+    """entity rows and token positions start + step * k for k < count"""
+    rows = np.asarray(rows, dtype=np.int64)
+    count = np.maximum(np.asarray(count, dtype=np.int64), 0)
+    start = np.broadcast_to(start, rows.shape)
+    k = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    return np.repeat(rows, count), np.repeat(start, count) + step * k
+
+
+def _fixed(*positions):
+    """pointers at the same positions in every entity"""
+    def pointers(tokens, forms):
+        rows = np.arange(len(tokens))
+        ones = np.ones(len(tokens), dtype=np.int64)
+        return _concat([_ranges(rows, position, ones) for position in positions])
+    return pointers
+
+
+def _concat(pairs):
+    return np.concatenate([x[0] for x in pairs]), np.concatenate([x[1] for x in pairs])
+
+
+def _list(count_position, first, width=1, offsets=(0,)):
+    """count at count_position, then count items of width tokens from first,
+    the pointers are at offsets within an item"""
+    def pointers(tokens, forms):
+        rows = np.arange(len(tokens))
+        count = to_int(tokens.column(count_position))
+        return _concat([_ranges(rows, first + offset, count, width) for offset in offsets])
+    return pointers
+
+
+def _pointers_143(tokens, forms):
+    """surface and n boundaries"""
+    return _concat([_fixed(2)(tokens, forms), _list(3, 4)(tokens, forms)])
+
+
+def _pointers_144(tokens, forms):
+    """surface, outer boundary and n2 inner boundaries"""
+    rows = np.arange(len(tokens))
+    return _concat([_fixed(1, 4)(tokens, forms), _ranges(rows, 5, to_int(tokens.column(3)))])
+
+
+def _pointers_186(tokens, forms):
+    """shell and void shells"""
+    rows = np.arange(len(tokens))
+    return _concat([_fixed(1)(tokens, forms), _ranges(rows, 4, to_int(tokens.column(3)), 2)])
+
+
+def _pointers_510(tokens, forms):
+    """surface and loops"""
+    rows = np.arange(len(tokens))
+    return _concat([_fixed(1)(tokens, forms), _ranges(rows, 4, to_int(tokens.column(2)))])
+
+
+def _layout_141(t):
+    """pointer positions and end of the parameters of one boundary: surface,
+    model space curves and their parameter space curves"""
+    positions = [3]
+    k = 5
+    for _ in range(int(to_int(t[4:5])[0]) if len(t) > 4 else 0):
+        positions.append(k)
+        n = int(to_int(t[k + 2:k + 3])[0]) if len(t) > k + 2 else 0
+        positions.extend(range(k + 3, k + 3 + n))
+        k += 3 + n
+    return positions, k
+
+
+def _layout_508(t):
+    """pointer positions and end of the parameters of one loop: edge lists
+    and parameter space curves of the loop edges"""
+    positions = []
+    k = 2
+    for _ in range(int(to_int(t[1:2])[0]) if len(t) > 1 else 0):
+        positions.append(k + 1)
+        n = int(to_int(t[k + 4:k + 5])[0]) if len(t) > k + 4 else 0
+        positions.extend(range(k + 6, k + 6 + 2 * n, 2))
+        k += 5 + 2 * n
+    return positions, k
+
+
+def _walk(layout):
+    """pointers of the entities with a per entity layout function"""
+    def pointers(tokens, forms):
+        rows, positions = [], []
+        for i in range(len(tokens)):
+            found = layout(tokens[i])[0]
+            rows.extend([i] * len(found))
+            positions.extend(found)
+        return np.array(rows, dtype=np.int64), np.array(positions, dtype=np.int64)
+    return pointers
+
+
+_pointers_141 = _walk(_layout_141)
+_pointers_508 = _walk(_layout_508)
+
+
+# entity type number -> function(tokens, forms) returning the entity rows
+# (within tokens) and token positions of the parameters holding DE pointers
+POINTER_PARAMETERS = {102: _list(1, 2), # composite curve
+                      108: _fixed(5), # plane, display symbol
+                      118: _fixed(1, 2), # ruled surface
+                      120: _fixed(1, 2), # surface of revolution
+                      122: _fixed(1), # tabulated cylinder
+                      130: _fixed(1, 3), # offset curve
+                      140: _fixed(5), # offset surface
+                      141: _pointers_141, # boundary
+                      142: _fixed(2, 3, 4), # curve on a parametric surface
+                      143: _pointers_143, # bounded surface
+                      144: _pointers_144, # trimmed surface
+                      186: _pointers_186, # manifold solid b-rep object
+                      308: _list(3, 4), # subfigure definition
+                      402: _list(1, 2), # associativity instance (group forms)
+                      408: _fixed(1), # singular subfigure instance
+                      504: _list(1, 2, 5, (0, 1, 3)), # edge list: curve, start and end vertex lists
+                      508: _pointers_508, # loop
+                      510: _pointers_510, # face
+                      514: _list(1, 2, 2), # shell, faces
+                      }
+
+
+def _count(n, count_position=None, width=0):
+    """n parameters plus width per item of the count at count_position"""
+    def count(tokens, forms):
+        if count_position is None:
+            return np.full(len(tokens), n, dtype=np.int64)
+        return n + width * np.maximum(to_int(tokens.column(count_position)), 0)
+    return count
+
+
+def _walk_count(layout):
+    def count(tokens, forms):
+        return np.array([layout(tokens[i])[1] - 1 for i in range(len(tokens))], dtype=np.int64)
+    return count
+
+
+def _count_126(tokens, forms):
+    """K, M, 4 flags, knots, weights, control points, V0, V1 and normal"""
+    k, m = [np.maximum(to_int(tokens.column(p)), 0) for p in (1, 2)]
+    return 6 + (k + m + 2) + 4 * (k + 1) + 5
+
+
+def _count_128(tokens, forms):
+    """K1, K2, M1, M2, 5 flags, knots, weights, control points, U0 .. V1"""
+    k1, k2, m1, m2 = [np.maximum(to_int(tokens.column(p)), 0) for p in (1, 2, 3, 4)]
+    return 9 + (k1 + m1 + 2) + (k2 + m2 + 2) + 4 * (k1 + 1) * (k2 + 1) + 4
+
+
+# entity type number -> function(tokens, forms) returning the number of type
+# specific parameters of every entity; the associativity (NV) and property
+# (NP) pointer blocks follow them
+PARAMETER_COUNTS = {100: _count(7), # circular arc
+                    102: _count(1, 1, 1), # composite curve
+                    108: _count(9), # plane
+                    110: _count(6), # line
+                    116: _count(4), # point
+                    118: _count(4), # ruled surface
+                    120: _count(4), # surface of revolution
+                    122: _count(4), # tabulated cylinder
+                    124: _count(12), # transformation matrix
+                    126: _count_126, # rational b-spline curve
+                    128: _count_128, # rational b-spline surface
+                    141: _walk_count(_layout_141), # boundary
+                    142: _count(5), # curve on a parametric surface
+                    143: _count(3, 3, 1), # bounded surface
+                    144: _count(4, 3, 1), # trimmed surface
+                    186: _count(3, 3, 2), # manifold solid b-rep object
+                    308: _count(3, 3, 1), # subfigure definition
+                    314: _count(4), # color definition
+                    402: _count(1, 1, 1), # associativity instance (group forms)
+                    406: _count(1, 1, 1), # property
+                    408: _count(5), # singular subfigure instance
+                    502: _count(1, 1, 3), # vertex list
+                    504: _count(1, 1, 5), # edge list
+                    508: _walk_count(_layout_508), # loop
+                    510: _count(3, 2, 1), # face
+                    514: _count(1, 1, 2), # shell
+                    }
+
+
+def trailing_pointers(entries, tokens):
+    """rows and flat token indices of the associativity and property
+    pointers after the type specific parameters (NV, NV pointers, NP, NP
+    pointers) of the entities of the types in PARAMETER_COUNTS
+
+    returns (rows, token_index) into entries and tokens.values"""
+    type_numbers = entries.entity_type_number.values
+    forms = entries.form_number.values
+    first = np.full(len(entries), -1, dtype=np.int64) # position of NV
+    for type_entity_number, count in PARAMETER_COUNTS.items():
+        type_rows = np.flatnonzero(type_numbers == type_entity_number)
+        if len(type_rows):
+            first[type_rows] = 1 + count(tokens.take(type_rows), forms[type_rows])
+    counts = tokens.counts
+    rows = np.flatnonzero((first >= 0) & (first < counts))
+    nv = np.maximum(to_int(tokens.values[tokens.indptr[rows] + first[rows]]), 0)
+    np_position = first[rows] + 1 + nv
+    has_np = np_position < counts[rows]
+    np_ = np.zeros(len(rows), dtype=np.int64)
+    np_[has_np] = np.maximum(to_int(tokens.values[tokens.indptr[rows[has_np]] + np_position[has_np]]), 0)
+    block_rows, positions = _concat([_ranges(rows, first[rows] + 1, nv), _ranges(rows, np_position + 1, np_)])
+    valid = positions < counts[block_rows]
+    return block_rows[valid], tokens.indptr[block_rows[valid]] + positions[valid]
+
+
+def pointer_parameters(entries, tokens, types=None):
+    """rows and flat token indices of all parameters holding DE pointers
+
+    returns (rows, token_index) into entries and tokens.values"""
+    type_numbers = entries.entity_type_number.values
+    forms = entries.form_number.values
+    rows, token_index = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    for type_entity_number, extract in (types or POINTER_PARAMETERS).items():
+        type_rows = np.flatnonzero(type_numbers == type_entity_number)
+        if len(type_rows) == 0:
+            continue
+        local, position = extract(tokens.take(type_rows), forms[type_rows])
+        counts = tokens.counts[type_rows[local]]
+        valid = position < counts
+        rows.append(type_rows[local][valid])
+        token_index.append(tokens.indptr[type_rows[local][valid]] + position[valid])
+    return np.concatenate(rows), np.concatenate(token_index)
+
+
+class EntityGraph(object):
+    """entity references as CSR adjacency in both directions
+
+    Queries take and return DE pointers (sequence numbers)."""
+
+    def __init__(self, sequence_numbers, sources, targets):
+        self.sequence_numbers = np.asarray(sequence_numbers, dtype=np.int64)
+        self.index = pointer_index(self.sequence_numbers)
+        n = len(self.sequence_numbers)
+        self.indptr, self.indices = _csr(sources, targets, n)
+        self.rindptr, self.rindices = _csr(targets, sources, n)
+
+    def __repr__(self):
+        return "EntityGraph(entities=%d, edges=%d)" % (len(self.sequence_numbers), len(self.indices))
+
+    def rows(self, de_pointers):
+        return lookup(self.index, np.atleast_1d(de_pointers))
+
+    def _step(self, rows, indptr, indices):
+        rows = rows[rows >= 0]
+        starts, counts = indptr[rows], indptr[rows + 1] - indptr[rows]
+        k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return indices[np.repeat(starts, counts) + k]
+
+    def _walk(self, rows, indptr, indices):
+        seen = np.zeros(len(self.sequence_numbers), dtype=bool)
+        frontier = np.unique(self._step(rows, indptr, indices))
+        while len(frontier):
+            seen[frontier] = True
+            frontier = self._step(frontier, indptr, indices)
+            frontier = np.unique(frontier[~seen[frontier]])
+        return np.flatnonzero(seen)
+
+    def children(self, de_pointers):
+        """entities referenced by de_pointers"""
+        return self.sequence_numbers[np.unique(self._step(self.rows(de_pointers), self.indptr, self.indices))]
+
+    def parents(self, de_pointers):
+        """entities referencing de_pointers"""
+        return self.sequence_numbers[np.unique(self._step(self.rows(de_pointers), self.rindptr, self.rindices))]
+
+    def descendants(self, de_pointers):
+        """entities reachable from de_pointers"""
+        return self.sequence_numbers[self._walk(self.rows(de_pointers), self.indptr, self.indices)]
+
+    def ancestors(self, de_pointers):
+        """entities from which de_pointers are reachable"""
+        return self.sequence_numbers[self._walk(self.rows(de_pointers), self.rindptr, self.rindices)]
+
+    def roots(self):
+        """entities without parents"""
+        return self.sequence_numbers[np.diff(self.rindptr) == 0]
+
+
+def _csr(sources, targets, n):
+    order = np.argsort(sources, kind="stable")
+    indptr = np.r_[0, np.cumsum(np.bincount(sources, minlength=n))].astype(np.int64)
+    return indptr, np.asarray(targets, dtype=np.int64)[order]
+
+
+def build_graph(entries, tokens, directory_pointers=False):
+    """EntityGraph of the parameter pointers of entries, optionally
+    including the pointers of the directory entry fields"""
+    index = pointer_index(entries.index.values)
+    rows, token_index = pointer_parameters(entries, tokens)
+    sources, targets = [rows], [lookup(index, to_int(tokens.values[token_index]))]
+    if directory_pointers:
+        for name, negative in DIRECTORY_POINTERS:
+            values = entries[name].values.astype(np.int64)
+            has = values < 0 if negative else values > 0
+            sources.append(np.flatnonzero(has))
+            targets.append(lookup(index, values[has]))
+    sources, targets = np.concatenate(sources), np.concatenate(targets)
+    valid = targets >= 0
+    return EntityGraph(entries.index.values, sources[valid], targets[valid])
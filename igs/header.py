@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""start and global section without numpy and pandas.
+
+The functions here read only the head of a file and parse single records
+in pure Python, "igs info" uses them to stay fast to start.
+"""
+
+import collections
+import importlib
+import os
+import re
+
+RECORD_LENGTH = 80
+
+# magic bytes of compressed files and the module opening them
+COMPRESSION = [(b"\x1f\x8b", "gzip"), (b"BZh", "bz2"), (b"\xfd7zXZ\x00", "lzma")]
+
+# head of an iges file, see probe
+Probe = collections.namedtuple("Probe", ["start", "values", "counts"])
+
+# name, default, index, type and description of the global parameters
+GLOBAL_PARAMETERS = [
+    ("parameter_delimiter", ",", 1, str, "Parameter delimiter character."),
+    ("record_delimiter", ";", 2, str, "Record delimiter character."),
+    ("product_identification_sender", None, 3, str, "Product identification from sending system"),
+    ("file_name", None, 4, str, "File name"),
+    ("native_system_id", None, 5, str, "Native System ID"),
+    ("preprocessor_version", None, 6, str, "Preprocessor version"),
+    ("int_binary_bits", None, 7, int, "Number of binary bits for integer representation"),
+    ("single_max_power", None, 8, int, "Maximum power of ten representable in a single-precision floating point number on the sending system"),
+    ("single_significant_digits", None, 9, int, "Number of significant digits in a single-precision floating point number on the sending system"),
+    ("double_max_power", None, 10, int, "Maximum power of ten representable in a double-precision floating point number on the sending system"),
+    ("double_significant_digits", None, 11, int, "Number of significant digits in a double-precision floating point number on the sending system"),
+    ("product_identification_receiver", None, 12, str, "Product identification for the receiving system"),
+    ("model_space_scale", None, 13, float, "Model space scale"),
+    ("units_flag", None, 14, int, "Units flag"),
+    ("units_name", None, 15, str, "Units Name"),
+    ("maximum_number_of_line_weight_gradations", None, 16, int, "Maximum number of line weight gradations. Refer to the Directory Entry Parameter 12."),
+    ("width_of_maximum_line_weight_in_units", None, 17, float, "Width of maximum line weight in units. Refer to the Directory Entry Parameter 12 (see Section 2.2.4.4.12) for use of this parameter."),
+    ("datetime_exchange", None, 18, str, "Date and time of exchange file generation 15HYYYYMMDD.HHNNSS or 13HYYMMDD.HHNNSS where: YYYY or YY is 4 or 2 digit year HH is hour (00-23), MM is month (01-12) NN is minute (00-59), DD is day (01-31) SS is second (00-59)"),
+    ("resolution", None, 19, float, "Minimum user-intended resolution or granularity of the model in units specified by Parameter 14."),
+    ("max_coord", None, 20, float, "Approximate maximum coordinate value occurring in the model in units specified by Parameter 14."),
+    ("author", None, 21, str, "Name of author"),
+    ("organization", None, 22, str, "Author’s organization"),
+    ("specification_flag", None, 23, int, "Flag value corresponding to the version of the Specification to which this file complies."),
+    ("drafting_standard_flag", None, 24, int, "Flag value corresponding to the drafting standard to which this file complies, if any."),
+    ("datetime_mod", None, 25, str, "Date and time the model was created or last modified, in same format as field 18."),
+    ("application_protocol", None, 26, str, "Descriptor indicating application protocol, application subset, Mil-specification, or user-defined protocol or subset, if any."),
+]
+
+HOLLERITH = re.compile(r"\s*(\d+)H")
+
+
+def hollerith(token):
+    """content of a Hollerith string constant, other tokens unchanged"""
+    if not token:
+        return None
+    m = HOLLERITH.match(token)
+    if m is None or m.end() + int(m.group(1)) != len(token):
+        return token
+    return token[m.end():]
+
+
+def global_delimiters(text):
+    """parameter and record delimiter declared at the start of the G section"""
+    m = re.match(r"\s*1H(.)", text)
+    psep = m.group(1) if m else ","
+    m = re.match(r"\s*%s\s*1H(.)" % re.escape(psep), text[m.end():] if m else text)
+    rsep = m.group(1) if m else ";"
+    return psep, rsep
+
+
+def split_record(text, psep=",", rsep=";"):
+    """split the parameters of one record into tokens
+
+    Text after the record delimiter is ignored."""
+    if not text.strip():
+        return []
+    tokens = []
+    delimiter = re.compile("[%s]" % re.escape(psep + rsep))
+    pos = 0
+    while pos < len(text):
+        m = HOLLERITH.match(text, pos)
+        if m is not None:
+            end = m.end() + int(m.group(1))
+            tokens.append(text[m.start(1):end])
+            d = delimiter.search(text, end)
+        else:
+            d = delimiter.search(text, pos)
+            tokens.append(text[pos:d.start() if d else len(text)].strip())
+        if d is None or d.group() == rsep:
+            break
+        pos = d.end()
+    else:
+        if text[-1:] == psep:
+            tokens.append("")
+    return tokens
+
+
+def peek(fh, n):
+    """up to n first bytes of a binary file object, fh is not moved"""
+    if hasattr(fh, "peek"):
+        return fh.peek(n)[:n]
+    position = fh.tell()
+    head = fh.read(n)
+    fh.seek(position)
+    return head
+
+
+def decompress(fh):
+    """file object decompressing the gzip, bz2 or xz compressed binary
+    file object fh while it is read, None if fh is not compressed"""
+    head = peek(fh, 6)
+    if not isinstance(head, bytes):
+        return None # text file
+    for magic, name in COMPRESSION:
+        if head.startswith(magic):
+            return importlib.import_module(name).open(fh, "rb")
+    return None
+
+
+def tail(fh, size):
+    """last size bytes of a binary file object, read to its end"""
+    data = b""
+    while True:
+        chunk = fh.read(1 << 20)
+        if not chunk:
+            return data
+        data = (data + chunk)[-size:]
+
+
+def records(fh):
+    """80 column records of a binary file object, with or without line
+    breaks between them"""
+    head = peek(fh, RECORD_LENGTH + 2)
+    if head and b"\n" not in head and b"\r" not in head:
+        while True:
+            record = fh.read(RECORD_LENGTH)
+            if not record:
+                return
+            yield record
+    for line in fh:
+        yield line.rstrip(b"\r\n").ljust(RECORD_LENGTH)
+
+
+def read_header(fh):
+    """S section lines and G section text of an iges file
+
+    Reads up to the first D record. fh: path or binary file object,
+    compressed files are decompressed (see decompress)"""
+    if isinstance(fh, str) or hasattr(fh, "__fspath__"):
+        with open(fh, "rb") as f:
+            return read_header(f)
+    start, data = [], []
+    for record in records(decompress(fh) or fh):
+        code = record[72:73]
+        if code == b"S":
+            start.append(record[:72].decode("latin-1").rstrip())
+        elif code == b"G":
+            data.append(record[:72].decode("latin-1"))
+        elif code in (b"D", b"P", b"T"):
+            break
+    return start, "".join(data)
+
+
+def read_terminate(fh, size=4096):
+    """record counts of the T section {"S": n, "G": n, "D": n, "P": n}
+
+    Reads only the end of the file, empty dict if there is no T record.
+    Compressed files are decompressed to their end.
+    fh: path or seekable binary file object"""
+    if isinstance(fh, str) or hasattr(fh, "__fspath__"):
+        with open(fh, "rb") as f:
+            return read_terminate(f, size)
+    stream = decompress(fh)
+    if stream is not None:
+        return terminate_counts(tail(stream, size))
+    end = fh.seek(0, os.SEEK_END)
+    fh.seek(max(0, end - size))
+    return terminate_counts(fh.read())
+
+
+def terminate_counts(data):
+    """record counts of the last T record in data"""
+    # the T record carries the code at column 73
+    for m in reversed(list(re.finditer(br"S(.{7})G(.{7})D(.{7})P(.{7}).{40}T", data))):
+        try:
+            return dict(zip("SGDP", [int(value) for value in m.groups()]))
+        except ValueError:
+            continue
+    return {}
+
+
+def probe(fh):
+    """start lines, typed global values and section record counts of an
+    iges file, without reading the D and P sections
+
+    returns Probe(start, values, counts), values: {name: value} of the
+    global parameters (see global_values), counts: see read_terminate
+    fh: path or seekable binary file object, compressed files are
+    decompressed, then the time grows with the file size"""
+    if isinstance(fh, str) or hasattr(fh, "__fspath__"):
+        with open(fh, "rb") as f:
+            return probe(f)
+    stream = decompress(fh)
+    start, text = read_header(stream or fh)
+    counts = terminate_counts(tail(stream, 4096)) if stream is not None else read_terminate(fh)
+    return Probe(start, collections.OrderedDict(global_values(text)), counts)
+
+
+def global_values(text):
+    """typed values of the global parameters of the G section text
+
+    returns list of (name, value), Hollerith strings decoded, blank and
+    missing parameters give None"""
+    psep, rsep = global_delimiters(text)
+    tokens = split_record(text, psep, rsep)
+    tokens += [""] * (len(GLOBAL_PARAMETERS) - len(tokens))
+    values = []
+    for (name, default, index, dtype, description), token in zip(GLOBAL_PARAMETERS, tokens):
+        if index <= 2:
+            value = psep if index == 1 else rsep
+        elif not token:
+            value = None
+        elif dtype is str:
+            value = hollerith(token)
+        else:
+            try:
+                value = dtype(float(token.upper().replace("D", "E")))
+            except ValueError:
+                value = token
+        values.append((name, value))
+    return values
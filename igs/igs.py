@@ -2,14 +2,329 @@
 
 """igs module."""
 
+import numpy as np
 import pandas as pd
 import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from igs.cache import STATE, as_cache
+from igs.header import GLOBAL_PARAMETERS, global_delimiters, hollerith
+from igs.instrument import Stats
+from igs.sections import fixed_int, read_buffer, section_text, split_sections
+from igs.tokenizer import Tokens, to_float, to_int, tokenize
 
 if sys.version_info[0] < 3:
     from StringIO import StringIO
 else:
     from io import StringIO
 
+# directory entry fields, two 80 column records with nine 8 character fields each
+DIRECTORY_FIELDS = ["entity_type_number",
+                    "parameter_data",
+                    "structure",
+                    "line_font_pattern",
+                    "level",
+                    "view",
+                    "transfromation_matrix",
+                    "label_display_assoc",
+                    "status_number",
+                    None, # entity type number (repeated)
+                    "line_weight_number",
+                    "color_number",
+                    "parameter_line_count",
+                    "form_number",
+                    None, # reserved
+                    None, # reserved
+                    "entry_label",
+                    "entry_subscript_number",
+                    ]
+# sub-flags of the status number
+STATUS_FIELDS = ["status_blank", "status_subordinate", "status_use", "status_hierarchy"]
+# entries columns
+DIRECTORY_COLUMNS = [y for x in DIRECTORY_FIELDS if x is not None
+                     for y in (STATUS_FIELDS if x == "status_number" else [x])] + ["sequence_number"]
+
+
+def decode_directory(records):
+    """decode D section records in one pass
+
+    records: uint8 array (2*n, 80) of the D section lines
+
+    Integer fields are int32, the status number is split into four int8
+    flags and the entry label is categorical, about 65 bytes per entity
+    with the index; the param_str column is not counted, it adds about 430
+    bytes per entity on test001.iges."""
+    n = len(records) // 2
+    records = records[:2 * n]
+    fields = np.ascontiguousarray(records[:, :72]).reshape(n, 18, 8)
+    columns = dict()
+    for i, name in enumerate(DIRECTORY_FIELDS):
+        if name == "status_number":
+            # digits 1-2 blank, 3-4 subordinate, 5-6 use, 7-8 hierarchy
+            for k, flag in enumerate(STATUS_FIELDS):
+                columns[flag] = fixed_int(fields[:, i, 2 * k:2 * k + 2]).astype(np.int8)
+        elif name == "entry_label":
+            labels = np.ascontiguousarray(fields[:, i]).view("S8").ravel()
+            columns[name] = pd.Categorical(np.char.decode(np.char.strip(labels), "latin-1"))
+        elif name is not None:
+            columns[name] = fixed_int(fields[:, i]).astype(np.int32)
+    columns["sequence_number"] = fixed_int(records[::2, 73:80]).astype(np.int32)
+    de = pd.DataFrame(columns, columns=DIRECTORY_COLUMNS)
+    de.index = de.sequence_number
+    return de
+
+
+def assemble_parameter_data(param_str, de_pointer):
+    """concatenate the P section lines of each entity
+
+    param_str: parameter strings of the P section lines
+    de_pointer: DE pointer of each line (int array)
+    returns Series of parameter data strings indexed by DE pointer"""
+    order = np.argsort(de_pointer, kind="stable")
+    param_str = np.asarray(param_str, dtype=object)[order]
+    de_pointer = np.asarray(de_pointer)[order]
+    first = np.flatnonzero(np.r_[True, de_pointer[1:] != de_pointer[:-1]])
+    # join once, then cut the buffer at the group boundaries
+    offsets = np.r_[0, np.cumsum(np.fromiter(map(len, param_str), dtype=np.int64, count=len(param_str)))]
+    buf = "".join(param_str)
+    bounds = offsets[np.r_[first, len(param_str)]].tolist()
+    values = [buf[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+    return pd.Series(values, index=de_pointer[first], name="param_str")
+
+
+def tokenize_parameter_data(records, de_pointer, sequence_numbers, psep=",", rsep=";"):
+    """tokenize the whole P section at once
+
+    records: uint8 array (n, 80) of the P section lines
+    de_pointer: DE pointer of each line (int array)
+    sequence_numbers: DE sequence numbers the result is aligned to
+    returns Tokens with one entity per sequence number"""
+    order = np.argsort(de_pointer, kind="stable")
+    if (order == np.arange(len(order))).all():
+        data = np.ascontiguousarray(records[:, :64]).tobytes()
+    else:
+        data = np.ascontiguousarray(records[order, :64]).tobytes()
+        de_pointer = de_pointer[order]
+    first = np.flatnonzero(np.r_[True, de_pointer[1:] != de_pointer[:-1]])
+    tokens = tokenize(data, np.r_[first, len(de_pointer)] * 64, psep, rsep)
+    rows = pd.Index(de_pointer[first]).get_indexer(sequence_numbers)
+    if len(rows) == len(tokens) and (rows == np.arange(len(rows))).all():
+        return tokens
+    return tokens.take(rows)
+
+
+# entity type number -> parser(entries, tokens, psep) returning the type
+# DataFrame, see register_parser
+TYPE_PARSERS = dict()
+
+
+def register_parser(type_entity_number, parser=None):
+    """register parser(entries, tokens, psep) for an entity type, replacing
+    the parser registered before; without parser a decorator
+
+    The parser gets the rows of Iges.entries of the type and their Tokens
+    and returns a DataFrame with the index of the entries, vectorized over
+    the rows. Parsers given to processes (Iges(workers=n)) must be module
+    level functions."""
+    if parser is None:
+        return lambda parser: register_parser(type_entity_number, parser)
+    TYPE_PARSERS[type_entity_number] = parser
+    return parser
+
+
+def group_rows(keys):
+    """rows of every key in one stable sort, dict key -> row array"""
+    keys = np.asarray(keys)
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]]) if len(keys) else np.empty(0, int)
+    return dict(zip(sorted_keys[starts].tolist(), np.split(order, starts[1:])))
+
+
+def _columns(tokens, columns, convert, first=1):
+    """DataFrame data of consecutive parameters"""
+    return dict((name, convert(tokens.column(k))) for k, name in enumerate(columns, first))
+
+
+def _members(tokens, count_position=1):
+    """tuples of the DE pointers following a count parameter"""
+    n = to_int(tokens.column(count_position))
+    start = count_position + 1
+    return n, [tuple(to_int(tokens[i][start:start + k]).tolist()) for i, k in enumerate(n.tolist())]
+
+
+@register_parser(100)
+def parse_100(de, tokens, psep=","):
+    """4.3 Circular Arc Entity (Type 100)
+
+    z displacement, center, start and end point in definition space"""
+    columns = ["zt", "x1", "y1", "x2", "y2", "x3", "y3"]
+    return pd.DataFrame(_columns(tokens, columns, to_float), index=de.index, columns=columns)
+
+
+@register_parser(102)
+def parse_102(de, tokens, psep=","):
+    """4.4 Composite Curve Entity (Type 102)
+
+    number and DE pointers of the member curves"""
+    n, members = _members(tokens)
+    return pd.DataFrame({"n": n, "members": members}, index=de.index, columns=["n", "members"])
+
+
+@register_parser(110)
+def parse_110(de, tokens, psep=","):
+    """4.14 Line Entity (Type 110)"""
+    columns = ["x1", "y1", "z1", "x2", "y2", "z2"]
+    return pd.DataFrame(dict((name, to_float(tokens.column(k))) for k, name in enumerate(columns, 1)),
+                        index=de.index, columns=columns)
+
+
+@register_parser(116)
+def parse_116(de, tokens, psep=","):
+    """4.15 Point Entity (Type 116)
+
+    coordinates and DE pointer of the display symbol (ptr)"""
+    dfe = pd.DataFrame(_columns(tokens, ["x", "y", "z"], to_float), index=de.index, columns=["x", "y", "z"])
+    dfe["ptr"] = to_int(tokens.column(4))
+    return dfe
+
+
+@register_parser(124)
+def parse_124(de, tokens, psep=","):
+    """4.21 Transformation Matrix Entity (Type 124)
+
+    rotation R and translation T, see igs.transform for the arrays"""
+    columns = ["r11", "r12", "r13", "t1", "r21", "r22", "r23", "t2", "r31", "r32", "r33", "t3"]
+    return pd.DataFrame(_columns(tokens, columns, to_float), index=de.index, columns=columns)
+
+
+@register_parser(126)
+def parse_126(de, tokens, psep=","):
+    """4.23 Rational B-Spline Curve Entity (Type 126)
+
+    degree, properties and parameter range, the knots, weights and control
+    points are in Iges.bspline_curves"""
+    k = to_int(tokens.column(1))
+    m = to_int(tokens.column(2))
+    columns = ["k", "m", "planar", "closed", "polynomial", "periodic"]
+    dfe = pd.DataFrame(dict((name, to_int(tokens.column(i))) for i, name in enumerate(columns, 1)),
+                       index=de.index, columns=columns)
+    # V0, V1 and the unit normal of planar curves follow the control points
+    tail = tokens.slice(13 + 5 * k + m, 5)
+    for i, name in enumerate(["v0", "v1", "xnorm", "ynorm", "znorm"]):
+        dfe[name] = to_float(tail.column(i))
+    return dfe
+
+
+@register_parser(128)
+def parse_128(de, tokens, psep=","):
+    """4.24 Rational B-Spline Surface Entity (Type 128)
+
+    degrees, properties and parameter ranges, the knots, weights and
+    control points are in igs.nurbs.parse_128_arrays"""
+    k1, k2, m1, m2 = [to_int(tokens.column(i)) for i in range(1, 5)]
+    columns = ["k1", "k2", "m1", "m2", "closed_u", "closed_v", "polynomial", "periodic_u", "periodic_v"]
+    dfe = pd.DataFrame(dict((name, to_int(tokens.column(i))) for i, name in enumerate(columns, 1)),
+                       index=de.index, columns=columns)
+    # U0, U1, V0, V1 follow the knots, weights and control points
+    count = (k1 + 1) * (k2 + 1)
+    tail = tokens.slice(10 + (k1 + m1 + 2) + (k2 + m2 + 2) + 4 * count, 4)
+    for i, name in enumerate(["u0", "u1", "v0", "v1"]):
+        dfe[name] = to_float(tail.column(i))
+    return dfe
+
+
+@register_parser(142)
+def parse_142(de, tokens, psep=","):
+    """4.33 Curve on a Parametric Surface Entity (Type 142)
+
+    creation type, DE pointers of the surface (sptr), the parameter space
+    curve (bptr) and the model space curve (cptr), preferred one (pref)"""
+    columns = ["crtn", "sptr", "bptr", "cptr", "pref"]
+    return pd.DataFrame(_columns(tokens, columns, to_int), index=de.index, columns=columns)
+
+
+@register_parser(144)
+def parse_144(de, tokens, psep=","):
+    """4.34 Trimmed (Parametric) Surface Entity (Type 144)
+
+    DE pointers of the surface (ptr), outer (pto) and inner boundaries (pti)"""
+    columns = ['entity_number', 'ptr', 'n1', 'n2', 'pto']
+    dfe = pd.DataFrame(dict((name, to_int(tokens.column(k))) for k, name in enumerate(columns)),
+                       index=de.index, columns=columns)
+    dfe["pti"] = [tuple(to_int(tokens[i][5:5 + k]).tolist()) for i, k in enumerate(dfe.n2.tolist())]
+    return dfe
+
+
+@register_parser(314)
+def parse_314(de, tokens, psep=","):
+    """4.77 Color Definition Entity (Type 314)
+
+    red, green and blue in percent and the color name"""
+    dfe = pd.DataFrame(_columns(tokens, ["cc1", "cc2", "cc3"], to_float), index=de.index,
+                       columns=["cc1", "cc2", "cc3"])
+    dfe["cname"] = [hollerith(x) for x in tokens.column(4).tolist()]
+    return dfe
+
+
+@register_parser(402)
+def parse_402(de, tokens, psep=","):
+    """4.81  Associativity Instance Entity (Type 402)
+
+    group forms (1, 7, 14, 15): number and DE pointers of the members"""
+    n, members = _members(tokens)
+    return pd.DataFrame({"n": n, "members": members}, index=de.index, columns=["n", "members"])
+
+
+@register_parser(406)
+def parse_406(de, tokens, psep=","):
+    """4.98 Property Entity (Type 406)
+
+    form number, number of property values and the values, Hollerith
+    strings decoded, e.g. the name of form 15"""
+    n = to_int(tokens.column(1))
+    values = [tuple(hollerith(x) for x in tokens[i][2:2 + k]) for i, k in enumerate(n.tolist())]
+    return pd.DataFrame({"form": de.form_number.values, "n": n, "values": values}, index=de.index,
+                        columns=["form", "n", "values"])
+
+
+def parse_parameters(de, p_records, psep=",", rsep=";"):
+    """add the param_str column to the entries de, returns the Tokens of
+    the P lines p_records (n, 80)"""
+    de_pointer = fixed_int(p_records[:, 65:72])
+    param_str = assemble_parameter_data(section_text(p_records, 0, 65), de_pointer)
+    de["param_str"] = param_str.reindex(de.index)
+    return tokenize_parameter_data(p_records, de_pointer, de.index.values, psep, rsep)
+
+
+def parse_chunk(d_records, p_records, psep=",", rsep=";", type_parsers=None):
+    """DE PD raw data and, for type_parsers, type data of a chunk of entities
+
+    d_records, p_records: uint8 arrays (n, 80) of the D and P lines of the chunk
+    returns entries, Tokens and dict entity type number -> DataFrame"""
+    de = decode_directory(d_records)
+    tokens = parse_parameters(de, p_records, psep, rsep)
+    type_dfs = dict()
+    groups = group_rows(de.entity_type_number.values)
+    empty = np.empty(0, dtype=np.int64)
+    for type_entity_number, parser in (type_parsers or dict()).items():
+        rows = groups.get(type_entity_number, empty)
+        type_dfs[type_entity_number] = parser(de.iloc[rows], tokens.take(rows), psep)
+    return de, tokens, type_dfs
+
+
+def split_chunks(d_records, p_records, n):
+    """split the D and P records into n chunks on entity boundaries"""
+    bounds = np.linspace(0, len(d_records) // 2, n + 1).astype(np.int64) * 2
+    de_pointer = fixed_int(p_records[:, 65:72])
+    chunks = []
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        if stop > start:
+            lines = (de_pointer > start) & (de_pointer <= stop)
+            chunks.append((d_records[start:stop], p_records[lines]))
+    return chunks
+
+
 class Iges():
     """iges object"""
     line_font_pattern = {None: 'Default',
@@ -19,228 +334,442 @@ class Iges():
                          3: 'Phantom',
                          4: 'Centerline',
                          5: 'Dotted'}
-
-    def __init__(self, fh):
-
-        self.df_raw = None
+    # entity type number -> parser(entries, tokens, psep) returning the type
+    # DataFrame, the registry of register_parser
+    type_parsers = TYPE_PARSERS
+
+    def __init__(self, fh, workers=None, cache=None, hooks=None, memory=False, lazy=False, save_index=False):
+        """fh: path, bytes or file object of the iges file
+        workers: processes for the DE PD parsing
+        cache: igs.cache.ParseCache or directory of parsed files
+        hooks: functions called with the igs.instrument.Stage of every
+        parse stage, see stats
+        memory: trace the peak memory of the stages in __init__ with
+        tracemalloc, not measured if tracemalloc already traces
+        lazy: read only the start and global section and the record index
+        (see igs.index), get_entity reads single entities, the entries are
+        loaded on first access; not with cache
+        save_index: with lazy, save the record index next to the file, fh
+        must be a path"""
+
+        self._sections = dict()
         self._entries = None
+        self._tokens = None
         self._global_section = None
+        self._termination_section = None # parsed on first access
         self.psep = "," # parameter_delimiter
         self.rsep = ";" # record delimiter
         self._type_dfs = dict()
-
+        self._type_groups = None # (entries, rows per entity type), see type_groups
+        self._graph = None
+        self._spatial_index = None
+        self._transforms = None
+        self._fingerprints = None # of the D and P records, see update
+        self._buffer = None # file content of a lazy Iges
+        self._index = None # igs.index.RecordIndex of a lazy Iges
+        self.workers = workers # processes for the DE PD parsing
+        self._stats = Stats(hooks)
+
+        if lazy and cache is not None:
+            raise ValueError("a lazy Iges does not use the parse cache")
         if fh:
-            # pd.read_fwf won't work because it removes leading whitespaces
-            df = pd.read_csv(fh, header=None, index_col=None, usecols=[0], dtype=str, sep="|")
-            self.df_raw = pd.DataFrame.from_dict({"data":df[0].str[:72],
-                                    "section_code":df[0].str[72:73],
-                                    "sequence_number":df[0].str[73:80]})
+            import tracemalloc
+            memory = memory and not tracemalloc.is_tracing()
+            if memory:
+                tracemalloc.start()
+                self._stats.memory = True
+            try:
+                if lazy:
+                    self._open_lazy(fh, save_index)
+                else:
+                    self._load(fh, cache)
+            finally:
+                if memory:
+                    self._stats.memory = False
+                    tracemalloc.stop()
+
+    def _open_lazy(self, fh, save_index=False):
+        """S and G section and the record index of fh, the index of a file
+        object or bytes is built in memory"""
+        from igs.index import open_index
+        with self._stats.stage("read"):
+            self._buffer = read_buffer(fh)
+        path = fh if isinstance(fh, str) or hasattr(fh, "__fspath__") else None
+        with self._stats.stage("index") as stage:
+            self._index = open_index(path, self._buffer, save_index)
+            stage["entities"] = len(self._index.d_offsets) // 2
+        head = self._index.d_offsets[0] if len(self._index.d_offsets) else len(self._buffer)
+        self._sections = split_sections(self._buffer[:head])
+        # the last P record and the T section
+        tail = self._index.p_offsets[-1] if len(self._index.p_offsets) else head
+        self._sections["T"] = split_sections(self._buffer[tail:])["T"]
+        with self._stats.stage("start"):
+            self.parse_start_section()
+        with self._stats.stage("global"):
+            self.parse_global_section()
+
+    def _load_lazy(self):
+        """entries and tokens of a lazy Iges"""
+        if self._entries is None and self._index is not None:
+            with self._stats.stage("read"):
+                self._sections = split_sections(self._buffer)
+            self.read_data_entries()
+
+    def _load(self, fh, cache):
+        for _ in self._load_stages(fh, cache):
+            pass
+
+    def _load_stages(self, fh, cache):
+        """load fh in stages, the generator pauses between them (see igs.aio)"""
+        with self._stats.stage("read"):
+            buf = read_buffer(fh)
+            # S, G, D, P, T records as (n, 80) views of the file buffer
+            self._sections = split_sections(buf)
+        yield
+        if cache is not None:
+            with self._stats.stage("cache") as stage:
+                cache = as_cache(cache)
+                key = cache.key(buf)
+                state = cache.load(key)
+                if state is not None:
+                    self.__dict__.update(state)
+                    stage["entities"] = len(self._entries)
+                    return
+            yield
+        with self._stats.stage("start"):
             self.parse_start_section() # S
-            self.parse_global_section() # G
-            self.read_data_entries() # DE PD raw data
-            self.parse_entries() # DE PD type data
-
-    def get_type_df(self, type_entity_number):
-        return self._type_dfs.get(type_entity_number)
+        self.read_data_entries() # G, DE PD raw data
+        yield
+        # DE PD type data is parsed on first request, see get_type_df
+        if cache is not None:
+            for type_entity_number in self.type_parsers:
+                self.get_type_df(type_entity_number)
+                yield
+            with self._stats.stage("cache store", len(self._entries)):
+                cache.store(key, dict((name, getattr(self, name)) for name in STATE))
+
+    @staticmethod
+    def stream(path, batch_size=None):
+        """iterate over the entities of path without loading the file,
+        see igs.stream.iter_entities"""
+        from igs.stream import iter_entities
+        return iter_entities(path, batch_size=batch_size)
+
+    def get_type_df(self, type_entity_number, model_space=False):
+        """type data of entity type type_entity_number, parsed on first request
+
+        model_space: return a copy with the coordinates transformed by the
+        transformation matrices (type 124) of the entities (igs.transform.
+        POINT_COLUMNS and VECTOR_COLUMNS); ValueError for transformed
+        entities of igs.transform.PLANAR_TYPES"""
+        if type_entity_number not in self._type_dfs and type_entity_number in self.type_parsers:
+            self.parse_type(type_entity_number)
+        df = self._type_dfs.get(type_entity_number)
+        if model_space and df is not None:
+            from igs.transform import PLANAR_TYPES, POINT_COLUMNS, VECTOR_COLUMNS, to_model_space
+            target, matrices = self.transforms
+            target = target[self.entries.index.get_indexer(df.index)]
+            if type_entity_number in PLANAR_TYPES and (target >= 0).any():
+                raise ValueError("type %d entities with a transformation matrix have no model space columns, "
+                                 "use get_type_df(%d) and iges.transforms" % (type_entity_number, type_entity_number))
+            df = to_model_space(df, target, matrices,
+                                POINT_COLUMNS.get(type_entity_number, ()),
+                                VECTOR_COLUMNS.get(type_entity_number, ()))
+        return df
 
     def set_type_df(self, type_entity_number, df):
         self._type_dfs[type_entity_number] = df
 
+    def invalidate_type_df(self, type_entity_number=None):
+        """evict the cached type data of one or (None) all entity types"""
+        if type_entity_number is None:
+            self._type_dfs.clear()
+        else:
+            self._type_dfs.pop(type_entity_number, None)
+
     def info(self):
         print(self.entries.head())
         print(self.entries.tail())
 
     def parse_entries(self):
-        self.parse_type_110()
-        self.parse_type_144()
-        self.parse_type_402()
+        """parse all entity types with a registered parser, every parser
+        gets the block of its type from type_groups"""
+        for type_entity_number in self.type_parsers:
+            self.get_type_df(type_entity_number)
 
     @property
     def entries(self):
+        self._load_lazy()
         return self._entries
 
+    @property
+    def tokens(self):
+        """parameter tokens of all entries (igs.tokenizer.Tokens)"""
+        self._load_lazy()
+        return self._tokens
+
+    def get_entity(self, de_pointer, subtree=False):
+        """entries and tokens of the entity de_pointer, with subtree also of
+        all entities it references (see graph.descendants)
+
+        A lazy Iges reads just the records of these entities from the file.
+        returns (entries DataFrame, Tokens) in DE pointer order"""
+        if self._entries is None and self._index is not None:
+            from igs.index import read_entities, read_subtree
+            read = read_subtree if subtree else read_entities
+            return read(self._buffer, self._index, [de_pointer], self.psep, self.rsep)
+        de_pointers = np.array([abs(de_pointer)])
+        if subtree:
+            de_pointers = np.union1d(de_pointers, self.graph.descendants(de_pointers))
+        rows = self.entries.index.get_indexer(de_pointers)
+        if (rows < 0).any():
+            raise KeyError("no entity with DE pointer %s" % de_pointers[rows < 0].tolist())
+        return self.entries.iloc[rows], self.tokens.take(rows)
+
+    @property
+    def graph(self):
+        """references between the entries by DE pointer, built on first
+        request, see igs.graph.EntityGraph"""
+        if self._graph is None:
+            from igs.graph import build_graph
+            self._graph = build_graph(self.entries, self.tokens)
+        return self._graph
+
+    @property
+    def transforms(self):
+        """matrix row of every entry (-1 for none) and the composed model
+        space matrices (n, 3, 4) of the type 124 entities, see
+        igs.transform.entity_transforms"""
+        if self._transforms is None:
+            from igs.transform import entity_transforms
+            self._transforms = entity_transforms(self.entries, self.tokens)
+        return self._transforms
+
+    def bspline_curves(self, model_space=False):
+        """all rational b-spline curves (type 126) as igs.nurbs.BSplineCurves
+        for batch evaluation
+
+        model_space: transform the control points by the transformation
+        matrices of the curves"""
+        from igs.nurbs import parse_126_arrays
+        rows = self.type_rows(126)
+        curves = parse_126_arrays(self.entries.iloc[rows], self.tokens.take(rows))
+        if model_space:
+            from igs.transform import apply_points
+            target, matrices = self.transforms
+            target = np.repeat(target[self.entries.index.get_indexer(curves.sequence_numbers)], curves.count)
+            moved = np.flatnonzero(target >= 0)
+            curves.points[moved] = apply_points(matrices[target[moved]], curves.points[moved])
+        return curves
+
+    def tessellate(self, resolution=16, workers=None):
+        """triangle mesh of all surfaces, trimmed surfaces and b-rep faces,
+        see igs.tessellate.tessellate"""
+        from igs.tessellate import tessellate
+        return tessellate(self.entries, self.tokens, resolution, workers or self.workers)
+
+    def write(self, fh, entries=None, type_dfs=None, model_space=False):
+        """write the entries, or a subset of them, as iges file,
+        see igs.writer.write"""
+        from igs.writer import write
+        write(self, fh, entries, type_dfs, model_space)
+
+    def bounding_boxes(self, types=None):
+        """axis aligned boxes of the curve and point entities,
+        see igs.spatial.bounding_boxes"""
+        from igs.spatial import bounding_boxes
+        return bounding_boxes(self.entries, self.tokens, self.graph, types)
+
+    @property
+    def spatial_index(self):
+        """igs.spatial.GridIndex over bounding_boxes() with DE pointers as ids,
+        built on first request"""
+        if self._spatial_index is None:
+            from igs.spatial import BOX_COLUMNS, GridIndex
+            boxes = self.bounding_boxes()
+            self._spatial_index = GridIndex(boxes[BOX_COLUMNS].values, boxes.index.values)
+        return self._spatial_index
+
+    def update(self, fh):
+        """re-parse a new revision of the file
+
+        Entities are matched by DE pointer, those with unchanged D and P
+        records (see igs.diff.fingerprints) keep their entries, tokens and
+        type data rows, only added and changed entities are tokenized and
+        type parsed. The old revision is fingerprinted from its records, so
+        its file must not be overwritten in place before the first update.
+        returns igs.diff.Changes(added, removed, changed) of DE pointers"""
+        from igs.diff import compare, fingerprints
+        old_entries, old_tokens, delimiters = self.entries, self.tokens, (self.psep, self.rsep)
+        old_fp = self._fingerprints
+        if old_fp is None:
+            old_fp = fingerprints(self._sections["D"], self._sections["P"])
+        with self._stats.stage("read"):
+            self._sections = split_sections(read_buffer(fh))
+            self._termination_section = None
+        with self._stats.stage("start"):
+            self.parse_start_section()
+        with self._stats.stage("global"):
+            self.parse_global_section()
+        count = len(self._sections["D"]) // 2
+        with self._stats.stage("fingerprints", count):
+            self._fingerprints = fingerprints(self._sections["D"], self._sections["P"])
+        with self._stats.stage("directory", count):
+            de = decode_directory(self._sections["D"])
+        changes = compare(old_entries.index.values, old_fp, de.index.values, self._fingerprints)
+        if delimiters != (self.psep, self.rsep):
+            changes = changes._replace(changed=np.intersect1d(old_entries.index.values, de.index.values))
+
+        fresh = de.index.isin(np.r_[changes.added, changes.changed])
+        fresh_rows, kept_rows = np.flatnonzero(fresh), np.flatnonzero(~fresh)
+        old_rows = old_entries.index.get_indexer(de.index.values[kept_rows])
+        with self._stats.stage("parameters", len(fresh_rows)):
+            sub = de.iloc[fresh_rows].copy()
+            first, lines = sub.parameter_data.values - 1, sub.parameter_line_count.values
+            offsets = np.cumsum(lines) - lines
+            p_rows = np.repeat(first, lines) + np.arange(lines.sum()) - np.repeat(offsets, lines)
+            tokens = parse_parameters(sub, self._sections["P"][p_rows], self.psep, self.rsep)
+        # kept rows first, then the fresh ones, back in file order
+        order = np.empty(len(de), dtype=np.int64)
+        order[kept_rows] = np.arange(len(kept_rows))
+        order[fresh_rows] = len(kept_rows) + np.arange(len(fresh_rows))
+        self._tokens = Tokens.concat([old_tokens.take(old_rows), tokens]).take(order)
+        de["param_str"] = np.concatenate([old_entries.param_str.values[old_rows], sub.param_str.values])[order]
+        self._entries = de
+
+        old_dfs, self._type_dfs = self._type_dfs, dict()
+        kept = de.index.values[kept_rows]
+        for type_entity_number, old_df in old_dfs.items():
+            parser = self.type_parsers.get(type_entity_number)
+            if parser is None:
+                continue
+            rows = np.flatnonzero((de.entity_type_number.values == type_entity_number) & fresh)
+            with self._stats.stage("type %d" % type_entity_number, len(rows)):
+                df = parser(de.iloc[rows], self._tokens.take(rows), self.psep)
+            dfs = [old_df[old_df.index.isin(kept)], df]
+            df = pd.concat([x for x in dfs if len(x)] or dfs[1:])
+            self.set_type_df(type_entity_number, df.loc[de.index.values[self.type_rows(type_entity_number)]])
+        self._graph = self._spatial_index = self._transforms = None
+        return changes
+
+    @property
+    def stats(self):
+        """igs.instrument.Stage records of the parse stages so far (name,
+        seconds, entities, memory), pd.DataFrame(iges.stats) for a table"""
+        return list(self._stats.stages)
+
+    @property
+    def type_groups(self):
+        """entity type number -> row positions of its entries, grouped in
+        one pass and kept until the entries change"""
+        entries = self.entries
+        if self._type_groups is None or self._type_groups[0] is not entries:
+            self._type_groups = (entries, group_rows(entries.entity_type_number.values))
+        return self._type_groups[1]
+
+    def type_rows(self, type_entity_number):
+        """row positions of the entries of one entity type"""
+        return self.type_groups.get(type_entity_number, np.empty(0, dtype=np.int64))
+
+    @property
+    def df_raw(self):
+        """all records as DataFrame (data, section_code, sequence_number)"""
+        return pd.concat([self.section_frame(code) for code in self._sections], ignore_index=True)
+
+    def section_frame(self, section_code):
+        """records of one section as DataFrame"""
+        records = self._sections.get(section_code)
+        if records is None:
+            return pd.DataFrame(columns=["data", "section_code", "sequence_number"])
+        width = np.ascontiguousarray(records[:, :72]).view("S72").ravel()
+        return pd.DataFrame({"data": np.char.decode(width, "latin-1"),
+                             "section_code": section_code,
+                             "sequence_number": fixed_int(records[:, 73:80])})
+
     @property
     def global_section(self):
         return self._global_section
 
     @property
     def start_section(self):
-        return self.start_section
+        return self._start_section
 
     @property
     def termination_section(self):
-        return self.termination_section
+        """T section records as DataFrame, parsed on first access"""
+        if self._termination_section is None:
+            self.parse_termination_section()
+        return self._termination_section
 
     def parse_start_section(self):
-        self._start_section = self.df_raw[self.df_raw["section_code"] == "S"]
+        self._start_section = self.section_frame("S")
 
     def parse_termination_section(self):
-        self._termination_section = self.df_raw[self.df_raw["section_code"] == "T"]
+        self._termination_section = self.section_frame("T")
 
     def parse_global_section(self):
-        self._global_section = pd.DataFrame(
-            [
-            ["parameter_delimiter", ",",  1, str, "Parameter delimiter character."],
-            ["record_delimiter", ";",  2, str, "Record delimiter character."],
-            ["product_identification_sender", None,  3, str, "Product identification from sending system"],
-            ["file_name", None,  4, str, "File name"],
-            ["native_system_id", None,  5, str, "Native System ID"],
-            ["preprocessor_version", None,  6, str, "Preprocessor version"],
-            ["int_binary_bits", None,  7, int, "Number of binary bits for integer representation"],
-            ["single_max_power", None,  8, int, "Maximum power of ten representable in a single-precision floating point number on the sending system"],
-            ["single_significant_digits", None,  9, int, "Number of significant digits in a single-precision floating point number on the sending system"],
-            ["double_max_power", None, 10, int, "Maximum power of ten representable in a double-precision floating point number on the sending system"],
-            ["double_significant_digits", None, 11, int, "Number of significant digits in a double-precision floating point number on the sending system"],
-            ["product_identification_receiver", None, 12, str, "Product identification for the receiving system"],
-            ["model_space_scale", None, 13, float, "Model space scale"],
-            ["units_flag", None, 14, int, "Units flag"],
-            ["units_name", None, 15, str, "Units Name"],
-            ["maximum_number_of_line_weight_gradations", None, 16, int, "Maximum number of line weight gradations. Refer to the Directory Entry Parameter 12."],
-            ["width_of_maximum_line_weight_in_units", None, 17, float, "Width of maximum line weight in units. Refer to the Directory Entry Parameter 12 (see Section 2.2.4.4.12) for use of this parameter."],
-            ["datetime_exchange", None, 18, str, "Date and time of exchange file generation 15HYYYYMMDD.HHNNSS or 13HYYMMDD.HHNNSS where: YYYY or YY is 4 or 2 digit year HH is hour (00-23), MM is month (01-12) NN is minute (00-59), DD is day (01-31) SS is second (00-59)"],
-            ["resolution", None, 19, float, "Minimum user-intended resolution or granularity of the model in units specified by Parameter 14."],
-            ["max_coord", None, 20, float, "Approximate maximum coordinate value occurring in the model in units specified by Parameter 14."],
-            ["author", None, 21, str, "Name of author"],
-            ["organization", None, 22, str, "Author’s organization"],
-            ["specification_flag", None, 23, int, "Flag value corresponding to the version of the Specification to which this file complies."],
-            ["drafting_standard_flag", None, 24, int, "Flag value corresponding to the drafting standard to which this file complies, if any."],
-            ["datetime_mod", None, 25, str, "Date and time the model was created or last modified, in same format as field 18."],
-            ["application_protocol", None, 26, str, "Descriptor indicating application protocol, application subset, Mil-specification, or user-defined protocol or subset, if any."],
-            ]
-            , columns=["name", "value", "index", "dtype", "description"])
+        self._global_section = pd.DataFrame(GLOBAL_PARAMETERS,
+                                            columns=["name", "value", "index", "dtype", "description"])
         self._global_section.index = self._global_section.name
 
-        df = self.df_raw[self.df_raw["section_code"] == "G"]
-        param_str = df['data']#.str[:65]
-        param_str = "".join(param_str.str.strip().values)
-        record_delimiter = self._global_section.loc["record_delimiter"].value
-        parameter_delimiter = self._global_section.loc["parameter_delimiter"].value
-        records = param_str.split(record_delimiter)
-        entries = [x.strip() or None for x in records[0].split(parameter_delimiter)]
+        data = np.ascontiguousarray(self._sections["G"][:, :72]).tobytes()
+        self.psep, self.rsep = global_delimiters(data.decode("latin-1"))
+        entries = [x or None for x in tokenize(data, [0, len(data)], self.psep, self.rsep)[0]]
+        entries[:2] = [self.psep, self.rsep]
         s = pd.Series(entries, index=self._global_section.name.values[:len(entries)])
-        self._global_section["value"].update(s)
+        self._global_section.update({"value": s})
 
     def read_data_entries(self):
         """parse iges structure"""
-        self.parse_global_section()
-
-        df = self.df_raw[self.df_raw["section_code"] == "D"]
-        entry_list = []
-        columns = ["entity_type_number",
-                   "parameter_data",
-                   "structure",
-                   "line_font_pattern",
-                   "level",
-                   "view",
-                   "transfromation_matrix",
-                   "label_display_assoc",
-                   "status_number",
-                   "line_weight_number",
-                   "color_number",
-                   "parameter_line_count",
-                   "form_number",
-                   "entry_label",
-                   "entry_subscript_number",
-                   "sequence_number",
-                   ]
-        for i in range(len(df) // 2):
-            row0 = df.iloc[i * 2]
-            row1 = df.iloc[i * 2 + 1]
-            s1 = entity_type_number = row0["data"][:8]
-            s2 = parameter_data = row0["data"][8:16]
-            s3 = structure = row0["data"][16:24]
-            s4 = line_font_pattern = row0["data"][24:32]
-            s5 = level = row0["data"][32:40]
-            s6 = view = row0["data"][40:48]
-            s7 = transfromation_matrix = row0["data"][48:56]
-            s8 = label_display_assoc = row0["data"][56:64]
-            s9 = status_number = row0["data"][64:72]
-            s10 = sequence_number = row0.sequence_number #row0["data"][72:80]
-            s11 = entity_type_number_ = row1["data"][:8]
-            s12 = line_weight_number = row1["data"][8:16]
-            s13 = color_number = row1["data"][16:24]
-            s14 = parameter_line_count = row1["data"][24:32]
-            s15 = form_number = row1["data"][32:40]
-            s16 = row1["data"][40:48]
-            s17 = row1["data"][48:56]
-            s18 = entry_label = row1["data"][56:64]
-            s19 = entry_subscript_number = row1["data"][64:72]
-            # s20 = row1["data"][72:80]
-            # print(iges_entity_type_number, iges_entity_type_number_)
-            # if entity_type_number != entity_type_number_:
-            #     raise Exception("invalid data entries")
-            # print(iges_entity_type_number, parameter_data, parameter_line_count)
-            entry_list.append([entity_type_number,
-                               parameter_data,
-                               structure,
-                               line_font_pattern,
-                               level,
-                               view,
-                               transfromation_matrix,
-                               label_display_assoc,
-                               status_number,
-                               line_weight_number,
-                               color_number,
-                               parameter_line_count,
-                               form_number,
-                               entry_label,
-                               entry_subscript_number,
-                               sequence_number,
-                               ])
-        de = pd.DataFrame(entry_list, columns=columns)
-        de.sequence_number = de.sequence_number.astype(int)
-        de.index = de.sequence_number
-        del entry_list
-
-        del df
-        df = self.df_raw[self.df_raw["section_code"] == "P"]
-        df.index = df.sequence_number
-
-        # add param string
-        param_str = df['data'].str[:65]
-        param_str.name = "param_str"
-        df = df.join(param_str)
-
-        # add de_pointer
-        de_pointer = df['data'].str[65:72]
-        de_pointer.name = "de_pointer"
-        df = df.join(de_pointer)
-
-        for dep, df in df.groupby("de_pointer"):
-            param_str = "".join(df.param_str.str.strip().values)
-            de.loc[int(dep), "param_str"] = param_str
-        de.entity_type_number = de.entity_type_number.astype(int, inplace=True)
+        with self._stats.stage("global"):
+            self.parse_global_section()
+
+        count = len(self._sections["D"]) // 2
+        if self.workers and self.workers > 1:
+            chunks = split_chunks(self._sections["D"], self._sections["P"], self.workers)
+            if len(chunks) > 1:
+                with self._stats.stage("entries", count):
+                    return self._read_chunks(chunks)
+        with self._stats.stage("directory", count):
+            de = decode_directory(self._sections["D"])
+        with self._stats.stage("parameters", count):
+            self._tokens = parse_parameters(de, self._sections["P"], self.psep, self.rsep)
         self._entries = de
         return de
 
+    def _read_chunks(self, chunks):
+        """tokenize and type parse chunks of entities in a process pool"""
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            results = list(pool.map(parse_chunk,
+                                    [d for d, p in chunks], [p for d, p in chunks],
+                                    [self.psep] * len(chunks), [self.rsep] * len(chunks),
+                                    [self.type_parsers] * len(chunks)))
+        self._entries = pd.concat([de for de, tokens, type_dfs in results])
+        self._tokens = Tokens.concat([tokens for de, tokens, type_dfs in results])
+        for type_entity_number in self.type_parsers:
+            dfs = [type_dfs[type_entity_number] for de, tokens, type_dfs in results]
+            self.set_type_df(type_entity_number, pd.concat([df for df in dfs if len(df)] or dfs[:1]))
+        return self._entries
+
+    def parse_type(self, type_entity_number):
+        """parse the entries of one entity type with its type parser"""
+        rows = self.type_rows(type_entity_number)
+        parser = self.type_parsers[type_entity_number]
+        with self._stats.stage("type %d" % type_entity_number, len(rows)):
+            df = parser(self.entries.iloc[rows], self._tokens.take(rows), self.psep)
+        self.set_type_df(type_entity_number, df)
+
     def parse_type_110(self):
         """lines"""
-        df = self.entries[self.entries.entity_type_number==110]
-        if len(df)==0:
-            return
-        s = df.param_str.str.rstrip(self.rsep)
-        dfe110 = s.str.split(self.psep, 0, expand=True).rename(columns={0:'entity_number',
-                                                                    1:'x1', 2:'y1', 3:'z1',
-                                                                    4:'x2', 5:'y2', 6:'z2',}).astype(float)
-        self.set_type_df(110, dfe110[["x1", "y1", "z1", "x2", "y2", "z2"]])
+        self.parse_type(110)
 
     def parse_type_144(self):
         """4.34 Trimmed (Parametric) Surface Entity (Type 144)"""
-        df = self.entries[self.entries.entity_type_number==144]
-        s = df.param_str.str.rstrip(self.rsep)
-        dfe = s.str.split(self.psep, 5, expand=True).rename(columns={0:'entity_number',
-                                                                     1:'ptr', 2:'n1', 3:'n2', 4:'pto', 5:'pti'})
-        dfe = pd.concat([pd.DataFrame(columns=['entity_number','ptr', 'n1', 'n2', 'pto', 'pti']),
-                        dfe])
-        self.set_type_df(144, dfe)
+        self.parse_type(144)
 
     def parse_type_402(self):
         """4.81  Associativity Instance Entity (Type 402)"""
-
-        #fixme
-        df = self.entries[self.entries.entity_type_number==402]
-        s = df.param_str.str.rstrip(self.rsep)
-        s = s.str.split(self.psep)#.astype(int)
+        self.parse_type(402)
 
 if __name__ == '__main__':
 
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""byte offsets of the D and P records for random access to entities.
+
+One scan over the mapped file finds the start of every record, the
+offsets can be saved next to the file (path + ".idx.npz") and are reused
+while the size and modification time of the file match.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from igs.graph import pointer_parameters
+from igs.header import RECORD_LENGTH
+from igs.tokenizer import Tokens, to_int
+
+INDEX_SUFFIX = ".idx.npz"
+
+
+def index_path(path):
+    return os.fspath(path) + INDEX_SUFFIX
+
+
+class RecordIndex(object):
+    """offsets of the D and P records of a file of size bytes
+
+    d_offsets, p_offsets: int64 arrays, record i of the section starts at
+    byte offsets[i], sequence number i + 1"""
+
+    def __init__(self, d_offsets, p_offsets, size=0, mtime=0):
+        self.d_offsets = d_offsets
+        self.p_offsets = p_offsets
+        self.size = size
+        self.mtime = mtime
+
+    def __repr__(self):
+        return "<RecordIndex %d D %d P records>" % (len(self.d_offsets), len(self.p_offsets))
+
+    @classmethod
+    def build(cls, buf, size=0, mtime=0):
+        """index of the records in the buffer buf"""
+        data = np.frombuffer(buf, dtype=np.uint8)
+        if len(data) == 0:
+            return cls(np.empty(0, np.int64), np.empty(0, np.int64), size, mtime)
+        if (data[:4 * RECORD_LENGTH] == 10).any():
+            starts = np.r_[0, np.flatnonzero(data == 10) + 1]
+        else:
+            # records without line breaks
+            starts = np.arange(0, len(data), RECORD_LENGTH)
+        starts = starts[starts + 72 < len(data)]
+        codes = data[starts + 72]
+        return cls(starts[codes == ord("D")].astype(np.int64), starts[codes == ord("P")].astype(np.int64),
+                   size, mtime)
+
+    def save(self, path):
+        """save the index to path (see index_path)"""
+        with open(path, "wb") as fh:
+            np.savez(fh, d_offsets=self.d_offsets, p_offsets=self.p_offsets,
+                     stamp=np.array([self.size, self.mtime], dtype=np.int64))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            size, mtime = data["stamp"].tolist()
+            return cls(data["d_offsets"], data["p_offsets"], size, mtime)
+
+
+def open_index(path, buf, save=False):
+    """RecordIndex of the file path with content buf
+
+    The saved index next to the file is used if it matches the size and
+    modification time of the file, otherwise the index is built and, with
+    save, written next to the file. Without a path (file objects, bytes)
+    the index is built in memory and cannot be saved."""
+    if path is None:
+        if save:
+            raise ValueError("saving the record index needs the path of the file")
+        return RecordIndex.build(buf)
+    stat = os.stat(path)
+    sidecar = index_path(path)
+    if os.path.exists(sidecar):
+        try:
+            index = RecordIndex.load(sidecar)
+        except (OSError, ValueError, KeyError):
+            index = None
+        if index is not None and (index.size, index.mtime) == (stat.st_size, stat.st_mtime_ns):
+            return index
+    index = RecordIndex.build(buf, stat.st_size, stat.st_mtime_ns)
+    if save:
+        index.save(sidecar)
+    return index
+
+
+def records_at(buf, offsets):
+    """uint8 array (n, 80) of the records starting at offsets of buf"""
+    lines = []
+    for offset in offsets.tolist():
+        line = buf[offset:offset + RECORD_LENGTH + 2].split(b"\n", 1)[0].rstrip(b"\r")
+        lines.append(line.ljust(RECORD_LENGTH)[:RECORD_LENGTH])
+    return np.frombuffer(b"".join(lines), dtype=np.uint8).reshape(-1, RECORD_LENGTH)
+
+
+def read_entities(buf, index, de_pointers, psep=",", rsep=";"):
+    """entries and Tokens of the entities de_pointers, read from buf"""
+    from igs.igs import decode_directory, parse_parameters
+    from igs.sections import fixed_int
+    de_pointers = np.unique(np.abs(np.asarray(de_pointers, dtype=np.int64)))
+    missing = de_pointers[(de_pointers % 2 == 0) | (de_pointers >= len(index.d_offsets))]
+    if len(missing):
+        raise KeyError("no entity with DE pointer %s" % missing.tolist())
+    rows = np.c_[de_pointers - 1, de_pointers].ravel()
+    d_records = records_at(buf, index.d_offsets[rows])
+    de = decode_directory(d_records)
+    first = fixed_int(d_records[0::2, 8:16]) - 1
+    count = fixed_int(d_records[1::2, 24:32])
+    offsets = np.cumsum(count) - count
+    lines = np.repeat(first, count) + np.arange(count.sum()) - np.repeat(offsets, count)
+    tokens = parse_parameters(de, records_at(buf, index.p_offsets[lines]), psep, rsep)
+    return de, tokens
+
+
+def read_subtree(buf, index, de_pointers, psep=",", rsep=";"):
+    """entries and Tokens of the entities de_pointers and all entities
+    they reference by parameter pointers (see igs.graph.POINTER_PARAMETERS)"""
+    frontier = np.unique(np.abs(np.asarray(de_pointers, dtype=np.int64)))
+    seen = np.empty(0, dtype=np.int64)
+    parts = []
+    while len(frontier):
+        de, tokens = read_entities(buf, index, frontier, psep, rsep)
+        parts.append((de, tokens))
+        seen = np.union1d(seen, frontier)
+        _, token_index = pointer_parameters(de, tokens)
+        pointers = np.abs(to_int(tokens.values[token_index]))
+        pointers = pointers[(pointers > 0) & (pointers % 2 == 1) & (pointers < len(index.d_offsets))]
+        frontier = np.setdiff1d(pointers, seen)
+    entries = pd.concat([de for de, tokens in parts])
+    tokens = Tokens.concat([tokens for de, tokens in parts])
+    order = np.argsort(entries.index.values, kind="stable")
+    return entries.iloc[order], tokens.take(order)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+"""wall time, entity counts and peak memory of the parse stages.
+
+Every stage of Iges gives a Stage record, kept in Iges.stats and passed to
+the hooks: the functions in HOOKS (all files) and the hooks argument of
+Iges (one file). Peak memory is only measured while Iges(memory=True)
+traces with tracemalloc itself, the peak of a caller's own tracing is
+left alone; without tracing and hooks a stage costs two clock reads.
+tracemalloc.reset_peak needs Python 3.9.
+"""
+
+import collections
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# name, wall time in s, number of entities, peak memory in bytes above the
+# memory at the start of the stage (None if not measured, see Stats.memory)
+Stage = collections.namedtuple("Stage", ["name", "seconds", "entities", "memory"])
+
+# functions called with every Stage of every file
+HOOKS = []
+
+
+def add_hook(hook):
+    """call hook(stage) after every parse stage of every file"""
+    HOOKS.append(hook)
+
+
+def remove_hook(hook):
+    HOOKS.remove(hook)
+
+
+class Stats(object):
+    """stages of one file
+
+    memory: measure the peak memory of the stages, only set while the
+    owner of the Stats started tracemalloc itself"""
+
+    def __init__(self, hooks=None, memory=False):
+        self.stages = []
+        self.hooks = list(hooks or [])
+        self.memory = memory
+
+    @contextmanager
+    def stage(self, name, entities=None):
+        """time the block, the block may set count["entities"]"""
+        count = {"entities": entities}
+        tracing = self.memory and tracemalloc.is_tracing()
+        if tracing:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        yield count
+        seconds = time.perf_counter() - start
+        memory = tracemalloc.get_traced_memory()[1] - base if tracing else None
+        self.record(Stage(name, seconds, count["entities"], memory))
+
+    def record(self, stage):
+        self.stages.append(stage)
+        for hook in HOOKS + self.hooks:
+            hook(stage)
+
+    def __getstate__(self):
+        # hooks stay in the process that created them
+        return {"stages": self.stages, "hooks": [], "memory": False}
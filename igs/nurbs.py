@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+
+"""rational b-spline curves (type 126) and surfaces (type 128) as flat
+arrays and their batch evaluation."""
+
+import numpy as np
+
+from igs.tokenizer import to_float, to_int
+
+
+def find_span(knots, base, degree, high, u):
+    """knot span index i (degree <= i <= high) with t[i] <= u < t[i + 1],
+    t is knots[base:], vectorized bisection over all arguments"""
+    u = np.asarray(u, dtype=np.float64)
+    shape = np.broadcast(base, degree, high, u).shape
+    low = np.broadcast_to(degree, shape).astype(np.int64)
+    high = np.broadcast_to(high, shape).astype(np.int64)
+    # largest i with t[i] <= u
+    while True:
+        active = high > low
+        if not active.any():
+            return low
+        mid = (low + high + 1) // 2
+        right = u >= knots[base + mid]
+        low = np.where(active & right, mid, low)
+        high = np.where(active & ~right, mid - 1, high)
+
+
+def basis_functions(knots, span, degree, u):
+    """the degree + 1 non zero basis functions at u (m, degree + 1), knots
+    and span per evaluation as for find_span with base 0"""
+    u = np.asarray(u, dtype=np.float64)
+    n = np.zeros((len(u), degree + 1))
+    n[:, 0] = 1.0
+    left = np.zeros((len(u), degree + 1))
+    right = np.zeros((len(u), degree + 1))
+    for j in range(1, degree + 1):
+        left[:, j] = u - knots[span + 1 - j]
+        right[:, j] = knots[span + j] - u
+        saved = np.zeros(len(u))
+        for r in range(j):
+            denominator = right[:, r + 1] + left[:, j - r]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                temp = np.where(denominator != 0, n[:, r] / denominator, 0.0)
+            n[:, r] = saved + right[:, r + 1] * temp
+            saved = left[:, j - r] * temp
+        n[:, j] = saved
+    return n
+
+
+def basis_matrix(knots, degree, count, u):
+    """all count basis functions at the parameters u, array (len(u), count)"""
+    u = np.asarray(u, dtype=np.float64)
+    span = find_span(knots, 0, degree, count - 1, u)
+    out = np.zeros((len(u), count))
+    columns = span[:, None] - degree + np.arange(degree + 1)
+    out[np.arange(len(u))[:, None], columns] = basis_functions(knots, span, degree, u)
+    return out
+
+
+class BSplineCurves(object):
+    """many rational b-spline curves in flat arrays
+
+    Curve i has degree[i], count[i] = K + 1 control points and weights
+    points[offsets[i]:offsets[i + 1]] and the K + M + 2 knots
+    knots[knot_offsets[i]:knot_offsets[i + 1]], its parameter range is
+    v0[i] .. v1[i]."""
+
+    def __init__(self, sequence_numbers, degree, knots, knot_offsets, weights, points, offsets, v0, v1):
+        self.sequence_numbers = np.asarray(sequence_numbers, dtype=np.int64)
+        self.degree = np.asarray(degree, dtype=np.int64)
+        self.knots = np.asarray(knots, dtype=np.float64)
+        self.knot_offsets = np.asarray(knot_offsets, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.v0 = np.asarray(v0, dtype=np.float64)
+        self.v1 = np.asarray(v1, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.degree)
+
+    def __repr__(self):
+        return "BSplineCurves(curves=%d, points=%d)" % (len(self), len(self.points))
+
+    @property
+    def count(self):
+        """number of control points K + 1 of each curve"""
+        return np.diff(self.offsets)
+
+    def span(self, curve, u):
+        """knot span index i (degree <= i <= K) with t[i] <= u < t[i + 1]
+        per evaluation, relative to the knots of the curve"""
+        return find_span(self.knots, self.knot_offsets[curve], self.degree[curve], self.count[curve] - 1, u)
+
+    def evaluate(self, curve, u):
+        """points of the curves curve at the parameters u (m,), one call for
+        all curves, grouped by degree for the de Boor recursion"""
+        curve = np.asarray(curve, dtype=np.int64)
+        u = np.broadcast_to(np.asarray(u, dtype=np.float64), curve.shape)
+        out = np.empty((len(curve), 3))
+        for p in np.unique(self.degree[curve]).tolist():
+            rows = np.flatnonzero(self.degree[curve] == p)
+            out[rows] = self._de_boor(curve[rows], u[rows], p)
+        return out
+
+    def _de_boor(self, curve, u, p):
+        span = self.span(curve, u)
+        # homogeneous control points (w x, w y, w z, w) of span - p .. span
+        index = (self.offsets[curve] + span - p)[:, None] + np.arange(p + 1)
+        w = self.weights[index][..., None]
+        d = np.concatenate([self.points[index] * w, w], axis=2)
+        knots = self.knots[(self.knot_offsets[curve] + span)[:, None] + np.arange(-p + 1, p + 1)]
+        # knots[:, j] is t[span - p + 1 + j]
+        for r in range(1, p + 1):
+            for j in range(p, r - 1, -1):
+                left = knots[:, j - 1]
+                right = knots[:, j + p - r]
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    alpha = np.where(right > left, (u - left) / (right - left), 0.0)[:, None]
+                d[:, j] = (1.0 - alpha) * d[:, j - 1] + alpha * d[:, j]
+        return d[:, p, :3] / d[:, p, 3:]
+
+    def sample(self, n):
+        """n points per curve at equally spaced parameters of v0 .. v1,
+        array (len(self), n, 3)"""
+        t = np.linspace(0.0, 1.0, n)
+        u = self.v0[:, None] + (self.v1 - self.v0)[:, None] * t
+        curve = np.repeat(np.arange(len(self)), n)
+        return self.evaluate(curve, u.ravel()).reshape(len(self), n, 3)
+
+
+def parse_126_arrays(entries, tokens):
+    """4.23 Rational B-Spline Curve Entity (Type 126) of entries as BSplineCurves
+
+    entries, tokens: the entries of type 126 and their tokens, curves with
+    incomplete parameters are left out"""
+    k = to_int(tokens.column(1))
+    m = to_int(tokens.column(2))
+    # parameter 7: K + M + 2 knots, K + 1 weights, 3 (K + 1) coordinates, V0, V1
+    need = 7 + (k + m + 2) + 4 * (k + 1) + 2
+    valid = (tokens.counts >= need) & (k >= 0) & (m >= 1)
+    rows = np.flatnonzero(valid)
+    tokens, k, m = tokens.take(rows), k[rows], m[rows]
+    knots = tokens.slice(7, k + m + 2)
+    weights = tokens.slice(9 + k + m, k + 1)
+    points = tokens.slice(10 + 2 * k + m, 3 * (k + 1))
+    v = to_float(tokens.slice(13 + 5 * k + m, 2).values).reshape(-1, 2)
+    return BSplineCurves(entries.index.values[rows], m,
+                         to_float(knots.values), knots.indptr,
+                         to_float(weights.values), to_float(points.values), weights.indptr,
+                         v[:, 0], v[:, 1])
+
+
+class BSplineSurfaces(object):
+    """many rational b-spline surfaces in flat arrays
+
+    Surface i has degree_u[i], degree_v[i] and a net of count_u[i] x
+    count_v[i] weights and control points starting at offsets[i], the
+    first index varies fastest as in the file; its knots are
+    knots_u[knot_offsets_u[i]:knot_offsets_u[i + 1]] and likewise for v,
+    its parameter range is domain[i] (u0, u1, v0, v1)."""
+
+    def __init__(self, sequence_numbers, degree_u, degree_v, count_u, count_v,
+                 knots_u, knot_offsets_u, knots_v, knot_offsets_v, weights, points, offsets, domain):
+        self.sequence_numbers = np.asarray(sequence_numbers, dtype=np.int64)
+        self.degree_u = np.asarray(degree_u, dtype=np.int64)
+        self.degree_v = np.asarray(degree_v, dtype=np.int64)
+        self.count_u = np.asarray(count_u, dtype=np.int64)
+        self.count_v = np.asarray(count_v, dtype=np.int64)
+        self.knots_u = np.asarray(knots_u, dtype=np.float64)
+        self.knot_offsets_u = np.asarray(knot_offsets_u, dtype=np.int64)
+        self.knots_v = np.asarray(knots_v, dtype=np.float64)
+        self.knot_offsets_v = np.asarray(knot_offsets_v, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.domain = np.asarray(domain, dtype=np.float64).reshape(-1, 4)
+
+    def __len__(self):
+        return len(self.degree_u)
+
+    def __repr__(self):
+        return "BSplineSurfaces(surfaces=%d, points=%d)" % (len(self), len(self.points))
+
+    def patch(self, i):
+        """arrays of surface i as a tuple for surface_grid
+        (degree_u, degree_v, knots_u, knots_v, weights, points, domain)"""
+        cu, cv = self.count_u[i], self.count_v[i]
+        net = slice(self.offsets[i], self.offsets[i + 1])
+        return (int(self.degree_u[i]), int(self.degree_v[i]),
+                self.knots_u[self.knot_offsets_u[i]:self.knot_offsets_u[i + 1]],
+                self.knots_v[self.knot_offsets_v[i]:self.knot_offsets_v[i + 1]],
+                self.weights[net].reshape(cv, cu).T,
+                self.points[net].reshape(cv, cu, 3).transpose(1, 0, 2),
+                self.domain[i])
+
+    def grid(self, i, u, v):
+        """points of surface i at all combinations of u and v (len(u), len(v), 3)"""
+        return surface_grid(self.patch(i), u, v)
+
+
+def surface_grid(patch, u, v):
+    """points of a surface patch (see BSplineSurfaces.patch) at all
+    combinations of u and v, two basis matrix products"""
+    degree_u, degree_v, knots_u, knots_v, weights, points, domain = patch
+    bu = basis_matrix(knots_u, degree_u, weights.shape[0], u)
+    bv = basis_matrix(knots_v, degree_v, weights.shape[1], v)
+    homogeneous = np.concatenate([points * weights[..., None], weights[..., None]], axis=2)
+    out = np.tensordot(bu, np.tensordot(bv, homogeneous, axes=(1, 1)), axes=(1, 1))
+    return out[..., :3] / out[..., 3:]
+
+
+def parse_128_arrays(entries, tokens):
+    """4.24 Rational B-Spline Surface Entity (Type 128) of entries as
+    BSplineSurfaces, surfaces with incomplete parameters are left out"""
+    k1, k2, m1, m2 = [to_int(tokens.column(i)) for i in range(1, 5)]
+    # parameter 10: knots in u and v, weights, control points, U0, U1, V0, V1
+    nu, nv, count = k1 + m1 + 2, k2 + m2 + 2, (k1 + 1) * (k2 + 1)
+    need = 10 + nu + nv + 4 * count + 4
+    valid = (tokens.counts >= need) & (k1 >= 0) & (k2 >= 0) & (m1 >= 1) & (m2 >= 1)
+    rows = np.flatnonzero(valid)
+    tokens = tokens.take(rows)
+    k1, k2, m1, m2, nu, nv, count = [x[rows] for x in (k1, k2, m1, m2, nu, nv, count)]
+    knots_u = tokens.slice(10, nu)
+    knots_v = tokens.slice(10 + nu, nv)
+    weights = tokens.slice(10 + nu + nv, count)
+    points = tokens.slice(10 + nu + nv + count, 3 * count)
+    domain = to_float(tokens.slice(10 + nu + nv + 4 * count, 4).values)
+    return BSplineSurfaces(entries.index.values[rows], m1, m2, k1 + 1, k2 + 1,
+                           to_float(knots_u.values), knots_u.indptr,
+                           to_float(knots_v.values), knots_v.indptr,
+                           to_float(weights.values), to_float(points.values), weights.indptr, domain)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+"""fixed 80 column record splitter for the S, G, D, P and T sections."""
+
+import io
+import mmap
+import os
+
+import numpy as np
+
+from igs.header import RECORD_LENGTH, decompress
+
+SECTION_CODES = "SGDPT"
+# bytes decompressed at a time, see read_records
+CHUNK_SIZE = 1 << 22
+
+
+def read_buffer(fh):
+    """return the content of fh as a bytes like buffer
+
+    fh: path, bytes or file object; regular files are memory mapped,
+    gzip, bz2 and xz compressed files are decompressed while they are read
+    (see read_records); text file objects are read as str and encoded as
+    latin-1, one byte per character, other characters become ?"""
+    if isinstance(fh, (bytes, bytearray, memoryview, mmap.mmap)):
+        stream = decompress(io.BytesIO(fh[:6]))
+        return fh if stream is None else read_records(decompress(io.BytesIO(fh)))
+    if isinstance(fh, str) or hasattr(fh, "__fspath__"):
+        with open(fh, "rb") as f:
+            stream = decompress(f)
+            if stream is not None:
+                return read_records(stream)
+            return _map_file(f) or f.read()
+    if hasattr(fh, "seekable") and (hasattr(fh, "peek") or fh.seekable()):
+        stream = decompress(fh)
+        if stream is not None:
+            return read_records(stream)
+    try:
+        fileno = fh.fileno()
+    except (AttributeError, OSError, ValueError):
+        fileno = None
+    # the bytes of a text file do not keep the 80 columns of its characters
+    if fileno is not None and not isinstance(fh, io.TextIOBase) and fh.seekable() and fh.tell() == 0:
+        buf = _map_file(fh)
+        if buf is not None:
+            return buf
+    data = fh.read()
+    if isinstance(data, str):
+        data = data.encode("latin-1", errors="replace")
+    return data
+
+
+def read_records(fh, chunk_size=CHUNK_SIZE):
+    """records of a binary stream as one buffer of 80 column records
+    without line breaks, converted chunk by chunk while fh is read"""
+    out = bytearray()
+    rest = b""
+    while True:
+        chunk = fh.read(chunk_size)
+        data = rest + chunk
+        end = len(data)
+        if chunk:
+            end = data.rfind(b"\n") + 1 or len(data) // RECORD_LENGTH * RECORD_LENGTH
+        data, rest = data[:end], data[end:]
+        if data.strip():
+            out += as_records(data).tobytes()
+        if not chunk:
+            return out
+
+
+def _map_file(f):
+    if os.fstat(f.fileno()).st_size == 0:
+        return None
+    try:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+def as_records(buf):
+    """view buf as uint8 records (n, 80)
+
+    Files with a constant line length are viewed without a copy, all
+    other files are padded line by line."""
+    data = np.frombuffer(buf, dtype=np.uint8)
+    eol = bytes(data[:4 * RECORD_LENGTH]).find(b"\n")
+    if eol < 0 and len(data) % RECORD_LENGTH == 0:
+        # records without line breaks
+        return data.reshape(-1, RECORD_LENGTH)
+    stride = eol + 1
+    if eol >= RECORD_LENGTH and len(data) % stride == 0:
+        rows = data.reshape(-1, stride)
+        if (rows[:, -1] == 10).all():
+            return rows[:, :RECORD_LENGTH]
+    lines = [line.ljust(RECORD_LENGTH)[:RECORD_LENGTH] for line in bytes(buf).splitlines() if line.strip()]
+    return np.frombuffer(b"".join(lines), dtype=np.uint8).reshape(-1, RECORD_LENGTH)
+
+
+def split_sections(buf):
+    """split an iges file into its sections in one pass
+
+    returns dict section code -> uint8 array (n, 80) of the records, all
+    sections are empty for empty or blank input"""
+    records = as_records(buf)
+    codes = records[:, 72]
+    starts = np.flatnonzero(np.r_[len(codes) > 0, codes[1:] != codes[:-1]])
+    ends = np.r_[starts[1:], len(codes)]
+    sections = dict()
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        code = chr(codes[start])
+        block = records[start:end]
+        if code in sections:
+            block = np.concatenate([sections[code], block])
+        sections[code] = block
+    for code in SECTION_CODES:
+        sections.setdefault(code, records[:0])
+    return sections
+
+
+def fixed_int(chars):
+    """convert fixed width integer fields to int64
+
+    chars: uint8 array (n, width), blank fields become 0"""
+    chars = chars.astype(np.int64)
+    digits = (chars >= 48) & (chars <= 57)
+    # count of digits right of each position gives the decimal exponent
+    exponent = np.cumsum(digits[:, ::-1], axis=1)[:, ::-1] - digits
+    values = np.where(digits, (chars - 48) * 10 ** exponent, 0).sum(axis=1)
+    return np.where((chars == 45).any(axis=1), -values, values)
+
+
+def section_text(records, start=0, stop=72):
+    """columns start:stop of each record as an array of stripped strings"""
+    width = stop - start
+    data = np.ascontiguousarray(records[:, start:stop]).view("S%d" % width).ravel()
+    return np.char.decode(np.char.strip(data), "latin-1")
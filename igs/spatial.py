@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+"""axis aligned bounding boxes and a uniform grid index over them."""
+
+import numpy as np
+import pandas as pd
+
+from igs.graph import _ranges
+from igs.tokenizer import to_float, to_int
+
+BOX_COLUMNS = ["xmin", "ymin", "zmin", "xmax", "ymax", "zmax"]
+
+
+def boxes_110(tokens, rows):
+    """4.14 Line Entity (Type 110), the two end points"""
+    xyz = np.stack([to_float(tokens.column(k)) for k in range(1, 7)], axis=1)[rows]
+    return np.hstack([np.minimum(xyz[:, :3], xyz[:, 3:]), np.maximum(xyz[:, :3], xyz[:, 3:])])
+
+
+def boxes_116(tokens, rows):
+    """4.15 Point Entity (Type 116)"""
+    xyz = np.stack([to_float(tokens.column(k)) for k in range(1, 4)], axis=1)[rows]
+    return np.hstack([xyz, xyz])
+
+
+def boxes_100(tokens, rows):
+    """4.3 Circular Arc Entity (Type 100), exact box of the arc in its plane z = ZT"""
+    zt, x1, y1, x2, y2, x3, y3 = [to_float(tokens.column(k))[rows] for k in range(1, 8)]
+    radius = np.hypot(x2 - x1, y2 - y1)
+    start = np.arctan2(y2 - y1, x2 - x1)
+    sweep = np.mod(np.arctan2(y3 - y1, x3 - x1) - start, 2 * np.pi)
+    sweep[sweep == 0] = 2 * np.pi # full circle
+    xs, ys = [x2, x3], [y2, y3]
+    # the arc reaches the extreme points of the circle it passes
+    for angle in np.arange(4) * np.pi / 2:
+        passed = np.mod(angle - start, 2 * np.pi) <= sweep
+        xs.append(np.where(passed, x1 + radius * np.cos(angle), x2))
+        ys.append(np.where(passed, y1 + radius * np.sin(angle), y2))
+    xs, ys = np.stack(xs, axis=1), np.stack(ys, axis=1)
+    return np.stack([xs.min(axis=1), ys.min(axis=1), zt, xs.max(axis=1), ys.max(axis=1), zt], axis=1)
+
+
+def boxes_126(tokens, rows):
+    """4.23 Rational B-Spline Curve Entity (Type 126), hull of the control points"""
+    k = to_int(tokens.column(1))[rows]
+    m = to_int(tokens.column(2))[rows]
+    # K + M + 2 knots and K + 1 weights from parameter 7
+    points = tokens.take(rows).slice(10 + 2 * k + m, 3 * (k + 1))
+    xyz = to_float(points.values).reshape(-1, 3)
+    starts = points.indptr[:-1] // 3
+    return np.hstack([np.minimum.reduceat(xyz, starts, axis=0), np.maximum.reduceat(xyz, starts, axis=0)])
+
+
+# entity type number -> function(tokens, rows) returning the (n, 6) boxes of rows
+TYPE_BOXES = {100: boxes_100,
+              110: boxes_110,
+              116: boxes_116,
+              126: boxes_126}
+
+
+def bounding_boxes(entries, tokens, graph=None, types=None):
+    """axis aligned boxes of the curve and point entities in definition space
+
+    The box of a composite curve (102) is the union of its members, this
+    needs the graph; nested composites are filled in again until no box
+    changes. returns DataFrame indexed by sequence number with the
+    entity_type_number and BOX_COLUMNS"""
+    type_numbers = entries.entity_type_number.values
+    types = list(types or list(TYPE_BOXES) + [102])
+    boxes = np.full((len(entries), 6), np.nan)
+    for type_entity_number in types:
+        rows = np.flatnonzero(type_numbers == type_entity_number)
+        if len(rows) and type_entity_number in TYPE_BOXES:
+            boxes[rows] = TYPE_BOXES[type_entity_number](tokens.take(rows), np.arange(len(rows)))
+    rows = np.flatnonzero(type_numbers == 102) if 102 in types and graph is not None else []
+    if len(rows):
+        counts = graph.indptr[rows + 1] - graph.indptr[rows]
+        owner, index = _ranges(np.arange(len(rows)), graph.indptr[rows], counts)
+        has = np.flatnonzero(counts)
+        starts = (np.cumsum(counts) - counts)[has]
+        # one level of nesting per pass, cycles stop after len(rows) passes
+        for _ in range(len(rows) if len(has) else 0):
+            members = boxes[graph.indices[index]]
+            before = boxes[rows[has]]
+            with np.errstate(invalid="ignore"):
+                boxes[rows[has], :3] = np.fmin.reduceat(members[:, :3], starts, axis=0)
+                boxes[rows[has], 3:] = np.fmax.reduceat(members[:, 3:], starts, axis=0)
+            if np.array_equal(before, boxes[rows[has]], equal_nan=True):
+                break
+    keep = ~np.isnan(boxes).all(axis=1)
+    df = pd.DataFrame(boxes[keep], index=entries.index[keep], columns=BOX_COLUMNS)
+    df.insert(0, "entity_type_number", type_numbers[keep])
+    return df
+
+
+def box_distance(points, boxes):
+    """euclidean distance of points to boxes (0 inside), broadcasting"""
+    below = np.maximum(boxes[..., :3] - points, 0)
+    above = np.maximum(points - boxes[..., 3:], 0)
+    return np.sqrt(((below + above) ** 2).sum(axis=-1))
+
+
+class GridIndex(object):
+    """uniform grid over axis aligned boxes
+
+    Every box is registered in all cells it overlaps, the cell lists are
+    stored as CSR arrays over the sorted keys of the occupied cells.
+
+    boxes: array (n, 6) xmin, ymin, zmin, xmax, ymax, zmax
+    ids: labels returned by the queries, default 0 .. n - 1
+    cell_size: edge length of the cubic cells, default from the box sizes"""
+
+    def __init__(self, boxes, ids=None, cell_size=None):
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 6)
+        self.ids = np.arange(len(self.boxes)) if ids is None else np.asarray(ids)
+        n = len(self.boxes)
+        self.origin = self.boxes[:, :3].min(axis=0) if n else np.zeros(3)
+        extent = self.boxes[:, 3:].max(axis=0) - self.origin if n else np.zeros(3)
+        if cell_size is None:
+            cell_size = _cell_size(self.boxes, extent)
+        self.cell_size = float(cell_size)
+        self.shape = (extent // self.cell_size).astype(np.int64) + 1
+        owner, keys = self._cells(self._cell(self.boxes[:, :3]), self._cell(self.boxes[:, 3:]))
+        order = np.argsort(keys, kind="stable")
+        self.keys, counts = np.unique(keys[order], return_counts=True)
+        self.indptr = np.r_[0, np.cumsum(counts)].astype(np.int64)
+        self.indices = owner[order]
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __repr__(self):
+        return "GridIndex(boxes=%d, cells=%d, cell_size=%g)" % (len(self), len(self.keys), self.cell_size)
+
+    def _cell(self, xyz):
+        """integer cell coordinates of points, clipped to the grid"""
+        return np.clip(np.floor((xyz - self.origin) / self.cell_size).astype(np.int64), 0, self.shape - 1)
+
+    def _cells(self, lo, hi):
+        """owner and key of every cell in the ranges lo .. hi (n, 3)"""
+        span = np.maximum(hi - lo + 1, 0)
+        count = span.prod(axis=1)
+        owner = np.repeat(np.arange(len(lo)), count)
+        k = np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+        span = span[owner]
+        iz = lo[owner, 2] + k % span[:, 2]
+        iy = lo[owner, 1] + k // span[:, 2] % span[:, 1]
+        ix = lo[owner, 0] + k // (span[:, 2] * span[:, 1])
+        return owner, (ix * self.shape[1] + iy) * self.shape[2] + iz
+
+    def _candidates(self, lo, hi):
+        """(query, box) pairs of the boxes registered in the cell ranges"""
+        owner, keys = self._cells(lo, hi)
+        slot = np.searchsorted(self.keys, keys)
+        hit = slot < len(self.keys)
+        hit[hit] = self.keys[slot[hit]] == keys[hit]
+        owner, slot = owner[hit], slot[hit]
+        query, index = _ranges(owner, self.indptr[slot], self.indptr[slot + 1] - self.indptr[slot])
+        return query, self.indices[index]
+
+    def intersect(self, boxes):
+        """all overlapping (query, id) pairs of the query boxes (m, 6)"""
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 6)
+        # queries outside the grid must not be clipped onto its border cells
+        inside = ((boxes[:, 3:] >= self.origin) & (boxes[:, :3] <= self.origin + self.shape * self.cell_size)).all(axis=1)
+        lo, hi = self._cell(boxes[:, :3]), self._cell(boxes[:, 3:])
+        hi[~inside] = lo[~inside] - 1
+        query, index = self._candidates(lo, hi)
+        overlap = ((self.boxes[index, :3] <= boxes[query, 3:]) & (self.boxes[index, 3:] >= boxes[query, :3])).all(axis=1)
+        pairs = np.unique(np.stack([query[overlap], index[overlap]], axis=1), axis=0).reshape(-1, 2)
+        return pairs[:, 0], self.ids[pairs[:, 1]]
+
+    def query(self, box):
+        """ids of the boxes overlapping box (xmin, ymin, zmin, xmax, ymax, zmax)"""
+        return self.intersect(box)[1]
+
+    def nearest(self, points):
+        """id of and distance to the nearest box of each point (m, 3)
+
+        The cube of cells searched around a point grows until the best
+        box found is closer than any box outside the cube could be."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        best = np.full(len(points), -1, dtype=np.int64)
+        distance = np.full(len(points), np.inf)
+        if len(self) == 0:
+            return self.ids[best] if len(self.ids) else best, distance
+        center = np.floor((points - self.origin) / self.cell_size).astype(np.int64)
+        todo = np.arange(len(points))
+        radius = 1
+        while len(todo) and len(todo) * (2 * radius + 1) ** 3 < 8 * len(self.indices) + 4096:
+            lo = np.clip(center[todo] - radius, 0, self.shape - 1)
+            hi = np.clip(center[todo] + radius, -1, self.shape - 1)
+            hi[(center[todo] + radius < 0).any(axis=1) | (center[todo] - radius >= self.shape).any(axis=1)] = -1
+            query, index = self._candidates(lo, hi)
+            d = box_distance(points[todo[query]], self.boxes[index])
+            order = np.lexsort((d, query))
+            query, index, d = query[order], index[order], d[order]
+            first = np.r_[True, query[1:] != query[:-1]] if len(query) else np.zeros(0, dtype=bool)
+            best[todo[query[first]]] = index[first]
+            distance[todo[query[first]]] = d[first]
+            todo = todo[distance[todo] > radius * self.cell_size]
+            radius *= 2
+        # remaining points are far from the grid, compare with all boxes
+        chunk = max(1, 10 ** 7 // len(self))
+        for start in range(0, len(todo), chunk):
+            rows = todo[start:start + chunk]
+            d = box_distance(points[rows, None, :], self.boxes[None, :, :])
+            best[rows] = d.argmin(axis=1)
+            distance[rows] = d.min(axis=1)
+        return self.ids[best], distance
+
+
+def _cell_size(boxes, extent):
+    """cell edge of about one box per cell, at least the median box edge"""
+    n = max(len(boxes), 1)
+    dims = extent[extent > 0]
+    size = (dims.prod() / n) ** (1.0 / len(dims)) if len(dims) else 0.0
+    if len(boxes):
+        size = max(size, np.median((boxes[:, 3:] - boxes[:, :3]).max(axis=1)))
+    return size if size > 0 else 1.0
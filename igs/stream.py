@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+"""streaming access to the entities of large iges files."""
+
+from contextlib import ExitStack
+
+import numpy as np
+
+from igs.header import decompress, global_delimiters, records, split_record
+from igs.igs import decode_directory, fixed_int
+from igs.sections import RECORD_LENGTH
+
+
+def _records(fh, section_code):
+    """yield the padded records of one section, reading fh sequentially"""
+    code = section_code.encode("ascii")
+    found = False
+    for record in records(fh):
+        if record[72:73] == code:
+            found = True
+            yield record
+        elif found:
+            return
+
+
+def _open(path, stack):
+    """binary file object of path closed with stack, gzip, bz2 and xz
+    compressed files are decompressed while they are read"""
+    f = stack.enter_context(open(path, "rb"))
+    stream = decompress(f)
+    return f if stream is None else stack.enter_context(stream)
+
+
+class _ParameterReader(object):
+    """forward reader of P section records by sequence number
+
+    fh: own binary file object, a decompressing stream rewinds by
+    decompressing again from the start of the file"""
+
+    def __init__(self, fh):
+        self.fh = fh
+        self.start = None # offset of the first P record
+        self.seq = None # sequence number of the next record
+        self.records = None # records of fh from the current position
+
+    def _rewind(self):
+        if self.start is None:
+            self.fh.seek(0)
+            self.records = records(self.fh)
+            offset = 0
+            for record in self.records:
+                if record[72:73] == b"P":
+                    break
+                offset = self.fh.tell()
+            self.start = offset
+        self.fh.seek(self.start)
+        self.records = records(self.fh)
+        self.seq = 1
+
+    def read(self, start, count):
+        """records start .. start + count - 1"""
+        if self.seq is None or start < self.seq:
+            self._rewind()
+        lines = []
+        while self.seq < start + count:
+            line = next(self.records, b"").ljust(RECORD_LENGTH)
+            if line[72:73] != b"P":
+                break
+            if self.seq >= start:
+                lines.append(line)
+            self.seq += 1
+        return lines
+
+
+def iter_entities(path, batch_size=None):
+    """iterate over the entities of an iges file with bounded memory
+
+    The D and P sections are read by two sequential cursors, only the
+    records of the current batch are held in memory. Compressed files are
+    decompressed by both cursors.
+
+    yields (record, tokens) per entity, record is a dict with the
+    columns of Iges.entries; if batch_size is given yields
+    (DataFrame, list of tokens) for batch_size entities at a time"""
+    chunk = batch_size or 1024
+    with ExitStack() as stack:
+        de_fh, pd_fh = _open(path, stack), _open(path, stack)
+        header = b"".join(x[:72] for x in _records(pd_fh, "G")).decode("latin-1")
+        psep, rsep = global_delimiters(header)
+        parameters = _ParameterReader(pd_fh)
+        directory = _records(de_fh, "D")
+        while True:
+            lines = []
+            for line in directory:
+                lines.append(line)
+                if len(lines) == 2 * chunk:
+                    break
+            if len(lines) < 2:
+                return
+            d_records = np.frombuffer(b"".join(lines), dtype=np.uint8).reshape(-1, RECORD_LENGTH)
+            de = decode_directory(d_records)
+            starts = fixed_int(d_records[0::2, 8:16]).tolist()
+            counts = fixed_int(d_records[1::2, 24:32]).tolist()
+            tokens = []
+            for start, count in zip(starts, counts):
+                param_lines = parameters.read(start, count) if start > 0 and count > 0 else []
+                tokens.append(split_record(b"".join(x[:64] for x in param_lines).decode("latin-1"), psep, rsep))
+            if batch_size:
+                yield de, tokens
+            else:
+                for record, entity_tokens in zip(de.to_dict("records"), tokens):
+                    yield record, entity_tokens
+            if len(lines) < 2 * chunk:
+                return
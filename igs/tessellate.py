@@ -0,0 +1,304 @@
+# -*- coding: utf-8 -*-
+
+"""triangle meshes of b-spline surfaces (type 128), trimmed surfaces (type
+144) and b-rep faces (type 510).
+
+Every surface is evaluated on a regular grid in its parameter space, the
+grid triangles whose centre lies outside the trimming loops are dropped
+(even-odd rule over all loop segments). Loops given in model space are
+mapped to the parameter of their nearest point on a finer grid.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from igs.graph import lookup, pointer_index
+from igs.nurbs import parse_126_arrays, parse_128_arrays, surface_grid
+from igs.tokenizer import to_float, to_int
+
+# vertices (n, 3), faces (m, 3) vertex indices, surface (m,) DE pointer of each face
+Mesh = namedtuple("Mesh", ["vertices", "faces", "surface"])
+
+
+def _sample_arcs(values, n):
+    """polylines (len(values), n, 3) of circular arcs, rows ZT X1 Y1 X2 Y2 X3 Y3"""
+    zt, x1, y1, x2, y2, x3, y3 = values.T
+    radius = np.hypot(x2 - x1, y2 - y1)
+    start = np.arctan2(y2 - y1, x2 - x1)
+    sweep = np.mod(np.arctan2(y3 - y1, x3 - x1) - start, 2 * np.pi)
+    sweep[sweep == 0] = 2 * np.pi # full circle
+    angle = start[:, None] + sweep[:, None] * np.linspace(0, 1, n)
+    return np.stack([x1[:, None] + radius[:, None] * np.cos(angle),
+                     y1[:, None] + radius[:, None] * np.sin(angle),
+                     np.repeat(zt[:, None], n, axis=1)], axis=2)
+
+
+def curve_polylines(entries, tokens, de_pointers, n=16):
+    """sample curve entities as polylines
+
+    Supports lines (110), circular arcs (100), copious data (106, forms
+    1, 2, 11, 12, 63), b-spline curves (126, n points each) and
+    composite curves (102) of them.
+    returns dict DE pointer -> list of (k, 3) arrays, unsupported curves
+    are missing"""
+    index = pointer_index(entries.index.values)
+    type_numbers = entries.entity_type_number.values
+    # resolve composite curves into their members
+    members = dict()
+    todo, leaves = list(np.unique(np.abs(de_pointers))), set()
+    while todo:
+        de = todo.pop()
+        row = lookup(index, [de])[0]
+        if row < 0 or de in members:
+            continue
+        if type_numbers[row] == 102:
+            t = tokens[row]
+            members[de] = np.abs(to_int(t[2:2 + int(to_int(t[1:2])[0])])).tolist() if len(t) > 1 else []
+            todo.extend(members[de])
+        else:
+            leaves.add(de)
+    leaves = np.array(sorted(leaves), dtype=np.int64)
+    rows = lookup(index, leaves)
+    lines = dict()
+
+    def columns(rows, count):
+        return np.stack([to_float(tokens.take(rows).column(k)) for k in range(1, count + 1)], axis=1)
+
+    selected = rows[type_numbers[rows] == 110]
+    for de, xyz in zip(entries.index.values[selected], columns(selected, 6).reshape(-1, 2, 3)):
+        lines[de] = [xyz]
+    selected = rows[type_numbers[rows] == 100]
+    for de, xyz in zip(entries.index.values[selected], _sample_arcs(columns(selected, 7), n)):
+        lines[de] = [xyz]
+    selected = rows[type_numbers[rows] == 106]
+    for de, row in zip(entries.index.values[selected], selected):
+        t, form = tokens[row], entries.form_number.values[row]
+        count = int(to_int(t[2:3])[0]) if len(t) > 2 else 0
+        if form in (1, 11, 63):
+            xy = to_float(t[4:4 + 2 * count]).reshape(-1, 2)
+            lines[de] = [np.c_[xy, np.full(len(xy), to_float(t[3:4])[0])]]
+        elif form in (2, 12):
+            lines[de] = [to_float(t[3:3 + 3 * count]).reshape(-1, 3)]
+    selected = rows[type_numbers[rows] == 126]
+    if len(selected):
+        curves = parse_126_arrays(entries.iloc[selected], tokens.take(selected))
+        t = np.linspace(0.0, 1.0, n)
+        u = curves.v0[:, None] + (curves.v1 - curves.v0)[:, None] * t
+        points = curves.evaluate(np.repeat(np.arange(len(curves)), n), u.ravel()).reshape(-1, n, 3)
+        for de, xyz in zip(curves.sequence_numbers, points):
+            lines[de] = [xyz]
+
+    def resolve(de, seen=()):
+        if de in lines:
+            return lines[de]
+        if de in members and de not in seen:
+            parts = [resolve(x, seen + (de,)) for x in members[de]]
+            if all(part is not None for part in parts):
+                return [xyz for part in parts for xyz in part]
+        return None
+
+    out = dict()
+    for de in np.unique(np.abs(de_pointers)).tolist():
+        polylines = resolve(de)
+        if polylines is not None:
+            out[de] = polylines
+    return out
+
+
+def _plane_patch(plane, polylines):
+    """bilinear patch of a plane (type 108 parameters A B C D) spanning the
+    polylines, the parameters are coordinates in the plane; returns the
+    patch and the polylines as parameters"""
+    normal = plane[:3] / np.linalg.norm(plane[:3])
+    origin = normal * plane[3] / np.linalg.norm(plane[:3])
+    e1 = np.cross(normal, [1.0, 0, 0] if abs(normal[0]) < 0.9 else [0, 1.0, 0])
+    e1 /= np.linalg.norm(e1)
+    e2 = np.cross(normal, e1)
+    uv = [np.c_[(xyz - origin).dot(e1), (xyz - origin).dot(e2)] for xyz in polylines]
+    allpoints = np.vstack(uv)
+    (u0, v0), (u1, v1) = allpoints.min(axis=0), allpoints.max(axis=0)
+    corners = origin + np.array([[u0, v0], [u1, v0], [u0, v1], [u1, v1]]).dot([e1, e2])
+    patch = (1, 1, np.array([u0, u0, u1, u1]), np.array([v0, v0, v1, v1]),
+             np.ones((2, 2)), corners.reshape(2, 2, 3).transpose(1, 0, 2), np.array([u0, u1, v0, v1]))
+    return patch, uv
+
+
+def tessellation_jobs(entries, tokens, n=16):
+    """surfaces with their trimming loops as picklable jobs
+
+    returns list of (DE pointer, patch, uv polylines, xyz polylines,
+    bounded), bounded is False if the outer boundary is the boundary of
+    the surface"""
+    index = pointer_index(entries.index.values)
+    type_numbers = entries.entity_type_number.values
+    rows = np.flatnonzero(type_numbers == 128)
+    surfaces = parse_128_arrays(entries.iloc[rows], tokens.take(rows))
+    surface_index = pointer_index(surfaces.sequence_numbers)
+
+    def ints(row, start, stop=None):
+        t = tokens[row]
+        return to_int(t[start:stop if stop is not None else start + 1]).tolist()
+
+    # loops: (DE pointer of the face, surface DE, [(kind, curve DE pointers)], bounded)
+    faces = []
+    for row in np.flatnonzero(type_numbers == 144).tolist():
+        t = tokens[row]
+        if len(t) < 5:
+            continue
+        pts, n1, n2, pto = ints(row, 1, 5)
+        boundaries = ([pto] if n1 else []) + ints(row, 5, 5 + n2)
+        loops = []
+        for boundary in boundaries:
+            b = lookup(index, [boundary])[0]
+            if b < 0 or type_numbers[b] != 142 or tokens.counts[b] < 5:
+                continue
+            bptr, cptr, pref = (ints(b, 3, 6) + [0])[:3]
+            if bptr and (pref != 2 or not cptr):
+                loops.append([("uv", bptr), ("xyz", cptr)])
+            else:
+                loops.append([("xyz", cptr), ("uv", bptr)])
+        faces.append((entries.index.values[row], abs(pts), loops, bool(n1)))
+    for row in np.flatnonzero(type_numbers == 510).tolist():
+        t = tokens[row]
+        if len(t) < 4:
+            continue
+        surf, count, outer = ints(row, 1, 4)
+        loops = []
+        for loop in ints(row, 4, 4 + count):
+            b = lookup(index, [loop])[0]
+            if b < 0 or type_numbers[b] != 508:
+                continue
+            lt, k, model, pcurves = tokens[b], 2, [], []
+            for _ in range(int(to_int(lt[1:2])[0])):
+                kind, edge_list, ndx, _, npc = to_int(lt[k:k + 5]).tolist()
+                e = lookup(index, [edge_list])[0]
+                if kind == 0 and e >= 0 and type_numbers[e] == 504:
+                    model.extend(ints(e, 2 + 5 * (ndx - 1)))
+                pcurves.extend(to_int(lt[k + 6:k + 6 + 2 * npc:2]).tolist())
+                k += 5 + 2 * npc
+            loops.append([("uv", pcurves), ("xyz", model)] if pcurves else [("xyz", model)])
+        faces.append((entries.index.values[row], abs(surf), loops, bool(outer)))
+
+    wanted = [de for face in faces for loop in face[2] for _, des in loop
+              for de in (des if isinstance(des, list) else [des]) if de]
+    polylines = curve_polylines(entries, tokens, np.array(wanted, dtype=np.int64), n)
+
+    def sample(des):
+        des = des if isinstance(des, list) else [des]
+        if not des or not all(de and abs(de) in polylines for de in des):
+            return None
+        return [xyz for de in des for xyz in polylines[abs(de)]]
+
+    jobs, used = [], set()
+    for de, surf, loops, bounded in faces:
+        uv, xyz = [], []
+        for loop in loops:
+            # first representation of the loop with supported curves
+            for kind, des in loop:
+                lines = sample(des)
+                if lines is None:
+                    continue
+                if kind == "uv":
+                    uv.extend(x[:, :2] for x in lines)
+                else:
+                    xyz.extend(lines)
+                break
+        s = lookup(index, [surf])[0]
+        if s >= 0 and type_numbers[s] == 128 and lookup(surface_index, [surf])[0] >= 0:
+            jobs.append((de, surfaces.patch(lookup(surface_index, [surf])[0]), uv, xyz, bounded))
+            used.add(surf)
+        elif s >= 0 and type_numbers[s] == 108 and bounded and xyz and not uv:
+            patch, uv = _plane_patch(to_float(tokens[s][1:5]), xyz)
+            jobs.append((de, patch, uv, [], bounded))
+    # untrimmed surfaces not used by a trimmed surface, face or curve on surface
+    for row in np.flatnonzero(type_numbers == 142).tolist():
+        used.update(np.abs(ints(row, 2)).tolist())
+    for i, de in enumerate(surfaces.sequence_numbers.tolist()):
+        if de not in used:
+            jobs.append((de, surfaces.patch(i), [], [], False))
+    return jobs
+
+
+def _segments(polylines):
+    """segment end points (s, 2, 2) of uv polylines"""
+    if not polylines:
+        return np.empty((0, 2, 2))
+    return np.concatenate([np.stack([x[:-1], x[1:]], axis=1) for x in polylines if len(x) > 1] or
+                          [np.empty((0, 2, 2))])
+
+
+def crossings(points, segments):
+    """number of segments crossed by the rays from points (m, 2) in +u"""
+    out = np.zeros(len(points), dtype=np.int64)
+    if len(segments) == 0:
+        return out
+    p, q = segments[:, 0], segments[:, 1]
+    chunk = max(1, 4 * 10 ** 6 // len(segments))
+    for start in range(0, len(points), chunk):
+        c = points[start:start + chunk, None, :]
+        straddle = (p[:, 1] > c[..., 1]) != (q[:, 1] > c[..., 1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x = p[:, 0] + (c[..., 1] - p[:, 1]) * (q[:, 0] - p[:, 0]) / (q[:, 1] - p[:, 1])
+        out[start:start + chunk] = (straddle & (c[..., 0] < x)).sum(axis=1)
+    return out
+
+
+def tessellate_patch(job, resolution=16):
+    """vertices and faces of one job of tessellation_jobs"""
+    de, patch, uv_lines, xyz_lines, bounded = job
+    u0, u1, v0, v1 = patch[6]
+    u, v = np.linspace(u0, u1, resolution + 1), np.linspace(v0, v1, resolution + 1)
+    points = surface_grid(patch, u, v).reshape(-1, 3)
+    if xyz_lines:
+        # parameters of model space loops: nearest point of a finer grid
+        fu, fv = np.linspace(u0, u1, 4 * resolution + 1), np.linspace(v0, v1, 4 * resolution + 1)
+        fine = surface_grid(patch, fu, fv).reshape(-1, 3)
+        params = np.stack(np.meshgrid(fu, fv, indexing="ij"), axis=2).reshape(-1, 2)
+        norms = (fine ** 2).sum(axis=1)
+        for xyz in xyz_lines:
+            # |x - f|^2 without the |x|^2 term, which does not change the argmin
+            nearest = (norms - 2 * xyz.dot(fine.T)).argmin(axis=1)
+            uv_lines = uv_lines + [params[nearest]]
+    nv = len(v)
+    i, j = np.meshgrid(np.arange(resolution), np.arange(resolution), indexing="ij")
+    a, b = (i * nv + j).ravel(), ((i + 1) * nv + j).ravel()
+    faces = np.r_[np.stack([a, b, b + 1], axis=1), np.stack([a, b + 1, a + 1], axis=1)]
+    segments = _segments(uv_lines)
+    if len(segments):
+        params = np.stack(np.meshgrid(u, v, indexing="ij"), axis=2).reshape(-1, 2)
+        inside = crossings(params[faces].mean(axis=1), segments) % 2 == 1
+        # loops along the border or seam of a closed surface enclose no
+        # triangle centre, the face is then the whole surface
+        if (inside == bounded).any():
+            faces = faces[inside == bounded]
+    used, faces = np.unique(faces, return_inverse=True)
+    return points[used], faces.reshape(-1, 3)
+
+
+def _tessellate_chunk(jobs, resolution):
+    parts = [tessellate_patch(job, resolution) for job in jobs]
+    return [(job[0], vertices, faces) for job, (vertices, faces) in zip(jobs, parts)]
+
+
+def tessellate(entries, tokens, resolution=16, workers=None):
+    """one Mesh of all surfaces, trimmed surfaces and faces
+
+    resolution: grid cells per parameter direction of each surface
+    workers: processes evaluating chunks of surfaces"""
+    jobs = tessellation_jobs(entries, tokens)
+    if workers and workers > 1 and len(jobs) > 1:
+        bounds = np.linspace(0, len(jobs), min(4 * workers, len(jobs)) + 1).astype(int)
+        chunks = [jobs[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = [x for chunk in executor.map(_tessellate_chunk, chunks, repeat(resolution)) for x in chunk]
+    else:
+        parts = _tessellate_chunk(jobs, resolution)
+    if not parts:
+        return Mesh(np.empty((0, 3)), np.empty((0, 3), dtype=np.int64), np.empty(0, dtype=np.int64))
+    offsets = np.cumsum([0] + [len(vertices) for _, vertices, _ in parts])
+    return Mesh(np.concatenate([vertices for _, vertices, _ in parts]),
+                np.concatenate([faces + offset for (_, _, faces), offset in zip(parts, offsets)]).astype(np.int64),
+                np.concatenate([np.full(len(faces), de, dtype=np.int64) for de, _, faces in parts]))
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+"""Hollerith aware tokenizer for the global and parameter data sections.
+
+Free format parameters are separated by the parameter delimiter and an
+entity ends with the record delimiter. A string constant ``nHxxx`` holds
+exactly n characters which may include both delimiters, so the buffer
+cannot simply be split on them.
+"""
+
+import numpy as np
+
+# the header helpers were defined here before igs.header, kept for imports
+from igs.header import HOLLERITH, global_delimiters, hollerith, split_record
+
+__all__ = ["HOLLERITH", "Tokens", "global_delimiters", "hollerith", "split_record", "to_float", "to_int",
+           "tokenize"]
+
+
+class Tokens(object):
+    """flat parameter tokens of many entities with CSR offsets
+
+    The tokens of entity i are values[indptr[i]:indptr[i + 1]]."""
+
+    def __init__(self, values, indptr):
+        self.values = values
+        self.indptr = indptr
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return self.values[self.indptr[i]:self.indptr[i + 1]].tolist()
+
+    def __repr__(self):
+        return "Tokens(entities=%d, tokens=%d)" % (len(self), len(self.values))
+
+    @property
+    def counts(self):
+        return np.diff(self.indptr)
+
+    def take(self, rows):
+        """tokens of the entities rows (-1 gives an empty entity)"""
+        rows = np.asarray(rows, dtype=np.int64)
+        valid = rows >= 0
+        starts = np.where(valid, self.indptr[:-1][rows], 0)
+        counts = np.where(valid, self.counts[rows], 0)
+        indptr = np.r_[0, np.cumsum(counts)].astype(np.int64)
+        # position of each gathered token in the source array
+        index = np.arange(indptr[-1]) - np.repeat(indptr[:-1] - starts, counts)
+        return Tokens(self.values[index], indptr)
+
+    def column(self, k):
+        """k-th token of every entity, "" where an entity has fewer tokens"""
+        out = np.full(len(self), "", dtype=object)
+        has = self.counts > k
+        out[has] = self.values[self.indptr[:-1][has] + k]
+        return out
+
+    def slice(self, start, count):
+        """tokens start .. start + count - 1 of every entity, start and count
+        may differ per entity, clipped to the tokens of the entity"""
+        counts = self.counts
+        begin = np.minimum(np.broadcast_to(start, counts.shape), counts)
+        n = np.minimum(begin + np.maximum(count, 0), counts) - begin
+        indptr = np.r_[0, np.cumsum(n)].astype(np.int64)
+        index = np.arange(indptr[-1]) - np.repeat(indptr[:-1] - self.indptr[:-1] - begin, n)
+        return Tokens(self.values[index], indptr)
+
+    @classmethod
+    def concat(cls, tokens):
+        values = np.concatenate([x.values for x in tokens]) if tokens else np.empty(0, dtype=object)
+        offsets = np.cumsum([0] + [len(x.values) for x in tokens])
+        indptr = np.concatenate([[0]] + [x.indptr[1:] + offset for x, offset in zip(tokens, offsets)])
+        return cls(values, indptr.astype(np.int64))
+
+
+def tokenize(data, starts, psep=",", rsep=";"):
+    """tokenize the parameter data of many entities in one pass
+
+    data: bytes of the concatenated parameter data
+    starts: offsets of the entities in data plus the end offset (n + 1)
+    returns Tokens"""
+    starts = np.asarray(starts, dtype=np.int64)
+    n = len(starts) - 1
+    text = data.decode("latin-1")
+    chars = np.frombuffer(data, dtype=np.uint8)
+    delimiter = (chars == ord(psep)) | (chars == ord(rsep))
+
+    # Hollerith candidates: a digit run followed by H at the start of a token
+    heads = np.flatnonzero(chars[1:] == 72) + 1
+    heads = heads[(chars[heads - 1] >= 48) & (chars[heads - 1] <= 57)]
+    begin = heads.copy()
+    step = begin > 0
+    while step.any():
+        previous = chars[np.maximum(begin - 1, 0)]
+        step = (begin > 0) & (previous >= 48) & (previous <= 57)
+        begin -= step
+    before = begin - 1
+    step = before >= 0
+    while step.any():
+        step = (before >= 0) & (chars[np.maximum(before, 0)] == 32)
+        before -= step
+    valid = (before < 0) | delimiter[np.maximum(before, 0)]
+    # the only sequential step, strings may contain further candidates
+    begins, ends = [], []
+    for b, h in zip(begin[valid].tolist(), heads[valid].tolist()):
+        if not ends or b >= ends[-1]:
+            begins.append(b)
+            ends.append(h + 1 + int(text[b:h]))
+
+    delimiters = np.flatnonzero(delimiter)
+    if begins:
+        span = np.searchsorted(begins, delimiters, side="right") - 1
+        delimiters = delimiters[(span < 0) | (delimiters >= np.asarray(ends)[span])]
+    entity = np.searchsorted(starts, delimiters, side="right") - 1
+
+    # an entity ends at its first record delimiter or at its last byte
+    end = starts[1:].copy()
+    records = chars[delimiters] == ord(rsep)
+    first, index = np.unique(entity[records], return_index=True)
+    if len(first):
+        end[first] = delimiters[records][index]
+    terminated = end < starts[1:]
+    keep = delimiters < end[entity]
+    delimiters, entity = delimiters[keep], entity[keep]
+
+    # mark every token end and entity start with NUL and split the buffer
+    # once; the piece between a record delimiter and the next entity
+    # holds comments and padding only
+    buf = chars.copy()
+    if b"\x00" in data:
+        buf[buf == 0] = 32
+    buf[delimiters] = 0
+    buf[end[terminated]] = 0
+    buf = np.insert(buf, starts[1:], 0)
+    pieces = buf.tobytes().decode("latin-1").split("\x00")
+    counts = np.bincount(entity, minlength=n) + 1
+    comments = (np.cumsum(counts + terminated) - 1)[terminated]
+    values = np.empty(len(pieces) - 1, dtype=object)
+    values[:] = list(map(str.strip, pieces[:-1]))
+    values = np.delete(values, comments)
+    indptr = np.r_[0, np.cumsum(counts)].astype(np.int64)
+
+    # Hollerith strings keep their trailing blanks
+    blanks = [(b, e) for b, e in zip(begins, ends) if text[e - 1:e].isspace()]
+    if blanks:
+        token_end = np.r_[delimiters, end][np.argsort(np.r_[entity, np.arange(n)], kind="stable")]
+        for b, e in blanks:
+            i = np.searchsorted(token_end, e)
+            if i < len(values):
+                values[i] = text[b:e]
+
+    # entities without parameters have a single blank token
+    blank = np.zeros(len(values), dtype=bool)
+    blank[indptr[1:][counts == 1] - 1] = values[indptr[1:][counts == 1] - 1] == ""
+    counts = counts - blank[indptr[1:] - 1]
+    return Tokens(values[~blank], np.r_[0, np.cumsum(counts)].astype(np.int64))
+
+
+def to_float(values, default=0.0):
+    """convert tokens to float64, blank tokens give default"""
+    values = np.asarray(values, dtype=str)
+    out = np.full(len(values), default, dtype=np.float64)
+    given = values != ""
+    if given.any():
+        out[given] = np.char.replace(np.char.upper(values[given]), "D", "E").astype(np.float64)
+    return out
+
+
+def to_int(values, default=0):
+    """convert tokens to int64, blank tokens give default"""
+    return to_float(values, default).astype(np.int64)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""transformation matrices (type 124) and their batch application."""
+
+import numpy as np
+
+from igs.graph import lookup, pointer_index
+from igs.tokenizer import to_float
+
+# type data columns holding points and directions, transformed to model space
+POINT_COLUMNS = {110: [("x1", "y1", "z1"), ("x2", "y2", "z2")], 116: [("x", "y", "z")]}
+VECTOR_COLUMNS = {126: [("xnorm", "ynorm", "znorm")]}
+# types defined in a plane z = zt of their definition space, their columns
+# cannot hold a transformed entity: circular arc (100)
+PLANAR_TYPES = [100]
+
+
+def parse_124_arrays(tokens):
+    """4.21 Transformation Matrix Entity (Type 124), array (n, 3, 4) of
+    [R | T] from the parameters R11 R12 R13 T1 R21 .. T3"""
+    return np.stack([to_float(tokens.column(k)) for k in range(1, 13)], axis=1).reshape(-1, 3, 4)
+
+
+def compose(a, b):
+    """a after b for arrays of [R | T] matrices (n, 3, 4)"""
+    out = np.einsum("nij,njk->nik", a[:, :, :3], b)
+    out[:, :, 3] += a[:, :, 3]
+    return out
+
+
+def resolve_chains(matrices, parent):
+    """compose every matrix with the matrices it points to
+
+    parent: row of the matrix each matrix points to, -1 for none
+    Pointer jumping, log2 of the chain length steps over all matrices."""
+    matrices = matrices.copy()
+    parent = np.asarray(parent, dtype=np.int64).copy()
+    for _ in range(64): # deeper chains are cycles
+        todo = np.flatnonzero(parent >= 0)
+        if len(todo) == 0:
+            break
+        matrices[todo] = compose(matrices[parent[todo]], matrices[todo])
+        parent[todo] = parent[parent[todo]]
+    return matrices
+
+
+def entity_transforms(entries, tokens):
+    """model space transforms of the entries
+
+    returns the row of each entry in matrices (-1 for none) and the
+    composed matrices (n, 3, 4) of the type 124 entities"""
+    index = pointer_index(entries.index.values)
+    rows = np.flatnonzero(entries.entity_type_number.values == 124)
+    matrices = parse_124_arrays(tokens.take(rows))
+    # position of every entry among the 124 entities
+    position = np.full(len(entries), -1, dtype=np.int64)
+    position[rows] = np.arange(len(rows))
+    pointer = entries.transfromation_matrix.values.astype(np.int64)
+    target = np.where(pointer > 0, lookup(index, np.maximum(pointer, 0)), -1)
+    target = np.where(target >= 0, position[np.maximum(target, 0)], -1)
+    return target, resolve_chains(matrices, target[rows])
+
+
+def apply_points(matrices, xyz):
+    """points (n, 3) with their matrices (n, 3, 4)"""
+    return np.einsum("nij,nj->ni", matrices[:, :, :3], xyz) + matrices[:, :, 3]
+
+
+def apply_vectors(matrices, xyz):
+    """directions (n, 3) with the rotation of their matrices (n, 3, 4)"""
+    return np.einsum("nij,nj->ni", matrices[:, :, :3], xyz)
+
+
+def to_model_space(df, target, matrices, points=(), vectors=()):
+    """copy of a type DataFrame with its point and vector columns
+    transformed, target: matrix row of each row of df (-1 for none)"""
+    df = df.copy()
+    rows = np.flatnonzero(target >= 0)
+    if len(rows) == 0:
+        return df
+    m = matrices[target[rows]]
+    for columns, apply in [(points, apply_points), (vectors, apply_vectors)]:
+        for names in columns:
+            positions = [df.columns.get_loc(name) for name in names]
+            xyz = df.iloc[rows, positions].values.astype(np.float64)
+            for position, values in zip(positions, apply(m, xyz).T):
+                df.iloc[rows, position] = values
+    return df
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+"""structural checks of iges files."""
+
+import numpy as np
+
+from igs.graph import lookup, pointer_index, pointer_parameters
+from igs.sections import SECTION_CODES, fixed_int
+from igs.tokenizer import to_int
+
+
+def validate(iges):
+    """list of problems found in iges (empty if none)
+
+    Checks the section sequence numbers and the counts of the T section,
+    the directory entry pairs, the P lines of every entity and the DE
+    pointers in the parameters."""
+    problems = []
+    entries = iges.entries # loads a lazy Iges
+    sections = iges._sections
+    for code in SECTION_CODES:
+        numbers = fixed_int(sections[code][:, 73:80])
+        wrong = np.flatnonzero(numbers != np.arange(1, len(numbers) + 1))
+        if len(wrong):
+            problems.append("%s section: sequence number %d at record %d" % (code, numbers[wrong[0]], wrong[0] + 1))
+    if len(sections["T"]):
+        counts = fixed_int(sections["T"][0, :32].reshape(4, 8)[:, 1:])
+        for code, count in zip("SGDP", counts.tolist()):
+            if count != len(sections[code]):
+                problems.append("T section: %d %s records, found %d" % (count, code, len(sections[code])))
+    else:
+        problems.append("T section missing")
+
+    d = sections["D"]
+    if len(d) % 2:
+        problems.append("D section: odd number of records")
+    d = d[:len(d) // 2 * 2]
+    repeated = fixed_int(d[1::2, :8]) != fixed_int(d[0::2, :8])
+    for i in np.flatnonzero(repeated)[:10].tolist():
+        problems.append("DE %d: entity type differs between the two records" % (2 * i + 1))
+
+    # every P line of an entity points back to it
+    first, count = entries.parameter_data.values.astype(np.int64), entries.parameter_line_count.values.astype(np.int64)
+    back = fixed_int(sections["P"][:, 64:72])
+    line = np.repeat(first - 1, count) + np.arange(count.sum()) - np.repeat(np.cumsum(count) - count, count)
+    owner = np.repeat(entries.index.values, count)
+    inside = (line >= 0) & (line < len(back))
+    wrong = np.unique(owner[~inside | (back[np.where(inside, line, 0)] != owner)])
+    for de in wrong[:10].tolist():
+        problems.append("DE %d: parameter lines do not point back to the entity" % de)
+    if len(wrong) > 10:
+        problems.append("%d more entities with wrong parameter lines" % (len(wrong) - 10))
+
+    tokens = iges.tokens
+    wrong = np.flatnonzero(to_int(tokens.column(0)) != entries.entity_type_number.values)
+    for de in entries.index.values[wrong[:10]].tolist():
+        problems.append("DE %d: parameter data starts with another entity type" % de)
+
+    rows, token_index = pointer_parameters(entries, tokens)
+    pointers = to_int(tokens.values[token_index])
+    dangling = (pointers != 0) & (lookup(pointer_index(entries.index.values), pointers) < 0)
+    for de, pointer in zip(entries.index.values[rows[dangling]][:10].tolist(), pointers[dangling][:10].tolist()):
+        problems.append("DE %d: pointer %d to no entity" % (de, pointer))
+    if dangling.sum() > 10:
+        problems.append("%d more pointers to no entity" % (dangling.sum() - 10))
+    return problems
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+
+"""write the in-memory tables as an iges file.
+
+The D and P records are formatted in bulk as (n, 81) byte arrays, fixed
+width integers by digit arithmetic and the free format parameters by
+packing whole tokens into the 64 data columns. Entities are processed in
+chunks; the P line counts of all entities are needed before the D section
+is written, so the parameters are packed twice, once to count and once to
+write.
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+from igs.graph import DIRECTORY_POINTERS, lookup, pointer_index, pointer_parameters, trailing_pointers
+from igs.header import hollerith
+from igs.igs import DIRECTORY_FIELDS, STATUS_FIELDS
+from igs.sections import RECORD_LENGTH
+from igs.tokenizer import to_int
+
+# type data columns written back to the parameter positions 1, 2, ...
+TOKEN_COLUMNS = {110: ["x1", "y1", "z1", "x2", "y2", "z2"]}
+CHUNK_SIZE = 65536
+
+
+def format_int(values, width, fill=32):
+    """right aligned fixed width integer fields, uint8 array (n, width)
+
+    fill: byte left of the digits, 48 gives leading zeros"""
+    values = np.asarray(values, dtype=np.int64)
+    magnitude = np.abs(values)
+    power = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    digits = magnitude[:, None] // power % 10
+    count = (magnitude[:, None] >= power[:-1]).sum(axis=1) + 1
+    column = np.arange(width)
+    first = width - count
+    out = np.where(column >= first[:, None], digits + 48, fill).astype(np.uint8)
+    negative = np.flatnonzero(values < 0)
+    out[negative, np.maximum(first[negative] - 1, 0)] = 45
+    return out
+
+
+def format_real(values):
+    """shortest round trip text of floats with a decimal point, e.g. 1. and 1.E-05"""
+    text = np.asarray(values, dtype=np.float64).astype(str)
+    text = np.char.upper(text)
+    whole = np.flatnonzero(np.char.endswith(text, ".0"))
+    text[whole] = [x[:-1] for x in text[whole].tolist()]
+    bare = (np.char.find(text, ".") < 0) & (np.char.find(text, "E") >= 0)
+    if bare.any():
+        text[bare] = np.char.replace(text[bare], "E", ".E")
+    return text
+
+
+def _records(data, offsets, lengths):
+    """(n, 81) records with data[offsets[i]:offsets[i] + lengths[i]] in the
+    first columns, blanks and a line feed"""
+    n = len(offsets)
+    out = np.full((n, RECORD_LENGTH + 1), 32, dtype=np.uint8)
+    out[:, RECORD_LENGTH] = 10
+    line = np.repeat(np.arange(n), lengths)
+    column = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    out[line, column] = data[np.repeat(offsets, lengths) + column]
+    return out
+
+
+def pack_text(pieces, strings, width):
+    """lines of at most width characters from the pieces (token plus
+    delimiter); pieces flagged as strings may continue on the next line
+    and fill the line completely, other pieces are not split"""
+    lines, line = [], ""
+    for piece, string in zip(pieces, strings):
+        if len(line) + len(piece) <= width:
+            line += piece
+        elif string:
+            while len(line) + len(piece) > width:
+                cut = width - len(line)
+                lines.append(line + piece[:cut])
+                line, piece = "", piece[cut:]
+            line = piece
+        else:
+            if line:
+                lines.append(line)
+            line = piece
+    if line or not lines:
+        lines.append(line)
+    return lines
+
+
+def pack_parameters(tokens, psep=",", rsep=";", width=64):
+    """pack the tokens of every entity into lines
+
+    returns the data bytes, the entity, offset and length of every line
+    (in entity order)"""
+    n = len(tokens)
+    counts = tokens.counts
+    values = tokens.values
+    # every entity has at least the record delimiter
+    empty = np.flatnonzero(counts == 0)
+    if len(empty):
+        values = np.insert(values, tokens.indptr[empty], "")
+        counts = np.maximum(counts, 1)
+    indptr = np.r_[0, np.cumsum(counts)].astype(np.int64)
+    delimiters = np.full(len(values), psep, dtype=object)
+    delimiters[indptr[1:] - 1] = rsep
+    pieces = values + delimiters
+    lengths = np.fromiter(map(len, pieces), dtype=np.int64, count=len(pieces))
+    entity = np.repeat(np.arange(n), counts)
+
+    cum = np.r_[0, np.cumsum(lengths)]
+    joined = "".join(pieces)
+    data = np.frombuffer(joined.encode("latin-1"), dtype=np.uint8)
+
+    # entities with string constants go the exact way, candidates are the
+    # pieces with an H
+    strings = np.zeros(len(pieces), dtype=bool)
+    candidates = np.unique(np.searchsorted(cum, np.flatnonzero(data == 72), side="right") - 1)
+    strings[candidates] = [hollerith(x) is not x for x in values[candidates]]
+    slow = np.zeros(n, dtype=bool)
+    slow[entity[strings | (lengths > width)]] = True
+
+    # greedy packing: a line starting at piece i takes the pieces up to the
+    # last one that fits, walk all entities one line at a time
+    end = indptr[1:][entity]
+    stop = np.minimum(np.searchsorted(cum, cum[:-1] + width, side="right") - 1, end)
+    frontier = indptr[:-1][~slow]
+    starts = []
+    while len(frontier):
+        starts.append(frontier)
+        following = stop[frontier]
+        frontier = following[following < end[frontier]]
+    starts = np.sort(np.concatenate(starts)) if starts else np.empty(0, dtype=np.int64)
+    line_entity = entity[starts]
+    line_stop = np.minimum(np.r_[starts[1:], len(pieces)], end[starts])
+    offsets, line_lengths = cum[starts], cum[line_stop] - cum[starts]
+
+    if slow.any():
+        extra = []
+        for i in np.flatnonzero(slow).tolist():
+            a, b = indptr[i], indptr[i + 1]
+            extra.extend((i, x) for x in pack_text(pieces[a:b].tolist(), strings[a:b].tolist(), width))
+        lengths = np.array([len(x) for _, x in extra], dtype=np.int64)
+        offsets = np.r_[offsets, len(data) + np.r_[0, np.cumsum(lengths)[:-1]]].astype(np.int64)
+        line_lengths = np.r_[line_lengths, lengths]
+        line_entity = np.r_[line_entity, [i for i, _ in extra]].astype(np.int64)
+        data = np.r_[data, np.frombuffer("".join(x for _, x in extra).encode("latin-1"), dtype=np.uint8)]
+        order = np.argsort(line_entity, kind="stable")
+        offsets, line_lengths, line_entity = offsets[order], line_lengths[order], line_entity[order]
+    return data, line_entity, offsets, line_lengths
+
+
+def parameter_records(tokens, de_pointers, first_sequence_number, psep=",", rsep=";"):
+    """P section records (n, 81) of the entities with their tokens"""
+    data, entity, offsets, lengths = pack_parameters(tokens, psep, rsep)
+    out = _records(data, offsets, lengths)
+    out[:, 64:72] = format_int(np.asarray(de_pointers)[entity], 8)
+    out[:, 72] = ord("P")
+    out[:, 73:80] = format_int(first_sequence_number + np.arange(len(entity)), 7)
+    return out, np.bincount(entity, minlength=len(tokens))
+
+
+def directory_records(entries, sequence_numbers, parameter_data, line_counts):
+    """D section records (2 n, 81) of entries"""
+    n = len(entries)
+    fields = np.full((n, 18, 8), 32, dtype=np.uint8)
+    for i, name in enumerate(DIRECTORY_FIELDS):
+        if name == "status_number":
+            for k, flag in enumerate(STATUS_FIELDS):
+                fields[:, i, 2 * k:2 * k + 2] = format_int(entries[flag].values, 2, fill=48)
+        elif name == "entry_label":
+            labels = np.char.rjust(np.asarray(entries[name].astype(str).values, dtype=str), 8)
+            fields[:, i] = np.frombuffer(np.char.encode(labels, "latin-1").astype("S8").tobytes(),
+                                         dtype=np.uint8).reshape(n, 8)
+        elif name == "parameter_data":
+            fields[:, i] = format_int(parameter_data, 8)
+        elif name == "parameter_line_count":
+            fields[:, i] = format_int(line_counts, 8)
+        elif name is not None:
+            fields[:, i] = format_int(entries[name].values, 8)
+        elif i == 9: # entity type number (repeated)
+            fields[:, i] = format_int(entries["entity_type_number"].values, 8)
+    out = np.full((n, 2, RECORD_LENGTH + 1), 32, dtype=np.uint8)
+    out[:, :, :72] = fields.reshape(n, 2, 72)
+    out[:, :, 72] = ord("D")
+    out[:, :, RECORD_LENGTH] = 10
+    out[:, 0, 73:80] = format_int(sequence_numbers, 7)
+    out[:, 1, 73:80] = format_int(np.asarray(sequence_numbers) + 1, 7)
+    return out.reshape(2 * n, RECORD_LENGTH + 1)
+
+
+def _text_records(lines, section_code):
+    data = "".join(lines).encode("latin-1")
+    lengths = np.array([len(x) for x in lines], dtype=np.int64)
+    out = _records(np.frombuffer(data, dtype=np.uint8), np.r_[0, np.cumsum(lengths)[:-1]].astype(np.int64),
+                   lengths)
+    out[:, 72] = ord(section_code)
+    out[:, 73:80] = format_int(np.arange(1, len(lines) + 1), 7)
+    return out
+
+
+def global_records(global_section, psep=",", rsep=";"):
+    """G section records from the values of Iges.global_section"""
+    values = ["" if pd.isna(x) else str(x) for x in global_section["value"].tolist()]
+    values[:2] = ["1H" + psep, "1H" + rsep]
+    while len(values) > 2 and values[-1] == "":
+        values.pop()
+    pieces = [x + psep for x in values[:-1]] + [values[-1] + rsep]
+    return _text_records(pack_text(pieces, [hollerith(x) is not x for x in values], 72), "G")
+
+
+def renumber(entries, tokens, rows, selected=None):
+    """entries and tokens of rows with new sequence numbers 1, 3, 5, ...
+
+    selected: the directory entries of rows to write, default entries.iloc[rows]
+    Pointers in the directory fields, the parameters and the associativity
+    and property pointer blocks (igs.graph.trailing_pointers) are mapped to
+    the new sequence numbers, pointers to entities not in rows become 0.
+    Parameters of types not in igs.graph.PARAMETER_COUNTS and
+    POINTER_PARAMETERS are copied unchanged."""
+    source = entries.iloc[rows] if selected is None else selected
+    old = pointer_index(entries.index.values)
+    new = np.full(len(entries), 0, dtype=np.int64)
+    new[rows] = 2 * np.arange(len(rows)) + 1
+
+    def mapped(pointers):
+        pointers = np.asarray(pointers, dtype=np.int64)
+        target = lookup(old, pointers)
+        return np.where(target >= 0, np.sign(pointers) * new[np.maximum(target, 0)], 0)
+
+    out = source.copy()
+    for name, negative in DIRECTORY_POINTERS:
+        values = out[name].values.astype(np.int64)
+        pointer = values < 0 if negative else values > 0
+        out[name] = np.where(pointer, mapped(values), values).astype(out[name].dtype)
+    out.index = new[rows].astype(out.index.dtype)
+    out.index.name = entries.index.name
+    out["sequence_number"] = out.index.values
+    tokens = tokens.take(rows)
+    token_index = np.r_[pointer_parameters(out, tokens)[1], trailing_pointers(out, tokens)[1]]
+    if len(token_index):
+        values = tokens.values.copy()
+        values[token_index] = mapped(to_int(values[token_index])).astype(str)
+        tokens.values = values
+    return out, tokens
+
+
+def write(iges, fh, entries=None, type_dfs=None, model_space=False, chunk_size=CHUNK_SIZE):
+    """write iges as an iges file
+
+    fh: path (str or os.PathLike) or binary file object
+    entries: subset of iges.entries to write (default all), possibly with
+        changed directory fields
+    type_dfs: dict entity type number -> type DataFrame whose TOKEN_COLUMNS
+        replace the parameters, e.g. transformed coordinates
+    model_space: the type_dfs hold model space coordinates (get_type_df(n,
+        model_space=True)), their entities are written without
+        transformation matrix"""
+    if isinstance(fh, str) or hasattr(fh, "__fspath__"):
+        with open(fh, "wb") as f:
+            return write(iges, f, entries, type_dfs, model_space, chunk_size)
+    if isinstance(fh, io.TextIOBase):
+        raise TypeError("open the file in binary mode")
+    rows = np.arange(len(iges.entries)) if entries is None else iges.entries.index.get_indexer(entries.index)
+    if (rows < 0).any():
+        raise ValueError("entries not in iges.entries")
+    old_sequence_numbers = iges.entries.index.values[rows]
+    entries, tokens = renumber(iges.entries, iges.tokens, rows, entries)
+    for type_entity_number, df in (type_dfs or dict()).items():
+        columns = TOKEN_COLUMNS.get(type_entity_number)
+        if columns is None:
+            raise ValueError("type data of %d can not be written" % type_entity_number)
+        selected = np.flatnonzero(entries.entity_type_number.values == type_entity_number)
+        df = df.reindex(old_sequence_numbers[selected])
+        values = tokens.values.copy()
+        for position, name in enumerate(columns, 1):
+            has = tokens.counts[selected] > position
+            values[tokens.indptr[selected[has]] + position] = format_real(df[name].values[has])
+        tokens.values = values
+        if model_space:
+            # the matrix is applied already, a reader must not apply it again
+            matrix = entries.columns.get_loc("transfromation_matrix")
+            entries.iloc[selected, matrix] = 0
+
+    bounds = list(range(0, len(entries), chunk_size)) + [len(entries)]
+    chunks = list(zip(bounds[:-1], bounds[1:]))
+    # first pass: P line counts of all entities
+    line_counts = np.zeros(len(entries), dtype=np.int64)
+    for a, b in chunks:
+        line_counts[a:b] = np.bincount(pack_parameters(tokens.take(np.arange(a, b)), iges.psep, iges.rsep)[1],
+                                       minlength=b - a)
+    parameter_data = np.r_[1, 1 + np.cumsum(line_counts)[:-1]] if len(entries) else line_counts
+
+    start = iges.start_section
+    start_lines = start["data"].tolist() if start is not None and len(start) else [""]
+    sections = [_text_records([x[:72] for x in start_lines], "S"), global_records(iges.global_section, iges.psep, iges.rsep)]
+    for section in sections:
+        fh.write(section.tobytes())
+    sequence_numbers = entries.index.values
+    for a, b in chunks:
+        fh.write(directory_records(entries.iloc[a:b], sequence_numbers[a:b],
+                                   parameter_data[a:b], line_counts[a:b]).tobytes())
+    for a, b in chunks:
+        records, _ = parameter_records(tokens.take(np.arange(a, b)), sequence_numbers[a:b], parameter_data[a],
+                                       iges.psep, iges.rsep)
+        fh.write(records.tobytes())
+    terminate = "S%7dG%7dD%7dP%7d" % (len(sections[0]), len(sections[1]), 2 * len(entries), line_counts.sum())
+    fh.write(_text_records([terminate], "T").tobytes())
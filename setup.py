@@ -12,8 +12,8 @@ with open('HISTORY.rst') as history_file:
     history = history_file.read()
 
 requirements = [
-    'numpy>=1.11.1'
-    'pandas>=0.19.2'
+    'numpy>=1.11.1',
+    'pandas>=0.19.2',
     # 'Click>=6.0',
     # TODO: put package requirements here
 ]
@@ -38,12 +38,13 @@ setup(
     url='https://github.com/lepy/igs',
     packages=find_packages(include=['igs']),
     entry_points={
-        # 'console_scripts': [
-        #     'igs=igs.cli:main'
-        # ]
+        'console_scripts': [
+            'igs=igs.cli:main'
+        ]
     },
     include_package_data=True,
     install_requires=requirements,
+    python_requires=">=3.9",
     license="MIT license",
     zip_safe=False,
     keywords='igs',
@@ -52,11 +53,12 @@ setup(
         'Intended Audience :: Developers',
         'License :: OSI Approved :: MIT License',
         'Natural Language :: English',
-        "Programming Language :: Python :: 2",
-        'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
+        'Programming Language :: Python :: 3.12',
     ],
     test_suite='tests',
     tests_require=test_requirements,
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+
+"""small synthetic iges files shared by the tests."""
+
+
+def record(text, section_code, sequence_number):
+    return "%-72s%s%7d\n" % (text, section_code, sequence_number)
+
+
+def iges_text(entities):
+    """minimal iges file of entities (type, parameters, transformation matrix DE pointer)"""
+    d, p = [], []
+    for i, (type_number, parameters, matrix) in enumerate(entities):
+        lines = [parameters[k:k + 64] for k in range(0, len(parameters), 64)]
+        d.append(record("%8d%8d%8d%8d%8d%8d%8d%8d%8s" % (type_number, len(p) + 1, 0, 0, 0, 0, matrix, 0, "00000000"),
+                        "D", 2 * i + 1))
+        d.append(record("%8d%8d%8d%8d%8d" % (type_number, 0, 0, len(lines), 0), "D", 2 * i + 2))
+        p.extend(record("%-64s%8d" % (line, 2 * i + 1), "P", len(p) + 1) for line in lines)
+    return (record("", "S", 1) + record("1H,,1H;;", "G", 1) + "".join(d) + "".join(p) +
+            record("S%7dG%7dD%7dP%7d" % (1, 1, len(d), len(p)), "T", 1))
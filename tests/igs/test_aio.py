@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import asyncio
+import os
+import threading
+
+import pandas as pd
+import pytest
+
+import igs
+from igs.aio import Loader
+
+FILE = os.path.join(os.path.dirname(__file__), "test001.iges")
+
+
+class Stream(object):
+    """stream with a coroutine read like asyncio.StreamReader"""
+
+    def __init__(self, data):
+        self.data = data
+
+    async def read(self, n):
+        chunk, self.data = self.data[:n], self.data[n:]
+        return chunk
+
+
+def test_aload():
+    async def main():
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0)
+
+        task = asyncio.ensure_future(ticker())
+        iges = await igs.aload(FILE, types=[126])
+        with open(FILE, "rb") as f:
+            other = await igs.aload(Stream(f.read()))
+        task.cancel()
+        return iges, other, len(ticks)
+
+    iges, other, ticks = asyncio.run(main())
+    ref = igs.Iges(FILE)
+    pd.testing.assert_frame_equal(iges.entries, ref.entries)
+    pd.testing.assert_frame_equal(other.entries, ref.entries)
+    assert 126 in iges._type_dfs
+    assert ticks > 3 # the loop kept running during the stages
+
+
+def test_limit_and_cancel():
+    running = []
+    lock = threading.Lock()
+
+    def hook(stage):
+        with lock:
+            running.append(stage.name)
+
+    async def main():
+        loader = Loader(max_concurrent=1, hooks=[hook])
+        first = asyncio.ensure_future(loader.load(FILE))
+        second = asyncio.ensure_future(loader.load(FILE))
+        await asyncio.sleep(0.01)
+        second.cancel()
+        iges = await first
+        with pytest.raises(asyncio.CancelledError):
+            await second
+        return iges
+
+    iges = asyncio.run(main())
+    # the second load waited for the first and never started
+    assert running == [stage.name for stage in iges.stats]
+
+
+def test_cancel_between_stages():
+    stages, go = [], threading.Event()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+
+        def hook(stage):
+            stages.append(stage.name)
+            if stage.name == "read":
+                loop.call_soon_threadsafe(started.set)
+                go.wait(5)
+
+        task = asyncio.ensure_future(Loader(hooks=[hook]).load(FILE))
+        await started.wait()
+        task.cancel()
+        go.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    # the running stage finished, no other stage started
+    assert stages == ["read"]
+
+
+def test_cancel_keeps_slot():
+    events, go = [], threading.Event()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        started = asyncio.Event()
+
+        def hook(stage):
+            events.append(stage.name)
+            if len(events) == 1:
+                loop.call_soon_threadsafe(started.set)
+                go.wait(5)
+                events.append("finished")
+
+        loader = Loader(max_concurrent=1, hooks=[hook])
+        first = asyncio.ensure_future(loader.load(FILE))
+        second = asyncio.ensure_future(loader.load(FILE))
+        await started.wait()
+        first.cancel()
+        # the second load must not start while the stage of the first runs
+        await asyncio.sleep(0.1)
+        go.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    iges = asyncio.run(main())
+    assert events == ["read", "finished"] + [stage.name for stage in iges.stats]
+
+
+def test_unsupported_options():
+    for option in ["memory", "lazy", "save_index"]:
+        with pytest.raises(ValueError, match=option):
+            Loader(**{option: True})
+    assert Loader(workers=None, cache=None, hooks=[]).kwargs["hooks"] == []
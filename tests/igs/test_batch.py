@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+
+import igs
+import igs.igs
+
+modulepath = os.path.dirname(__file__)
+filepath = os.path.join(modulepath, "test001.iges")
+
+
+def test_load_many(tmpdir):
+    copy = str(tmpdir.join("copy.iges"))
+    shutil.copy(filepath, copy)
+    broken = str(tmpdir.join("broken.iges"))
+    with open(broken, "w") as fh:
+        fh.write("     110       1" + " " * 56 + "D      1\n")
+    result = igs.load_many([filepath, broken, copy], workers=2)
+    assert len(result.entries) == 2 * 1049
+    assert result.entries.index.names == ["source_file", "sequence_number"]
+    assert result.entries.loc[copy].entity_type_number.iloc[0] == 186
+    assert list(result.errors) == [broken]
+    assert sorted(result.type_dfs) == sorted(igs.igs.TYPE_PARSERS)
+    serial = igs.load_many([filepath, copy])
+    assert serial.entries.equals(result.entries)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import igs.igs
+from igs.cache import ParseCache
+
+modulepath = os.path.dirname(__file__)
+filepath = os.path.join(modulepath, "test001.iges")
+
+
+def test_cache_roundtrip(tmpdir, monkeypatch):
+    cache = ParseCache(str(tmpdir))
+    iges = igs.igs.Iges(filepath, cache=cache)
+    assert len(cache.entries()) == 1
+
+    # a hit restores the parsed state without parsing
+    def fail(self):
+        raise AssertionError("parsed again")
+    monkeypatch.setattr(igs.igs.Iges, "read_data_entries", fail)
+    cached = igs.igs.Iges(filepath, cache=str(tmpdir))
+    assert cached.entries.equals(iges.entries)
+    assert cached.tokens.values.tolist() == iges.tokens.values.tolist()
+    assert cached.global_section.equals(iges.global_section)
+    assert sorted(cached._type_dfs) == sorted(igs.igs.TYPE_PARSERS)
+
+
+def test_cache_eviction(tmpdir):
+    cache = ParseCache(str(tmpdir), max_bytes=1)
+    cache.store("a", {"x": 1})
+    assert cache.load("a") is None
+    cache.max_bytes = 10 ** 6
+    cache.store("a", {"x": 1})
+    cache.store("b", {"x": 2})
+    os.utime(cache.path("a"), (0, 0))
+    cache.evict(max_bytes=os.path.getsize(cache.path("b")))
+    assert cache.load("a") is None
+    assert cache.load("b") == {"x": 2}
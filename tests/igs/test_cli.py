@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from igs.cli import main
+
+from helpers import iges_text
+
+FILE = os.path.join(os.path.dirname(__file__), "test001.iges")
+
+
+def test_info(capsys):
+    assert main(["info", FILE]) == 0
+    out = capsys.readouterr().out
+    assert "file_name: LED Party Cup v2" in out
+    assert "parameter_delimiter: ," in out
+
+
+def test_info_without_pandas():
+    code = "import sys; from igs.cli import main; main(['info', %r]); print(sorted({'numpy', 'pandas'} & set(sys.modules)))" % FILE
+    out = subprocess.check_output([sys.executable, "-c", code], universal_newlines=True)
+    assert out.strip().splitlines()[-1] == "[]"
+
+
+def test_stats(capsys):
+    assert main(["stats", FILE]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[-1].split() == ["total", "1049"]
+    assert ["128", "177"] in [line.split() for line in lines]
+
+
+def test_extract(tmpdir, capsys):
+    path = str(tmpdir.join("lines.csv"))
+    assert main(["extract", FILE, "--type", "126", "-o", path]) == 0
+    assert len(pd.read_csv(path)) == 507
+    assert main(["extract", FILE, "--type", "314", "--format", "json"]) == 0
+    assert '"cname":"Steel - Satin"' in capsys.readouterr().out
+    # entries of types without a parser
+    assert main(["extract", FILE, "--type", "186", "--format", "json"]) == 0
+    assert '"entity_type_number":186' in capsys.readouterr().out
+
+
+def test_validate(tmpdir, capsys):
+    assert main(["validate", FILE]) == 0
+    assert capsys.readouterr().out.strip() == "ok"
+    path = tmpdir.join("broken.igs")
+    path.write(iges_text([(102, "102,1,99;", 0)]))
+    assert main(["validate", str(path)]) == 1
+    assert "DE 1: pointer 99 to no entity" in capsys.readouterr().out
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+import igs.igs
+from igs.diff import fingerprints
+
+from helpers import iges_text
+
+
+def load(entities):
+    return igs.igs.Iges(iges_text(entities).encode())
+
+
+def test_fingerprints():
+    a = load([(110, "110,0.,0.,0.,1.,0.,0.;", 0), (110, "110,0.,0.,0.,2.,0.,0.;", 0)])
+    b = load([(110, "110,0.,0.,0.,2.,0.,0.;", 0), (110, "110,0.,0.,0.,2.,0.,0.;", 0)])
+    fa = fingerprints(a._sections["D"], a._sections["P"])
+    fb = fingerprints(b._sections["D"], b._sections["P"])
+    assert fa.dtype == np.uint64
+    assert fa[0] != fb[0] and fa[1] == fb[1] == fb[0]
+
+
+def test_update():
+    old = [(110, "110,0.,0.,0.,1.,0.,0.;", 0),
+           (110, "110,0.,0.,0.,2.,0.,0.;", 0),
+           (402, "402,2,1,3;", 0),
+           (110, "110,0.,0.,0.,3.,0.,0.;", 0)]
+    new = [(110, "110,0.,0.,0.,1.,0.,0.;", 0),
+           (110, "110,5.,0.,0.,2.,0.,0.;", 0),
+           (402, "402,2,1,3;", 0),
+           (110, "110," + ",".join(["3.00000000000"] * 6) + ";", 0), # two P lines now
+           (110, "110,0.,0.,0.,4.,0.,0.;", 0)]
+    iges = load(old)
+    iges.parse_entries()
+    graph = iges.graph
+    changes = iges.update(iges_text(new).encode())
+    assert changes.added.tolist() == [9]
+    assert changes.removed.tolist() == []
+    assert changes.changed.tolist() == [3, 7]
+    assert iges._graph is None and graph is not None
+    assert [stage.entities for stage in iges.stats if stage.name == "parameters"][-1] == 3
+
+    ref = load(new)
+    ref.parse_entries()
+    pd.testing.assert_frame_equal(iges.entries, ref.entries)
+    assert iges.tokens.values.tolist() == ref.tokens.values.tolist()
+    for n in [110, 402]:
+        pd.testing.assert_frame_equal(iges.get_type_df(n), ref.get_type_df(n))
+    changes = iges.update(iges_text(old[:2]).encode())
+    assert changes.removed.tolist() == [5, 7, 9] and changes.changed.tolist() == [3]
+    assert iges.get_type_df(402).empty
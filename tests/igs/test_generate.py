@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+import sys
+
+import igs
+from igs.validate import validate
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "benchmarks"))
+
+from generate import generate  # noqa: E402
+
+
+def test_generate(tmpdir):
+    path = str(tmpdir.join("synthetic.igs"))
+    count = generate(path, 500, seed=1)
+    iges = igs.Iges(path)
+    assert len(iges.entries) == count >= 500
+    assert validate(iges) == []
+    assert set(iges.entries.entity_type_number) == {110, 124, 126, 128, 144, 402, 502, 504, 508, 510, 514}
+    assert len(iges.get_type_df(126)) == (iges.entries.entity_type_number == 126).sum()
+    assert len(iges.graph.descendants(iges.entries.index[-1])) > 0
+    # same seed, same file
+    text = io.StringIO()
+    generate(text, 500, seed=1)
+    assert text.getvalue() == open(path).read()
+
+
+def test_generate_mix():
+    text = io.StringIO()
+    generate(text, 50, mix={110: 1})
+    iges = igs.Iges(io.BytesIO(text.getvalue().encode()))
+    assert set(iges.entries.entity_type_number) == {110}
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+
+import igs.igs
+from igs.graph import EntityGraph, lookup, pointer_index
+
+modulepath = os.path.dirname(__file__)
+
+
+def test_entity_graph():
+    # 1 -> 3 -> 5, 1 -> 5, 7 without references
+    graph = EntityGraph([1, 3, 5, 7], [0, 1, 0], [1, 2, 2])
+    assert graph.children(1).tolist() == [3, 5]
+    assert graph.parents(5).tolist() == [1, 3]
+    assert graph.descendants(1).tolist() == [3, 5]
+    assert graph.ancestors([5, 99]).tolist() == [1, 3]
+    assert graph.roots().tolist() == [1, 7]
+    assert lookup(pointer_index([1, 3, 5]), [-3, 4, 100]).tolist() == [1, -1, -1]
+
+
+def test_iges_graph():
+    iges = igs.igs.Iges(os.path.join(modulepath, "test001.iges"))
+    entries = iges.entries
+    graph = iges.graph
+    loop = entries.index[entries.entity_type_number == 508][0]
+    assert entries.loc[graph.children(loop)].entity_type_number.tolist() == [504]
+    assert entries.loc[graph.parents(loop)].entity_type_number.tolist() == [510]
+    solid = entries.index[entries.entity_type_number == 186][0]
+    assert len(graph.descendants(solid)) == len(entries) - 4
+    assert np.isin(graph.roots(), entries.index[entries.entity_type_number.isin([186, 314, 406])]).all()
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+
+import igs
+from igs.header import read_terminate
+
+FILE = os.path.join(os.path.dirname(__file__), "test001.iges")
+
+
+def test_probe():
+    start, values, counts = igs.probe(FILE)
+    assert values["file_name"] == "LED Party Cup v2"
+    assert values["units_name"] == "MM"
+    assert values["max_coord"] == 10000.0
+    assert values["specification_flag"] == 11
+    assert counts == {"S": 1, "G": 3, "D": 2098, "P": 7473}
+    assert list(values) == igs.Iges(FILE).global_section.name.tolist()
+
+
+def test_probe_skips_data():
+    with open(FILE, "rb") as f:
+        lines = f.read().splitlines(True)
+    # broken D and P records are never read, records without line breaks
+    data = b"".join(line if line[72:73] in b"SGT" else b"x" * 80 + b"\n" for line in lines)
+    assert igs.probe(io.BytesIO(data)).values["author"] == igs.probe(FILE).values["author"]
+    fixed = io.BytesIO(b"".join(line.rstrip(b"\r\n") for line in lines))
+    assert igs.probe(fixed).values["author"] == igs.probe(FILE).values["author"]
+    assert read_terminate(fixed) == igs.probe(FILE).counts
+    assert read_terminate(io.BytesIO(b"")) == {}
@@ -90,7 +90,58 @@ def test_type_110():
     print(df110.iloc[0].tolist())
     assert np.allclose(df110.iloc[0][['x1', 'y1', 'z1', 'x2', 'y2', 'z2']], [4.550729124, -0.744933762, 0.0, 7.323911066, 1.835075705, 1.0])
 
+def test_directory_entries():
+    fh = StringIO(s)
+    iges = igs.igs.Iges(fh)
+    de = iges.entries
+    assert len(de) == 16
+    assert de.index.tolist() == list(range(1, 32, 2))
+    assert de.entity_type_number.tolist()[:6] == [402, 144, 108, 142, 102, 110]
+    assert de.loc[7, ["status_blank", "status_subordinate", "status_use", "status_hierarchy"]].tolist() == [0, 1, 5, 0]
+    assert de.loc[7, "form_number"] == 0
+    assert de.loc[1, "form_number"] == 1
+    assert de.dtypes["level"] == np.int32
+    assert de.dtypes["status_use"] == np.int8
+    assert de.entry_label.dtype == "category"
+    assert de.loc[11, "param_str"] == "110,4.550729124,-0.744933762,0.,7.323911066,1.835075705,1.;"
+
+def test_fixed_int():
+    chars = np.frombuffer(b"      12     -34        " b"00010500", dtype=np.uint8).reshape(-1, 8)
+    assert igs.igs.fixed_int(chars).tolist() == [12, -34, 0, 10500]
+
+def test_assemble_parameter_data():
+    s = igs.igs.assemble_parameter_data(["102,2,", "3,5;", "110,0.,", "1.;"], np.array([3, 3, 1, 1]))
+    assert s.index.tolist() == [1, 3]
+    assert s.tolist() == ["110,0.,1.;", "102,2,3,5;"]
+
+def test_lazy_type_df():
+    iges = igs.igs.Iges(StringIO(s))
+    assert iges._type_dfs == {}
+    df110 = iges.get_type_df(110)
+    assert list(iges._type_dfs) == [110]
+    assert iges.get_type_df(110) is df110
+    iges.invalidate_type_df(110)
+    assert iges._type_dfs == {}
+    assert len(iges.get_type_df(110)) == 7
+    iges.invalidate_type_df()
+    assert iges._type_dfs == {}
+
+def test_workers():
+    iges = igs.igs.Iges(StringIO(s))
+    iges_parallel = igs.igs.Iges(StringIO(s), workers=2)
+    assert iges_parallel.entries.equals(iges.entries)
+    assert iges_parallel.tokens.values.tolist() == iges.tokens.values.tolist()
+    # type data is parsed along with the chunks
+    assert sorted(iges_parallel._type_dfs) == sorted(igs.igs.TYPE_PARSERS)
+    assert iges_parallel.get_type_df(110).equals(iges.get_type_df(110))
+    assert iges_parallel.get_type_df(402).members.tolist() == [(3, 19)]
+
 
 if __name__ == '__main__':
     test_import()
     test_type_110()
+    test_directory_entries()
+    test_fixed_int()
+    test_assemble_parameter_data()
+    test_lazy_type_df()
+    test_workers()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+import igs.igs
+from igs.index import RecordIndex, index_path, open_index
+from igs.sections import read_buffer
+
+FILE = os.path.join(os.path.dirname(__file__), "test001.iges")
+
+
+def test_record_index():
+    buf = read_buffer(FILE)
+    index = RecordIndex.build(buf)
+    assert (len(index.d_offsets), len(index.p_offsets)) == (2098, 7473)
+    assert buf[index.d_offsets[2]:index.d_offsets[2] + 8] == b"     514"
+    # records without line breaks
+    fixed = bytes(buf).replace(b"\n", b"")
+    assert (RecordIndex.build(fixed).p_offsets == index.p_offsets // 81 * 80).all()
+    assert RecordIndex.build(fixed).d_offsets[2] == 4 * 80 + 2 * 80
+
+
+def test_saved_index(tmpdir):
+    path = str(tmpdir.join("test001.iges"))
+    shutil.copy(FILE, path)
+    index = open_index(path, read_buffer(path), save=True)
+    assert os.path.exists(index_path(path))
+    saved = open_index(path, b"")
+    assert (saved.d_offsets == index.d_offsets).all() and saved.mtime == index.mtime
+    # a changed file is scanned again
+    os.utime(path, ns=(0, 0))
+    assert len(open_index(path, b"").d_offsets) == 0
+
+
+def test_get_entity():
+    full = igs.igs.Iges(FILE)
+    lazy = igs.igs.Iges(FILE, lazy=True)
+    assert lazy._entries is None
+    assert lazy.global_section.value["file_name"] == "16HLED Party Cup v2"
+    for de_pointer in [1, 19, 2097]:
+        for subtree in [False, True]:
+            entries, tokens = lazy.get_entity(de_pointer, subtree=subtree)
+            expected, expected_tokens = full.get_entity(de_pointer, subtree=subtree)
+            pd.testing.assert_frame_equal(entries, expected, check_categorical=False)
+            assert tokens.values.tolist() == expected_tokens.values.tolist()
+    assert len(lazy.get_entity(1, subtree=True)[0]) == 1046
+    with pytest.raises(KeyError):
+        lazy.get_entity(2)
+    assert lazy._entries is None
+    # the entries are loaded on first access
+    assert lazy.entries.equals(full.entries)
+
+
+def test_lazy_file_object():
+    full = igs.igs.Iges(FILE)
+    with open(FILE, "rb") as f:
+        lazy = igs.igs.Iges(f, lazy=True)
+    entries, tokens = lazy.get_entity(19)
+    pd.testing.assert_frame_equal(entries, full.get_entity(19)[0], check_categorical=False)
+    with open(FILE, "rb") as f:
+        data = f.read()
+    assert len(igs.igs.Iges(data, lazy=True).get_entity(19, subtree=True)[0]) == len(full.get_entity(19, subtree=True)[0])
+    with open(FILE, "rb") as f:
+        with pytest.raises(ValueError):
+            igs.igs.Iges(f, lazy=True, save_index=True)
+    with pytest.raises(ValueError):
+        igs.igs.Iges(FILE, lazy=True, cache={})
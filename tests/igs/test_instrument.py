@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+
+import os
+import pickle
+
+import igs
+from igs.instrument import Stats, add_hook, remove_hook
+
+FILE = os.path.join(os.path.dirname(__file__), "test001.iges")
+
+
+def test_stats():
+    seen = []
+    iges = igs.Iges(FILE, hooks=[seen.append])
+    names = [stage.name for stage in iges.stats]
+    assert names == ["read", "start", "global", "directory", "parameters"]
+    assert iges.stats[-1].entities == 1049
+    assert all(stage.memory is None and stage.seconds >= 0 for stage in iges.stats)
+    iges.get_type_df(126)
+    assert iges.stats[-1][:1] + iges.stats[-1][2:] == ("type 126", 507, None)
+    assert seen == iges.stats
+
+
+def test_memory_and_global_hooks():
+    seen = []
+    add_hook(seen.append)
+    try:
+        iges = igs.Iges(FILE, memory=True)
+    finally:
+        remove_hook(seen.append)
+    assert seen == iges.stats
+    assert all(stage.memory >= 0 for stage in iges.stats)
+    assert max(stage.memory for stage in iges.stats) > 1e6
+
+
+def test_pickle_without_hooks():
+    stats = Stats([print])
+    with stats.stage("x", 3):
+        pass
+    copy = pickle.loads(pickle.dumps(stats))
+    assert copy.hooks == [] and copy.stages == stats.stages
+
+
+def test_caller_tracing_left_alone():
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        block = bytearray(50 * 10 ** 6)
+        del block
+        iges = igs.Iges(FILE, memory=True)
+        assert tracemalloc.get_traced_memory()[1] >= 50 * 10 ** 6
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert all(stage.memory is None for stage in iges.stats)
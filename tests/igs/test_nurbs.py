@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+
+import igs.igs
+from igs.nurbs import BSplineCurves
+
+modulepath = os.path.dirname(__file__)
+
+
+def test_evaluate():
+    # quarter circle (quadratic, rational) and a cubic bezier
+    w = np.sqrt(0.5)
+    curves = BSplineCurves([1, 3], [2, 3],
+                           [0, 0, 0, 1, 1, 1] + [0, 0, 0, 0, 1, 1, 1, 1], [0, 6, 14],
+                           [1, w, 1] + [1, 1, 1, 1],
+                           [[1, 0, 0], [1, 1, 0], [0, 1, 0]] + [[0, 0, 0], [1, 2, 0], [2, 2, 0], [3, 0, 0]],
+                           [0, 3, 7], [0, 0], [1, 1])
+    u = np.linspace(0, 1, 7)
+    points = curves.evaluate(np.r_[np.zeros(7, dtype=int), np.ones(7, dtype=int)], np.r_[u, u])
+    assert np.allclose(np.hypot(points[:7, 0], points[:7, 1]), 1)
+    b = np.array([(1 - u) ** 3, 3 * u * (1 - u) ** 2, 3 * u ** 2 * (1 - u), u ** 3]).T
+    assert np.allclose(points[7:], b.dot(curves.points[3:]))
+
+
+def test_iges_bspline_curves():
+    iges = igs.igs.Iges(os.path.join(modulepath, "test001.iges"))
+    curves = iges.bspline_curves()
+    assert len(curves) == 507
+    assert np.array_equal(curves.sequence_numbers, iges.get_type_df(126).index.values)
+    polylines = curves.sample(9)
+    assert polylines.shape == (507, 9, 3)
+    # clamped curves start and end at their first and last control points
+    assert np.allclose(polylines[:, 0], curves.points[curves.offsets[:-1]])
+    assert np.allclose(polylines[:, -1], curves.points[curves.offsets[1:] - 1])
+    # the first curve is an arc of radius 31.75 around the y axis
+    assert np.allclose(np.hypot(polylines[0, :, 0], polylines[0, :, 2]), 31.75)
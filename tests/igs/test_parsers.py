@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+
+import igs
+import igs.igs
+from igs.igs import TYPE_PARSERS, group_rows, register_parser
+
+from helpers import iges_text
+
+FILE = os.path.join(os.path.dirname(__file__), "test001.iges")
+
+
+def test_group_rows():
+    groups = group_rows([110, 126, 110, 402, 126, 110])
+    assert sorted(groups) == [110, 126, 402]
+    assert groups[110].tolist() == [0, 2, 5]
+    assert groups[402].tolist() == [3]
+    assert group_rows([]) == {}
+
+
+def test_parsers():
+    iges = igs.igs.Iges(iges_text([(100, "100,1.,0.,0.,1.,0.,0.,1.;", 0),
+                                   (116, "116,1.,2.,3.,0;", 0),
+                                   (124, "124,1.,0.,0.,5.,0.,1.,0.,0.,0.,0.,1.,0.;", 0),
+                                   (102, "102,1,1;", 0),
+                                   (142, "142,1,3,1,5,2;", 0)]).encode())
+    iges.parse_entries()
+    assert iges.get_type_df(100).iloc[0].tolist() == [1, 0, 0, 1, 0, 0, 1]
+    assert iges.get_type_df(116).loc[3].tolist() == [1, 2, 3, 0]
+    assert iges.get_type_df(124).t1.tolist() == [5]
+    assert iges.get_type_df(102).members.tolist() == [(1,)]
+    assert iges.get_type_df(142).loc[9].tolist() == [1, 3, 1, 5, 2]
+    assert iges.get_type_df(110).empty
+
+
+def test_parsers_test001():
+    iges = igs.igs.Iges(FILE)
+    assert iges.get_type_df(314).cname.tolist() == ["Steel - Satin", "Plastic - Glossy (Green)"]
+    assert iges.get_type_df(406).iloc[0].tolist() == [15, 1, ("Body5",)]
+    assert len(iges.type_rows(126)) == 507
+    assert len(iges.type_rows(999)) == 0
+
+
+def test_register_parser():
+    @register_parser(186)
+    def parse_186(de, tokens, psep=","):
+        return de[["form_number"]]
+
+    try:
+        iges = igs.igs.Iges(FILE)
+        iges.parse_entries()
+        assert iges.get_type_df(186).index.tolist() == [1]
+        assert igs.register_parser is register_parser
+    finally:
+        del TYPE_PARSERS[186]
+    # grouped once, the groups are kept until the entries change
+    groups = iges.type_groups
+    assert iges.type_groups is groups
+    assert np.array_equal(groups[510], np.flatnonzero(iges.entries.entity_type_number.values == 510))
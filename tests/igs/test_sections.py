@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+
+import igs.igs
+from igs.sections import as_records, split_sections
+
+modulepath = os.path.dirname(__file__)
+filepath = os.path.join(modulepath, "test001.iges")
+
+
+def test_split_sections():
+    sections = split_sections(igs.sections.read_buffer(filepath))
+    assert [len(sections[code]) for code in "SGDPT"] == [1, 3, 2098, 7473, 1]
+    # records of regular files are views of the mapped file
+    assert sections["D"].base is not None
+    assert bytes(sections["T"][0, :8]) == b"S      1"
+
+
+def test_as_records_irregular_lines():
+    buf = b"a|b" + b" " * 69 + b"S0000001\r\n" + b"1H|;" + b" " * 68 + b"G      1"
+    records = as_records(buf)
+    assert records.shape == (2, 80)
+    assert records[:, 72].tobytes() == b"SG"
+    assert bytes(records[0, :3]) == b"a|b"
+
+
+def test_iges_from_path():
+    iges = igs.igs.Iges(filepath)
+    assert len(iges.entries) == 1049
+    assert np.array_equal(iges.entries.index.values, np.arange(1, 2098, 2))
+
+
+def test_compressed(tmpdir):
+    import bz2
+    import gzip
+    import io
+    import lzma
+    with open(filepath, "rb") as f:
+        data = f.read()
+    reference = igs.igs.Iges(filepath)
+    for module, ext in [(gzip, "gz"), (bz2, "bz2"), (lzma, "xz")]:
+        path = str(tmpdir.join("test001.igs." + ext))
+        with open(path, "wb") as f:
+            f.write(module.compress(data))
+        with open(path, "rb") as f:
+            for fh in [path, f, io.BytesIO(module.compress(data))]:
+                iges = igs.igs.Iges(fh)
+                assert iges.entries.equals(reference.entries)
+        assert igs.probe(path).counts["P"] == 7473
+    # chunks end inside a record
+    buf = igs.sections.read_records(gzip.open(io.BytesIO(gzip.compress(data))), chunk_size=1000)
+    assert bytes(buf) == as_records(data).tobytes()
+
+
+def test_records_without_line_breaks():
+    with open(filepath, "rb") as f:
+        data = f.read().replace(b"\n", b"")
+    assert [len(records) for records in split_sections(data).values()] == [1, 3, 2098, 7473, 1]
+
+
+def test_split_sections_empty():
+    for buf in [b"", b"  \n\n   \n"]:
+        sections = split_sections(buf)
+        assert sorted(sections) == sorted("SGDPT")
+        assert all(sections[code].shape == (0, 80) for code in "SGDPT")
+
+
+def test_read_buffer_text_file(tmpdir):
+    # multibyte characters keep their column in text mode
+    with open(filepath, "rb") as f:
+        data = f.read()
+    path = str(tmpdir.join("utf8.iges"))
+    with open(path, "wb") as f:
+        f.write("Bauteil über €".ljust(72).encode("utf-8") + data[72:])
+    with open(path, encoding="utf-8") as f:
+        buf = igs.sections.read_buffer(f)
+    sections = split_sections(buf)
+    assert [len(sections[code]) for code in "SGDPT"] == [1, 3, 2098, 7473, 1]
+    assert bytes(sections["S"][0, :14]) == b"Bauteil \xfcber ?"
+
+
+def test_termination_section(tmpdir):
+    expected = "S      1G      3D   2098P   7473"
+    for iges in [igs.igs.Iges(filepath), igs.igs.Iges(filepath, lazy=True),
+                 igs.igs.Iges(filepath, cache=str(tmpdir)), igs.igs.Iges(filepath, cache=str(tmpdir))]:
+        t = iges.termination_section
+        assert t.data.str.strip().tolist() == [expected]
+        assert t.sequence_number.tolist() == [1]
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+
+import igs.igs
+from igs.spatial import GridIndex, boxes_100, box_distance
+from igs.tokenizer import Tokens
+
+from helpers import iges_text
+
+modulepath = os.path.dirname(__file__)
+
+
+def test_arc_box():
+    # quarter arc from (1, 0) to (0, 1) and the full circle around (0, 0)
+    values = np.array(["100", "2.", "0.", "0.", "1.", "0.", "0.", "1.",
+                       "100", "0.", "0.", "0.", "1.", "0.", "1.", "0."], dtype=object)
+    boxes = boxes_100(Tokens(values, np.array([0, 8, 16])), np.arange(2))
+    assert np.allclose(boxes, [[0, 0, 2, 1, 1, 2], [-1, -1, 0, 1, 1, 0]])
+
+
+def test_grid_index():
+    rng = np.random.default_rng(1)
+    lo = rng.uniform(0, 100, (2000, 3))
+    boxes = np.hstack([lo, lo + rng.uniform(0, 3, (2000, 3))])
+    index = GridIndex(boxes, ids=np.arange(2000) * 2 + 1)
+    queries = np.hstack([lo[:50] - 2, lo[:50] + 2])
+    overlap = ((boxes[None, :, :3] <= queries[:, None, 3:]) & (boxes[None, :, 3:] >= queries[:, None, :3])).all(axis=2)
+    query, ids = index.intersect(queries)
+    assert sorted(zip(query.tolist(), ids.tolist())) == [(q, 2 * i + 1) for q, i in zip(*np.nonzero(overlap))]
+    assert len(index.query([500., 500, 500, 600, 600, 600])) == 0
+    points = rng.uniform(-50, 150, (200, 3))
+    ids, distance = index.nearest(points)
+    assert np.allclose(distance, box_distance(points[:, None], boxes[None]).min(axis=1))
+    assert np.allclose(distance, box_distance(points, boxes[(ids - 1) // 2]))
+
+
+def test_iges_spatial_index():
+    iges = igs.igs.Iges(os.path.join(modulepath, "test001.iges"))
+    boxes = iges.bounding_boxes()
+    assert (boxes.entity_type_number == 126).sum() == 507
+    assert (boxes.xmin <= boxes.xmax).all()
+    ids, distance = iges.spatial_index.nearest([[31.5760701779427, -7.5, -3.318778708748]])
+    assert distance[0] == 0
+    assert iges.entries.loc[ids[0], "entity_type_number"] == 126
+
+
+def test_composite_curve_box():
+    from test_import import s
+    boxes = igs.igs.Iges(s.encode("latin-1")).bounding_boxes()
+    lines = boxes[boxes.entity_type_number == 110]
+    assert np.allclose(boxes.loc[9, ["xmin", "zmax"]], [lines.loc[11:17].xmin.min(), 1.0])
+
+
+def test_nested_composite_curve_box():
+    text = iges_text([(110, "110,0.,0.,0.,1.,1.,1.;", 0),
+                      (110, "110,5.,5.,5.,6.,6.,6.;", 0),
+                      (102, "102,2,1,7;", 0),
+                      (102, "102,1,3;", 0)])
+    iges = igs.igs.Iges(text.encode("latin-1"))
+    boxes = iges.bounding_boxes()
+    assert boxes.loc[7, ["xmin", "xmax"]].tolist() == [5, 6]
+    assert boxes.loc[5, ["xmin", "xmax"]].tolist() == [0, 6]
+    assert 5 in iges.spatial_index.query([5.5, 5.5, 5.5, 5.6, 5.6, 5.6]).tolist()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import igs.igs
+from igs.stream import iter_entities
+
+modulepath = os.path.dirname(__file__)
+filepath = os.path.join(modulepath, "test001.iges")
+
+
+def test_iter_entities():
+    iges = igs.igs.Iges(filepath)
+    entities = list(igs.igs.Iges.stream(filepath))
+    assert len(entities) == len(iges.entries)
+    record, tokens = entities[-1]
+    assert record["sequence_number"] == 2097
+    assert record["entity_type_number"] == 314
+    assert tokens == ["314", "26.6666666666667", "58.8235294117647", "28.2352941176471", "24HPlastic - Glossy (Green)"]
+
+
+def test_iter_entities_batches():
+    batches = list(iter_entities(filepath, batch_size=100))
+    assert [len(de) for de, tokens in batches] == [100] * 10 + [49]
+    de, tokens = batches[0]
+    assert len(tokens) == 100
+    assert de.entity_type_number.iloc[1] == 514
+    assert tokens[1][:3] == ["514", "177", "5"]
+
+
+def test_iter_entities_compressed(tmpdir):
+    import gzip
+    path = str(tmpdir.join("test001.iges.gz"))
+    with open(filepath, "rb") as f, gzip.open(path, "wb") as out:
+        out.write(f.read())
+    entities = list(iter_entities(path))
+    reference = list(iter_entities(filepath))
+    assert len(entities) == len(reference) == 1049
+    assert [tokens for record, tokens in entities] == [tokens for record, tokens in reference]
+
+
+def test_iter_entities_without_line_breaks(tmpdir):
+    path = str(tmpdir.join("fixed.iges"))
+    with open(filepath, "rb") as f, open(path, "wb") as out:
+        out.write(f.read().replace(b"\n", b""))
+    entities = list(iter_entities(path))
+    reference = list(iter_entities(filepath))
+    assert len(entities) == 1049
+    assert [tokens for record, tokens in entities] == [tokens for record, tokens in reference]
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+
+import igs.igs
+from igs.nurbs import surface_grid
+from igs.tessellate import crossings, tessellate_patch
+
+modulepath = os.path.dirname(__file__)
+
+
+def area(mesh):
+    v = mesh.vertices[mesh.faces]
+    return np.linalg.norm(np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0]), axis=1).sum() / 2
+
+
+def test_trimmed_patch():
+    # unit square patch with a hole, the outer boundary is the surface boundary
+    patch = (1, 1, np.array([0., 0, 1, 1]), np.array([0., 0, 1, 1]), np.ones((2, 2)),
+             np.array([[[0., 0, 0], [0, 1, 0]], [[1, 0, 0], [1, 1, 0]]]), np.array([0., 1, 0, 1]))
+    assert np.allclose(surface_grid(patch, [0.5], [0.25]), [[[0.5, 0.25, 0]]])
+    hole = np.array([[0.25, 0.25], [0.75, 0.25], [0.75, 0.75], [0.25, 0.75], [0.25, 0.25]])
+    assert crossings(np.array([[0.5, 0.5], [0.1, 0.5]]), np.stack([hole[:-1], hole[1:]], axis=1)).tolist() == [1, 2]
+    vertices, faces = tessellate_patch((1, patch, [hole], [], False), 8)
+    v = vertices[faces]
+    assert np.isclose(np.linalg.norm(np.cross(v[:, 1] - v[:, 0], v[:, 2] - v[:, 0]), axis=1).sum() / 2, 0.75)
+
+
+def test_tessellate_trimmed_planes():
+    from test_import import s
+    mesh = igs.igs.Iges(s.encode("latin-1")).tessellate()
+    assert sorted(set(mesh.surface.tolist())) == [3, 19]
+    # the two polygons bounded by the composite curves
+    assert abs(area(mesh) - 31.023) < 0.01
+
+
+def test_tessellate_faces():
+    iges = igs.igs.Iges(os.path.join(modulepath, "test001.iges"))
+    mesh = iges.tessellate(resolution=8)
+    assert len(np.unique(mesh.surface)) == 177
+    assert mesh.faces.max() < len(mesh.vertices)
+    parallel = iges.tessellate(resolution=8, workers=2)
+    assert np.array_equal(parallel.faces, mesh.faces)
+    assert np.array_equal(parallel.surface, mesh.surface)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+import numpy as np
+
+import igs.igs
+from igs.tokenizer import Tokens, global_delimiters, hollerith, split_record, to_float, tokenize
+
+modulepath = os.path.dirname(__file__)
+
+
+def test_tokenize_hollerith():
+    data = b"110,0.,1.;  comment  " b"1,,;  " b"406,3H,;a,2Hxy;  " b"314,1H;,4Hab  ;"
+    tokens = tokenize(data, [0, 21, 27, 44, len(data)])
+    assert len(tokens) == 4
+    assert tokens[0] == ["110", "0.", "1."]
+    assert tokens[1] == ["1", "", ""]
+    assert tokens[2] == ["406", "3H,;a", "2Hxy"]
+    assert tokens[3] == ["314", "1H;", "4Hab  "]
+    for i in range(len(tokens)):
+        start, stop = [0, 21, 27, 44, len(data)][i:i + 2]
+        assert split_record(data[start:stop].decode("latin-1")) == tokens[i]
+
+
+def test_tokens_take_column():
+    tokens = Tokens(np.array(["a", "b", "c", "d"], dtype=object), np.array([0, 1, 1, 4]))
+    assert tokens.take([2, -1, 0])[0] == ["b", "c", "d"]
+    assert tokens.take([2, -1, 0])[1] == []
+    assert tokens.column(1).tolist() == ["", "", "c"]
+    assert Tokens.concat([tokens, tokens])[5] == ["b", "c", "d"]
+    assert tokens.slice(1, [1, 1, 5])[2] == ["c", "d"]
+    assert tokens.slice([0, 0, 2], 1)[2] == ["d"]
+
+
+def test_conversions():
+    assert to_float(["1.5D1", "", "-2.", "3E-1"]).tolist() == [15.0, 0.0, -2.0, 0.3]
+    assert hollerith("7Hunknown") == "unknown"
+    assert hollerith("7.5") == "7.5"
+    assert global_delimiters(",,16HLED Party Cup v2,") == (",", ";")
+    assert global_delimiters("1H//1H#/4Hname#") == ("/", "#")
+
+
+def test_hollerith_across_lines():
+    iges = igs.igs.Iges(os.path.join(modulepath, "test001.iges"))
+    # "13HSteel - Satin" is split at the blank between two P lines
+    assert "13HSteel - Satin" in iges.tokens.values.tolist()
+    assert iges.global_section.loc["file_name", "value"] == "16HLED Party Cup v2"
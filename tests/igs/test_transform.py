@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pytest
+
+import igs.igs
+from igs.transform import compose, resolve_chains
+
+from helpers import iges_text
+
+
+def test_resolve_chains():
+    # translations by 1, 2, 4, 8 along x, each pointing to the next
+    matrices = np.zeros((4, 3, 4))
+    matrices[:, :, :3] = np.eye(3)
+    matrices[:, 0, 3] = [1, 2, 4, 8]
+    resolved = resolve_chains(matrices, [1, 2, 3, -1])
+    assert resolved[:, 0, 3].tolist() == [15, 14, 12, 8]
+    assert np.allclose(compose(resolved[:1], matrices[:1]), [[[1, 0, 0, 16], [0, 1, 0, 0], [0, 0, 1, 0]]])
+
+
+def test_model_space():
+    # rotation by 90 degrees about z and a shift by 1 in x, then a shift by 5 in y
+    text = iges_text([(124, "124,0.,-1.,0.,1.,1.,0.,0.,0.,0.,0.,1.,0.;", 3),
+                      (124, "124,1.,0.,0.,0.,0.,1.,0.,5.,0.,0.,1.,0.;", 0),
+                      (110, "110,1.,0.,0.,2.,0.,0.;", 1),
+                      (110, "110,1.,0.,0.,2.,0.,0.;", 0)])
+    iges = igs.igs.Iges(text.encode("latin-1"))
+    lines = iges.get_type_df(110, model_space=True)
+    assert lines.loc[5].tolist() == [1, 6, 0, 1, 7, 0]
+    assert lines.loc[7].tolist() == [1, 0, 0, 2, 0, 0]
+    # the cached type data stays in definition space
+    assert iges.get_type_df(110).loc[5].tolist() == [1, 0, 0, 2, 0, 0]
+
+
+def test_model_space_points_and_arcs():
+    text = iges_text([(124, "124,1.,0.,0.,1.,0.,1.,0.,2.,0.,0.,1.,3.;", 0),
+                      (116, "116,1.,1.,1.,0;", 1),
+                      (100, "100,0.,0.,0.,1.,0.,0.,1.;", 0),
+                      (100, "100,0.,0.,0.,1.,0.,0.,1.;", 1)])
+    iges = igs.igs.Iges(text.encode("latin-1"))
+    assert iges.get_type_df(116, model_space=True).loc[3, ["x", "y", "z"]].tolist() == [2, 3, 4]
+    with pytest.raises(ValueError):
+        iges.get_type_df(100, model_space=True)
+    assert len(iges.get_type_df(100)) == 2
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+import io
+import os
+
+import igs
+import igs.igs
+from igs.writer import format_int, format_real, pack_text
+
+from helpers import iges_text
+
+modulepath = os.path.dirname(__file__)
+
+
+def test_format():
+    assert format_int([0, 5, -12, 1234567], 7).view("S7").ravel().tolist() == [b"      0", b"      5", b"    -12", b"1234567"]
+    assert format_int([1, 0], 2, fill=48).view("S2").ravel().tolist() == [b"01", b"00"]
+    assert igs.igs.fixed_int(format_int([-3, 42], 8)).tolist() == [-3, 42]
+    assert format_real([1.0, 10.0, 1e-5, -0.5]).tolist() == ["1.", "10.", "1.E-05", "-0.5"]
+
+
+def test_pack_text():
+    pieces = ["110,", "1.5,", "12H,;abcdefghij,", "2.;"]
+    lines = pack_text(pieces, [False, False, True, False], 12)
+    assert lines == ["110,1.5,12H,", ";abcdefghij,", "2.;"]
+    assert all(len(x) <= 12 for x in lines)
+
+
+def test_write_roundtrip():
+    iges = igs.igs.Iges(os.path.join(modulepath, "test001.iges"))
+    buf = io.BytesIO()
+    igs.write(iges, buf)
+    copy = igs.igs.Iges(buf.getvalue())
+    columns = [x for x in iges.entries.columns if x != "param_str"]
+    assert copy.entries[columns].equals(iges.entries[columns])
+    assert copy.tokens.values.tolist() == iges.tokens.values.tolist()
+    assert copy.global_section["value"].tolist() == iges.global_section["value"].tolist()
+    assert len(buf.getvalue()) == os.path.getsize(os.path.join(modulepath, "test001.iges"))
+
+
+def test_write_subset(tmpdir):
+    from test_import import s
+    iges = igs.igs.Iges(s.encode("latin-1"))
+    # the second trimmed surface with everything it references
+    keep = [19] + iges.graph.descendants(19).tolist()
+    lines = iges.get_type_df(110).copy()
+    lines["z1"] += 10
+    path = str(tmpdir.join("subset.igs"))
+    iges.write(path, iges.entries.loc[keep], type_dfs={110: lines})
+    subset = igs.igs.Iges(path)
+    assert subset.entries.index.tolist() == [1, 3, 5, 7, 9, 11, 13]
+    assert subset.entries.entity_type_number.tolist() == [144, 108, 142, 102, 110, 110, 110]
+    assert subset.tokens[0] == ["144", "3", "1", "0", "5"]
+    assert subset.tokens[3] == ["102", "3", "9", "11", "13"]
+    assert subset.get_type_df(110).z1.tolist() == [10, 10, 10]
+    assert subset.graph.descendants(1).tolist() == [3, 5, 7, 9, 11, 13]
+
+
+def test_write_pathlib(tmpdir):
+    import pathlib
+    iges = igs.igs.Iges(os.path.join(modulepath, "test001.iges"))
+    path = pathlib.Path(str(tmpdir)) / "copy.iges"
+    iges.write(path)
+    assert len(igs.igs.Iges(path).entries) == len(iges.entries)
+
+
+def test_write_model_space():
+    # shift by 10 in x
+    text = iges_text([(124, "124,1.,0.,0.,10.,0.,1.,0.,0.,0.,0.,1.,0.;", 0),
+                      (110, "110,1.,0.,0.,2.,0.,0.;", 1)])
+    iges = igs.igs.Iges(text.encode("latin-1"))
+    lines = iges.get_type_df(110, model_space=True)
+    buf = io.BytesIO()
+    iges.write(buf, type_dfs={110: lines}, model_space=True)
+    copy = igs.igs.Iges(buf.getvalue())
+    assert copy.entries.transfromation_matrix.tolist() == [0, 0]
+    assert copy.get_type_df(110).loc[3].tolist() == [11, 0, 0, 12, 0, 0]
+    assert copy.get_type_df(110, model_space=True).loc[3].tolist() == [11, 0, 0, 12, 0, 0]
+
+
+def test_write_subset_property_pointers():
+    iges = igs.igs.Iges(os.path.join(modulepath, "test001.iges"))
+    keep = [1] + iges.graph.descendants(1).tolist()
+    buf = io.BytesIO()
+    iges.write(buf, entries=iges.entries.loc[keep])
+    subset = igs.igs.Iges(buf.getvalue())
+    # the property 2093 of the 186 is not written, its pointer becomes 0
+    assert 2093 not in keep
+    assert subset.tokens[0] == ["186", "3", "1", "0", "0", "1", "0"]
+    # a full copy keeps it
+    buf = io.BytesIO()
+    iges.write(buf)
+    assert igs.igs.Iges(buf.getvalue()).tokens[0] == iges.tokens[0]